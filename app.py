@@ -1,13 +1,29 @@
 # save as app.py
 # run with: streamlit run app.py
 
-import math
 import streamlit as st
-from auth import login_gate
-from modules.desc_lib import get_suggestions, add_entry
+from auth import login_gate, logout, current_user, current_role, current_team, has_role
+from modules.desc_lib import get_suggestions, add_entry, add_entries
+from modules.desc_strings import dedupe, shared
 from modules.gates import gates_ui
 from modules.custom_items import custom_items_ui
-from modules.pdf_export import export_chainlink_order_form_pdf_bytes
+from modules.pdf_export import PROFILES, render_order_forms
+from modules.geometry import takeoff_from_text, DEFAULT_CORNER_ANGLE
+from modules.segments import parse_length, parse_segments, to_length
+from modules.cut_optimizer import RAIL_STOCK_FT
+from modules.takeoff import compute_chainlink
+from modules.specs import DUTIES, DEFAULT_DUTY, lookup, generated_descs, codes_for
+from modules.footings import POST_CLASSES, FILLS, SOIL_FACTORS, CONCRETE_ORDERS, defaults_for
+from modules.styles import available_styles, get_style, style_label, defaults, validate, compute_project
+from modules.styles.chainlink import NAME as CHAINLINK, TYPICALS
+from modules.audit import log_event
+from modules.cache import cached
+from modules import analytics
+from modules.views import show_output, show_changes, show_inventory, order_form_xlsx, order_form_preview, project_pdf, history_rollup
+from modules.views import delivery_plan, show_loads, show_materials
+from modules import revisions, inventory, loads, session_store
+from modules.pdf_export import DEFAULT_ROWS, export_change_order_pdf_bytes, export_load_sheet_pdf_bytes
+from modules.bulk_export import FORMATS, zip_to_tempfile, package_name
 from datetime import datetime
 import os
 
@@ -16,6 +32,25 @@ import os
 
 login_gate()
 
+session_store.touch()
+
+with st.sidebar:
+    st.caption(f"Signed in as {current_user()} ({current_role()})")
+    if st.button("Log out", key="logout_btn"):
+        logout()
+        st.rerun()
+    if has_role("admin"):
+        with st.expander("Session memory"):
+            mem = session_store.stats()
+            st.metric("Held in memory", f"{mem['mem_bytes'] / 1e6:.1f} MB",
+                      help=f"Budget {mem['budget_bytes'] / 1e6:.0f} MB per process")
+            st.metric("Reclaimed", f"{mem['reclaimed_bytes'] / 1e6:.1f} MB",
+                      help="Freed by spilling to disk and evicting idle sessions")
+            st.caption(f"{mem['sessions']} sessions ({mem['idle_sessions']} idle), {mem['artifacts']} artifacts, "
+                       f"{mem['spilled_bytes'] / 1e6:.1f} MB on disk; {mem['spills']} spills, "
+                       f"{mem['restores']} restores, {mem['idle_evictions']} idle evictions, "
+                       f"{mem['dropped_sessions']} sessions dropped")
+
 os.makedirs("output", exist_ok=True)
 
 
@@ -29,8 +64,9 @@ def description_input(style, height_ft, finish, category, uid, label, default_ty
     default_typicals: list[str]
     show_save_button: keep False if you're saving on Calculate
     """
-    suggestions = get_suggestions(style, height_ft, finish, category)
-    combined = default_typicals + [s for s in suggestions if s not in default_typicals]
+    suggestions = get_suggestions(style, height_ft, finish, category, user=current_user(), team=current_team())
+    # Shared strings; near-duplicates ('4" Dome Caps' / '4" DOME CAPS') collapse to the first listed
+    combined = dedupe(default_typicals + suggestions)
 
     mode = st.radio(
         f"{label} description mode",
@@ -55,12 +91,12 @@ def description_input(style, height_ft, finish, category, uid, label, default_ty
             st.caption("Past entries (filtered):")
             st.write(suggestions[:10])
 
-    desc = (desc or "").strip()
+    desc = shared(desc)
 
     # Optional manual save (we won't use it if saving on Calculate)
     if show_save_button:
         if st.button(f"Save {label} description", key=f"{uid}_save"):
-            add_entry(style, height_ft, finish, category, desc)
+            add_entry(style, height_ft, finish, category, desc, user=current_user(), team=current_team())
             st.success("Saved.")
 
     return desc
@@ -73,9 +109,6 @@ st.set_page_config(page_title="JBS Fence Takeoff", layout="centered")
 st.title("JBS Fence Takeoff")
 
 # ---------------- Helpers ----------------
-def round_up_to(x, multiple):
-    return int(math.ceil(x / multiple) * multiple)
-
 def to_int(s):
     try:
         if s is None or str(s).strip() == "":
@@ -103,6 +136,9 @@ def req(name, val, *, allow_zero=False):
             return f"• {name} must be > 0."
     return None
 
+def _delivery_job(job, items_by_row, height):
+    return {"job": job, "style": CHAINLINK, "height": height or None, "items_by_row": items_by_row}
+
 # ---------------- Base Inputs ----------------
 proj_name = st.text_input("Project Name", "")
 
@@ -116,21 +152,84 @@ with c2:
 with c3:
     spacing_str = st.text_input("Post Spacing (ft)", "")
 
-length_str = st.text_input("Length (ft)", "")
+duty = st.selectbox("Duty", DUTIES, index=DUTIES.index(DEFAULT_DUTY), format_func=str.title)
+
+length_str = st.text_input("Length (ft)", key="length_str",
+                           help="Feet, feet-inches or a sum of segments, e.g. 120'6\" + 85' + 3@40'")
 
 c4, c5, c6 = st.columns(3)
 with c4:
-    cor_post_str = st.text_input("Corner Posts", "")
+    cor_post_str = st.text_input("Corner Posts", key="cor_post_str")
 with c5:
-    end_post_str = st.text_input("End Posts (For calculations only)", "")
+    end_post_str = st.text_input("End Posts (For calculations only)", key="end_post_str")
 with c6:
-    gate_post_str = st.text_input("Gate Posts", "")
+    gate_post_str = st.text_input("Gate Posts", key="gate_post_str")
+
+
+# ---------------- Layout (optional) ----------------
+def _apply_layout():
+    try:
+        layout = takeoff_from_text(st.session_state.layout_text, corner_angle=st.session_state.layout_angle)
+    except (ValueError, KeyError, TypeError, IndexError) as e:
+        st.session_state.layout_error = f"Layout not applied: {e}"
+        return
+    st.session_state.layout_error = ""
+    vals = layout.to_inputs()
+    st.session_state.length_str = f"{vals['length']:g}"
+    st.session_state.cor_post_str = str(vals["cor_post"])
+    st.session_state.end_post_str = str(vals["end_post"])
+    st.session_state.gate_post_str = str(vals["gate_post"])
+    st.session_state.layout_spans = layout.spans
+    st.session_state.layout_result = layout
+
+
+def _apply_segments():
+    seg = parse_segments(st.session_state.segments_text)
+    st.session_state.segments_result = seg
+    if seg.spans:
+        st.session_state.length_str = f"{seg.to_inputs()['length']:g}"
+        st.session_state.layout_spans = seg.spans
+
+
+with st.expander("Layout (optional) — compute length and posts from a polyline / GeoJSON", expanded=False):
+    st.caption('One "x, y" point per line in feet, blank line between runs. '
+               'Add "gate" after a point to make the segment ending there a gate opening. GeoJSON can be pasted too.')
+    st.text_area("Layout points", key="layout_text", height=150, placeholder="0, 0\n100, 0\n112, 0 gate\n112, 60")
+    st.number_input("Corner angle threshold (deg)", min_value=1.0, max_value=90.0,
+                    value=DEFAULT_CORNER_ANGLE, step=1.0, key="layout_angle")
+    st.button("Use layout", key="layout_btn", on_click=_apply_layout)
+
+    if st.session_state.get("layout_error"):
+        st.warning(st.session_state.layout_error)
+    elif st.session_state.get("layout_result"):
+        lay = st.session_state.layout_result
+        st.caption(f"{lay.fence_length:,.1f} ft of fence in {len(lay.spans)} spans — "
+                   f"{lay.corner_posts} corners, {lay.end_posts} ends, {lay.gate_posts} gate posts, "
+                   f"{len(lay.gate_openings)} gate openings")
+
+with st.expander("Segments (optional) — paste a segment schedule or add up lengths", expanded=False):
+    st.caption("One segment per line, typed or pasted from a spreadsheet: a label, a length "
+               "(120'6\", 85', 3@40', 120'6\" + 85') and optionally a count and \"gate\". "
+               "A header row with Length / Qty / Gate columns is read by column.")
+    st.text_area("Segments", key="segments_text", height=150,
+                 placeholder="Side\tLength\tQty\nNorth\t120'6\"\t1\nEast\t85'\t2\nDrive gate\t12'")
+    st.button("Use segments", key="segments_btn", on_click=_apply_segments)
+
+    seg = st.session_state.get("segments_result")
+    if seg is not None:
+        if seg.errors:
+            st.error("\n".join(f"Line {n}: {msg}" for n, msg in seg.errors[:20])
+                     + (f"\n… and {len(seg.errors) - 20} more" if len(seg.errors) > 20 else ""))
+        if seg.spans:
+            st.caption(f"{seg.fence_length:,.2f} ft of fence in {len(seg.spans)} segments"
+                       + (f", {len(seg.gate_openings)} gate openings ({sum(seg.gate_openings):g} ft, "
+                          f"not counted in Length)" if seg.gate_openings else "")
+                       + (f"; {len(seg.errors)} lines skipped" if seg.errors else ""))
 
 
 # ---------------- Smart Descriptions ----------------
-# Determine "style" for the description library (chainlink vs ornamental etc.)
-# For now, default to chainlink since your current app is chainlink-focused.
-fence_style = "chainlink"
+# The single-run form below is chainlink; other styles are priced in the Project tab.
+fence_style = CHAINLINK
 
 # Use height if valid, else 0 so the key is stable while user is typing
 _height_for_desc = to_int(height_str) or 0
@@ -140,6 +239,16 @@ _finish_for_desc = (finish or "").strip().upper() or "UNSPEC"
 
 desc_registry = []
 
+# Sizes for this height / duty from the spec table; generated descriptions lead each typicals list
+_spec_row = lookup(fence_style, _height_for_desc, duty)
+_generated = generated_descs(_spec_row, _finish_for_desc)
+
+
+def _typicals(row, fallback):
+    gen = _generated.get(row)
+    return [gen] + fallback if gen else fallback
+
+
 
 fabric_desc = description_input(
     style=fence_style,
@@ -148,12 +257,7 @@ fabric_desc = description_input(
     category="fabric",
     uid=f"fabric_{_height_for_desc}_{_finish_for_desc}",
     label="Fabric",
-    default_typicals=[
-        '2" mesh, 9ga, galvanized chain link fabric',
-        '2" mesh, 11.5ga, galvanized chain link fabric',
-        '2" mesh, 9ga, black vinyl-coated chain link fabric',
-        '2" mesh, 11.5ga, black vinyl-coated chain link fabric',
-    ]
+    default_typicals=_typicals("FABRIC", TYPICALS["FABRIC"])
 )
 
 desc_registry.append(("fabric", fabric_desc))
@@ -172,10 +276,7 @@ with st.expander("Descriptions (Optional) — matches Excel takeoff", expanded=F
         category="posts",
         uid=f"line_post_{_height_for_desc}_{_finish_for_desc}",
         label="Line Post",
-        default_typicals=[
-            '2 3/8" OD SCH. 40 x 9\'',
-            '2 3/8" OD SCH. 20 x 9\'',
-        ]
+        default_typicals=_typicals("LINE POST", TYPICALS["LINE POST"])
     )
 
     line_post_cap_desc = description_input(
@@ -185,10 +286,7 @@ with st.expander("Descriptions (Optional) — matches Excel takeoff", expanded=F
         category="caps",
         uid=f"line_post_cap_{_height_for_desc}_{_finish_for_desc}",
         label="Line Post Cap",
-        default_typicals=[
-            "LOOP CAPS",
-            '2 3/8" DOME CAPS',
-        ]
+        default_typicals=_typicals("LINE POST CAP", TYPICALS["LINE POST CAP"])
     )
 
     ties_line_post_desc = description_input(
@@ -198,10 +296,7 @@ with st.expander("Descriptions (Optional) — matches Excel takeoff", expanded=F
         category="ties",
         uid=f"ties_line_{_height_for_desc}_{_finish_for_desc}",
         label="Ties (Line Post)",
-        default_typicals=[
-            "9ga BLK LONG",
-            "9ga GALV LONG",
-        ]
+        default_typicals=TYPICALS["TIES LINE POST"]
     )
 
     top_rail_desc = description_input(
@@ -211,10 +306,7 @@ with st.expander("Descriptions (Optional) — matches Excel takeoff", expanded=F
         category="rails",
         uid=f"top_rail_{_height_for_desc}_{_finish_for_desc}",
         label="Top Rail",
-        default_typicals=[
-            '1-5/8" OD SCH. 40 x 21\' sw',
-            '1-5/8" OD SCH. 20 x 21\' sw',
-        ]
+        default_typicals=_typicals("TOP RAIL", TYPICALS["TOP RAIL"])
     )
 
     ties_top_rail_desc = description_input(
@@ -224,10 +316,7 @@ with st.expander("Descriptions (Optional) — matches Excel takeoff", expanded=F
         category="ties",
         uid=f"ties_top_{_height_for_desc}_{_finish_for_desc}",
         label="Ties (Top Rail)",
-        default_typicals=[
-            "9ga BLK SHORT",
-            "9ga GALV SHORT",
-        ]
+        default_typicals=TYPICALS["TIES TOP RAIL"]
     )
 
     corner_post_desc = description_input(
@@ -237,10 +326,7 @@ with st.expander("Descriptions (Optional) — matches Excel takeoff", expanded=F
         category="posts",
         uid=f"corner_post_{_height_for_desc}_{_finish_for_desc}",
         label="Corner Post",
-        default_typicals=[
-            '2 7/8" OD SCH. 40 x 10\'',
-            '2 7/8" OD SCH. 20 x 10\'',
-        ]
+        default_typicals=_typicals("CORNER POST", TYPICALS["CORNER POST"])
     )
 
     gate_post_pipe_desc = description_input(
@@ -250,10 +336,7 @@ with st.expander("Descriptions (Optional) — matches Excel takeoff", expanded=F
         category="posts",
         uid=f"gate_post_{_height_for_desc}_{_finish_for_desc}",
         label="Gate Post (Pipe)",
-        default_typicals=[
-            '4" OD SCH. 40 x 10\'',
-            '4" OD SCH. 20 x 10\'',
-        ]
+        default_typicals=_typicals("GATE POST", TYPICALS["GATE POST"])
     )
 
     corner_post_cap_desc = description_input(
@@ -263,10 +346,7 @@ with st.expander("Descriptions (Optional) — matches Excel takeoff", expanded=F
         category="caps",
         uid=f"corner_cap_{_height_for_desc}_{_finish_for_desc}",
         label="Corner Post Caps",
-        default_typicals=[
-            '2 7/8" DOME CAPS',
-            '2 7/8" EXTERNAL DOME CAPS',
-        ]
+        default_typicals=_typicals("CORNER POST CAPS", TYPICALS["CORNER POST CAPS"])
     )
 
     gate_post_cap_desc = description_input(
@@ -276,10 +356,7 @@ with st.expander("Descriptions (Optional) — matches Excel takeoff", expanded=F
         category="caps",
         uid=f"gate_cap_{_height_for_desc}_{_finish_for_desc}",
         label="Gate Post Caps",
-        default_typicals=[
-            '4" Dome Caps',
-            '4" External Dome Caps',
-        ]
+        default_typicals=_typicals("GATE POST CAPS", TYPICALS["GATE POST CAPS"])
     )
 
     # Fittings / bands / misc hardware
@@ -290,10 +367,7 @@ with st.expander("Descriptions (Optional) — matches Excel takeoff", expanded=F
         category="fittings",
         uid=f"tension_bar_{_height_for_desc}_{_finish_for_desc}",
         label="Tension Bars",
-        default_typicals=[
-            '6\' Tension Bars (1/4" x 3/4")',
-            '8\' Tension Bars (1/4" x 3/4")',
-        ]
+        default_typicals=_typicals("TENSION BARS", TYPICALS["TENSION BARS"])
     )
 
     brace_band_desc = description_input(
@@ -303,10 +377,7 @@ with st.expander("Descriptions (Optional) — matches Excel takeoff", expanded=F
         category="fittings",
         uid=f"brace_band_{_height_for_desc}_{_finish_for_desc}",
         label="Brace Bands",
-        default_typicals=[
-            '2 7/8" Bevel',
-            '2 3/8" Bevel',
-        ]
+        default_typicals=_typicals("BRACE BANDS", TYPICALS["BRACE BANDS"])
     )
 
     tension_band_desc = description_input(
@@ -316,10 +387,7 @@ with st.expander("Descriptions (Optional) — matches Excel takeoff", expanded=F
         category="fittings",
         uid=f"tension_band_{_height_for_desc}_{_finish_for_desc}",
         label="Tension Bands",
-        default_typicals=[
-            '2 7/8" Bevel',
-            '2 3/8" Bevel',
-        ]
+        default_typicals=_typicals("TENSION BANDS", TYPICALS["TENSION BANDS"])
     )
 
     rail_end_desc = description_input(
@@ -329,10 +397,7 @@ with st.expander("Descriptions (Optional) — matches Excel takeoff", expanded=F
         category="fittings",
         uid=f"rail_end_{_height_for_desc}_{_finish_for_desc}",
         label="Rail Ends",
-        default_typicals=[
-            '2 7/8" x 1-5/8"',
-            '2 3/8" x 1-5/8"',
-        ]
+        default_typicals=_typicals("RAIL ENDS", TYPICALS["RAIL ENDS"])
     )
 
     line_rail_clamp_desc = description_input(
@@ -342,10 +407,7 @@ with st.expander("Descriptions (Optional) — matches Excel takeoff", expanded=F
         category="fittings",
         uid=f"line_clamp_{_height_for_desc}_{_finish_for_desc}",
         label="Line Rail Clamps",
-        default_typicals=[
-            '2 3/8" x 1-5/8"',
-            '2 7/8" x 1-5/8"',
-        ]
+        default_typicals=_typicals("LINE RAIL CLAMPS", TYPICALS["LINE RAIL CLAMPS"])
     )
 
     # Optional add-ons (only relevant if toggled)
@@ -356,11 +418,7 @@ with st.expander("Descriptions (Optional) — matches Excel takeoff", expanded=F
         category="wire",
         uid=f"tension_wire_{_height_for_desc}_{_finish_for_desc}",
         label="Tension Wire",
-        default_typicals=[
-            "7ga GALV tension wire",
-            "9ga GALV tension wire",
-            "Vinyl-coated tension wire to match fabric",
-        ]
+        default_typicals=TYPICALS["TENSION WIRE"]
     )
 
     truss_rod_desc = description_input(
@@ -370,10 +428,7 @@ with st.expander("Descriptions (Optional) — matches Excel takeoff", expanded=F
         category="fittings",
         uid=f"truss_rod_{_height_for_desc}_{_finish_for_desc}",
         label="Truss Rods",
-        default_typicals=[
-            "Truss Rod - 3/8\" x (length per spec)",
-            "Truss Rod - 1/2\" x (length per spec)",
-        ]
+        default_typicals=TYPICALS["TRUSS ROD - 3/8 X"]
     )
 
     windscreen_desc = description_input(
@@ -383,10 +438,7 @@ with st.expander("Descriptions (Optional) — matches Excel takeoff", expanded=F
         category="accessories",
         uid=f"windscreen_{_height_for_desc}_{_finish_for_desc}",
         label="Windscreen",
-        default_typicals=[
-            f'{_height_for_desc}\' Windscreen',
-            '6\' Windscreen',
-        ]
+        default_typicals=[f'{_height_for_desc}\' Windscreen'] + TYPICALS["WINDSCREEN"]
     )
 
     gates_desc = description_input(
@@ -396,12 +448,7 @@ with st.expander("Descriptions (Optional) — matches Excel takeoff", expanded=F
         category="gates",
         uid=f"gates_{_height_for_desc}_{_finish_for_desc}",
         label="Gates (general)",
-        default_typicals=[
-            "6'H x 28'W Sliding",
-            "6'H x 15'W Double Drive",
-            "6'H x 10'W Double Drive",
-            "6'H x 8'W Double Drive",
-        ]
+        default_typicals=TYPICALS["GATES"]
     )
 
 # Register descriptions for auto-save on Calculate
@@ -434,7 +481,9 @@ desc_registry.extend([
 
 # ---------------- Tabs ----------------
 
-tab_takeoff, tab_custom, tab_export = st.tabs(["Takeoff", "Custom Items", "Export / PDF"])
+tab_takeoff, tab_project, tab_custom, tab_export, tab_revisions, tab_delivery, tab_history = st.tabs(
+    ["Takeoff", "Project (mixed styles)", "Custom Items", "Export / PDF", "Revisions", "Delivery", "History"]
+)
 
 with tab_takeoff:
     tabs = st.tabs([
@@ -443,7 +492,8 @@ with tab_takeoff:
     "Barbed Wire",
     "Truss Rods",
     "Windscreen",
-    "Gates"
+    "Gates",
+    "Footings"
 ])
 
 # --- Rails ---
@@ -458,6 +508,9 @@ with tab_takeoff:
 
         has_bottom = st.selectbox("Bottom Rail?", ["No", "Yes"], index=0) == "Yes"
 
+        rail_stock_str = st.text_input("Rail Stock Length (ft)", f"{RAIL_STOCK_FT:g}")
+        st.caption("Rails for every span are cut from the same sticks, so offcuts carry over between runs.")
+
 
 # --- Tension Wire ---
     with tabs[1]:
@@ -502,6 +555,108 @@ with tab_takeoff:
         st.subheader("Gates")
         gate_tab = st.selectbox("Any gates on this run?", ["No", "Yes"], index=0)
 
+# --- Footings ---
+    with tabs[6]:
+        st.subheader("Footings (Concrete / Quick Rock)")
+        has_footings = st.selectbox("Calculate footings?", ["No", "Yes"], index=0) == "Yes"
+
+        footing_cfg = defaults_for(_spec_row, _height_for_desc)
+        footing_strs = {}
+        if has_footings:
+            f1, f2 = st.columns(2)
+            with f1:
+                footing_cfg["soil"] = st.selectbox("Soil", list(SOIL_FACTORS), index=1, format_func=str.title)
+            with f2:
+                footing_cfg["concrete_order"] = st.selectbox("Order concrete as", list(CONCRETE_ORDERS))
+            for cls in POST_CLASSES:
+                fc1, fc2, fc3 = st.columns(3)
+                with fc1:
+                    footing_cfg["fill"][cls] = st.selectbox(f"{cls.title()} posts set in", FILLS,
+                                                            format_func=str.title, key=f"foot_fill_{cls}")
+                with fc2:
+                    footing_strs[("dia_in", cls)] = st.text_input(f"{cls.title()} hole dia (in)",
+                                                                  f"{footing_cfg['dia_in'][cls]:g}", key=f"foot_dia_{cls}")
+                with fc3:
+                    footing_strs[("depth_in", cls)] = st.text_input(f"{cls.title()} hole depth (in)",
+                                                                    f"{footing_cfg['depth_in'][cls]:g}", key=f"foot_depth_{cls}")
+            st.caption("Hole sizes default to 3x the post OD and the post's embedment from the spec table.")
+
+# ---------------- Project (mixed styles) ----------------
+def _run_inputs(i, plugin):
+    spec = {}
+    cols = st.columns(3)
+    for n, f in enumerate(plugin.INPUTS):
+        key = f"run{i}_{plugin.NAME}_{f['key']}"
+        with cols[n % 3]:
+            if f["type"] == "bool":
+                spec[f["key"]] = st.checkbox(f["label"], value=bool(f.get("default")), key=key)
+            elif f["type"] == "choice":
+                spec[f["key"]] = st.selectbox(f["label"], f["choices"], key=key)
+            else:
+                default = f.get("default")
+                raw = st.text_input(f["label"], "" if default is None else f"{default:g}", key=key)
+                spec[f["key"]] = to_int(raw) if f["type"] == "int" else to_float(raw)
+    return spec
+
+
+def _run_descs(i, plugin, spec, finish_val):
+    descs = {}
+    h = spec.get("height") or 0
+    for row, typicals in plugin.TYPICALS.items():
+        category = plugin.CATEGORIES.get(row, "other")
+        options = dedupe(typicals + get_suggestions(plugin.NAME, h, finish_val, category,
+                                                    user=current_user(), team=current_team()))
+        descs[row] = shared(st.selectbox(row.title(), options, key=f"run{i}_{plugin.NAME}_desc_{row}"))
+    return descs
+
+
+with tab_project:
+    st.subheader("Project (mixed styles)")
+    st.caption("Price several runs of any fence style together. Each style gets its own order form page.")
+
+    n_runs = st.number_input("Runs", min_value=1, max_value=20, value=1, step=1, key="project_runs")
+
+    p1, p2, p3 = st.columns(3)
+    with p1:
+        project_fill = st.selectbox("Set posts in", FILLS, index=2, format_func=str.title, key="project_fill")
+    with p2:
+        project_soil = st.selectbox("Soil", list(SOIL_FACTORS), index=1, format_func=str.title, key="project_soil")
+    with p3:
+        project_order = st.selectbox("Order concrete as", list(CONCRETE_ORDERS), key="project_concrete_order")
+    project_runs = []
+    for i in range(int(n_runs)):
+        with st.expander(f"Run {i + 1}", expanded=(i == 0)):
+            style = st.selectbox("Style", available_styles(), format_func=style_label, key=f"run{i}_style")
+            plugin = get_style(style)
+            spec = _run_inputs(i, plugin)
+            descs = _run_descs(i, plugin, spec, _finish_for_desc)
+            run = {"style": style, "spec": spec, "descs": descs}
+            if project_fill != "none":
+                run["footings"] = {**defaults_for(), "soil": project_soil, "concrete_order": project_order,
+                                   "fill": {cls: project_fill for cls in POST_CLASSES}}
+            project_runs.append(run)
+
+    if st.button("Calculate project", key="calc_project_btn"):
+        errors = []
+        for i, run in enumerate(project_runs):
+            plugin = get_style(run["style"])
+            errors += [f"{e} (run {i + 1})" for e in validate(plugin, {**defaults(plugin), **run["spec"]})]
+        if errors:
+            st.error("Fix the following:\n" + "\n".join(errors))
+        else:
+            run_items, by_style = compute_project(project_runs)
+            log_event("project", current_user(), job=proj_name, finish=_finish_for_desc,
+                      runs=project_runs, run_items=run_items, items_by_row=by_style)
+            session_store.put("last_project_sections", [
+                {"title": get_style(style).TITLE, "rows": get_style(style).ROWS, "items_by_row": items}
+                for style, items in by_style.items()
+            ])
+            st.success("Project calculated. Go to Export / PDF tab for the project order form.")
+
+    for sec in session_store.get("last_project_sections") or []:
+        st.markdown(f"**{sec['title']}**")
+        show_output(sec["items_by_row"])
+
 with tab_custom:
     custom_lines = custom_items_ui()
 
@@ -509,9 +664,52 @@ with tab_custom:
 with tab_export:
     st.subheader("Export / PDF (Excel-style form)")
 
-    items_by_row = st.session_state.get("last_items_by_row")
+    items_by_row = session_store.get("last_items_by_row")
     meta = st.session_state.get("last_project_meta", {})
 
+    pdf_profile = st.radio("PDF output", list(PROFILES), horizontal=True, key="pdf_profile",
+                           help="compact: binary-compressed streams and one shared copy of the form layout "
+                                "across pages. Smaller files for archiving and email; standard is 7-bit safe.")
+
+    project_sections = session_store.get("last_project_sections")
+    if project_sections:
+        st.download_button(
+            "Download project PDF (all styles)",
+            data=project_pdf(meta or {"job_name": proj_name}, project_sections, pdf_profile),
+            file_name=f"{(proj_name or 'JBS_Project_Order_Form').replace(' ', '_')}.pdf",
+            mime="application/pdf",
+            key="dl_project_pdf",
+            on_click=log_event,
+            args=("pdf", current_user()),
+            kwargs={"project": meta or {"job_name": proj_name}, "sections": project_sections, "profile": pdf_profile},
+        )
+        if st.toggle("Preview project order form", key="preview_project"):
+            for sec in project_sections:
+                st.image(order_form_preview(meta or {"job_name": proj_name}, sec["items_by_row"],
+                                            sec["rows"], sec["title"]), width="stretch")
+
+    saved_jobs = revisions.jobs()
+    if saved_jobs:
+        with st.expander("Bulk export (saved jobs)"):
+            bulk_jobs = st.multiselect("Jobs", saved_jobs, key="bulk_jobs",
+                                       help="Each job's latest revision, one order form per job.")
+            bulk_formats = FORMATS if st.checkbox("Include XLSX", key="bulk_xlsx") else ["pdf"]
+            bulk_combined = st.checkbox("One combined PDF", key="bulk_combined",
+                                        help="Every job's order form as a page of a single PDF.")
+            if bulk_jobs:
+                # Built on click into a temp file on disk, not held in session state
+                st.download_button(
+                    f"Download ZIP ({len(bulk_jobs)} jobs)",
+                    data=lambda: zip_to_tempfile(bulk_jobs, bulk_formats, profile=pdf_profile, combined=bulk_combined),
+                    file_name=package_name(len(bulk_jobs)),
+                    mime="application/zip",
+                    key="dl_bulk_zip",
+                    on_click=log_event,
+                    args=("pdf", current_user()),
+                    kwargs={"bulk": bulk_jobs, "formats": bulk_formats, "profile": pdf_profile,
+                            "combined": bulk_combined},
+                )
+
     if not items_by_row:
         st.info("Run Calculate in the Takeoff tab first.")
     else:
@@ -528,20 +726,26 @@ with tab_export:
         # persist edits
         st.session_state.last_project_meta = meta
 
+        if st.toggle("Preview order form", value=True, key="preview_order_form"):
+            st.image(order_form_preview(meta, items_by_row), width="stretch")
+
         # ---- Generate PDF (stores bytes in session_state) ----
         if st.button("Generate PDF", key="gen_pdf_export_tab"):
             try:
-                pdf_bytes = export_chainlink_order_form_pdf_bytes(
-                    project=meta,
-                    items_by_row=items_by_row
-                )
-                st.session_state.last_pdf_bytes = pdf_bytes
+                # Footer timestamp: shared bytes are only reused for a minute
+                pdf_bytes, pdf_report = cached("pdf", [meta, items_by_row, pdf_profile], lambda: render_order_forms(
+                    [{"project": meta, "title": "CHAINLINK", "rows": DEFAULT_ROWS, "items_by_row": items_by_row}],
+                    pdf_profile
+                ), ttl=60)
+                session_store.put("last_pdf_bytes", pdf_bytes)
+                session_store.put("last_pdf_report", pdf_report)
+                log_event("pdf", current_user(), project=meta, items_by_row=items_by_row, report=pdf_report)
                 st.success("PDF generated.")
             except Exception as e:
                 st.error(f"PDF export failed: {e}")
 
         # ---- Download button (only shows after a successful generate) ----
-        pdf_bytes = st.session_state.get("last_pdf_bytes")
+        pdf_bytes = session_store.get("last_pdf_bytes")
         if pdf_bytes:
             st.download_button(
                 "Download PDF",
@@ -550,10 +754,166 @@ with tab_export:
                 mime="application/pdf",
                 key="dl_pdf_export_tab"
             )
+            rep = session_store.get("last_pdf_report")
+            if rep:
+                st.caption(f"{rep['profile']}: {rep['bytes'] / 1024:.1f} KB, rendered in {rep['ms']:.0f} ms")
+
+        st.download_button(
+            "Download XLSX",
+            data=order_form_xlsx(meta, items_by_row),
+            file_name=f"{(meta.get('job_name') or 'JBS_Chainlink_Order_Form').replace(' ', '_')}.xlsx",
+            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            key="dl_xlsx_export_tab",
+            on_click=log_event,
+            args=("xlsx", current_user()),
+            kwargs={"project": meta, "items_by_row": items_by_row},
+        )
+
+        _, sheet_plan = delivery_plan([_delivery_job(meta.get("job_name") or proj_name or "This job", items_by_row,
+                                                     _height_for_desc)], loads.default_trucks(), True)
+        st.download_button(
+            f"Download load sheet ({len(sheet_plan['loads'])} loads)",
+            data=lambda: export_load_sheet_pdf_bytes(meta, sheet_plan),
+            file_name=f"{(meta.get('job_name') or 'JBS_Chainlink').replace(' ', '_')}_Load_Sheet.pdf",
+            mime="application/pdf",
+            key="dl_load_sheet_export_tab",
+        )
 
 
 
 
+with tab_revisions:
+    st.subheader("Revisions")
+    rev_jobs = revisions.jobs()
+
+    if not rev_jobs:
+        st.info("Set a Project Name and Calculate to start a job's revision history.")
+    else:
+        rev_job = st.selectbox("Job", rev_jobs, index=rev_jobs.index(proj_name) if proj_name in rev_jobs else 0,
+                               key="rev_job")
+        history = revisions.revisions(rev_job)
+        st.dataframe(
+            [{"Rev": h["rev"], "When": f"{datetime.fromtimestamp(h['ts']):%Y-%m-%d %H:%M}", "By": h["user"],
+              "Rows changed": h["changed"], "Note": h["note"]} for h in reversed(history)],
+            hide_index=True, width="stretch",
+        )
+
+        if len(history) < 2:
+            st.caption("Only one revision so far; recalculate after a change to compare.")
+        else:
+            rev_nums = [h["rev"] for h in history]
+            r1, r2 = st.columns(2)
+            with r1:
+                rev_from = st.selectbox("From revision", rev_nums, index=len(rev_nums) - 2, key="rev_from")
+            with r2:
+                rev_to = st.selectbox("To revision", rev_nums, index=len(rev_nums) - 1, key="rev_to")
+
+            changes = revisions.change_rows(revisions.diff(rev_job, rev_from, rev_to), DEFAULT_ROWS)
+            spec_changes = revisions.spec_diff(rev_job, rev_from, rev_to)
+            if spec_changes:
+                st.caption("Inputs changed: " + ", ".join(f"{k} {a} → {b}" for k, (a, b) in spec_changes.items()))
+            if not changes:
+                st.info("No material changes between these revisions.")
+            else:
+                show_changes(changes)
+
+            change_meta = {**(st.session_state.get("last_project_meta") or {}), "job_name": rev_job}
+            st.download_button(
+                "Download change order PDF",
+                data=lambda: export_change_order_pdf_bytes(change_meta, changes, rev_from, rev_to),
+                file_name=f"{rev_job.replace(' ', '_')}_CO_{rev_from}-{rev_to}.pdf",
+                mime="application/pdf",
+                key="dl_change_order",
+                on_click=log_event,
+                args=("pdf", current_user()),
+                kwargs={"job": rev_job, "change_order": [rev_from, rev_to]},
+            )
+
+
+with tab_delivery:
+    st.subheader("Delivery loads")
+    st.caption("Weights and bundles for one or more jobs, packed onto trucks by weight, bed length and floor space.")
+
+    current_items = session_store.get("last_items_by_row")
+    current_name = (st.session_state.get("last_project_meta") or {}).get("job_name") or proj_name or "Current takeoff"
+    saved_jobs = [j for j in revisions.jobs() if j != current_name]
+    options = ([current_name] if current_items else []) + saved_jobs
+    if not options:
+        st.info("Calculate a takeoff (or save jobs with a Project Name) to plan deliveries.")
+    else:
+        day_jobs = st.multiselect("Jobs on this delivery day", options, default=options[:1], key="delivery_jobs")
+        fleet = st.data_editor(loads.default_trucks(), num_rows="dynamic", key="delivery_fleet", width="stretch",
+                               column_config={"name": "Truck", "max_lb": "Max lb", "bed_ft": "Bed ft",
+                                              "slots": "Floor slots"})
+        fleet = [t for t in fleet if t.get("name") and t.get("max_lb") and t.get("bed_ft") and t.get("slots")]
+        mix_jobs = not st.checkbox("Keep jobs on separate trucks", key="delivery_separate")
+
+        day = []
+        for job in day_jobs:
+            if job == current_name and current_items:
+                day.append(_delivery_job(job, current_items, _height_for_desc))
+            else:
+                rec = revisions.latest(job)
+                if rec is not None:
+                    day.append(_delivery_job(job, rec["items_by_row"], to_int(rec["spec"].get("height"))))
+
+        if day and fleet:
+            mat_df, day_plan = delivery_plan(day, fleet, mix_jobs)
+            m1, m2, m3 = st.columns(3)
+            m1.metric("Loads", len(day_plan["loads"]))
+            m2.metric("Weight", f"{day_plan['weight_lb']:,.0f} lb")
+            m3.metric("Bundles", day_plan["bundles"])
+            show_loads(day_plan)
+            if day_plan["unplaced"]:
+                st.error("No truck in the fleet can carry: " + ", ".join(
+                    f"{g['job']} {g['row']} ({g['lb']:,.0f} lb, {g['len_ft']:g} ft)" for g in day_plan["unplaced"]))
+            if day_plan["unknown"]:
+                st.warning("No weight / bundle data (not on the load sheet): " + ", ".join(day_plan["unknown"]))
+            with st.expander("Materials"):
+                show_materials(mat_df)
+            st.download_button(
+                "Download load sheet PDF",
+                data=lambda: export_load_sheet_pdf_bytes({"job_name": ", ".join(day_jobs)[:30]}, day_plan),
+                file_name=f"JBS_Load_Sheet_{datetime.now():%Y%m%d}.pdf",
+                mime="application/pdf",
+                key="dl_load_sheet",
+            )
+
+
+with tab_history:
+    st.subheader("Material usage history")
+    jobs_df = analytics.jobs()
+
+    if jobs_df.empty:
+        st.info("No calculations logged yet.")
+    else:
+        styles = sorted(jobs_df["style"].cat.categories)
+        months = sorted(jobs_df["month"].cat.categories)
+        h1, h2, h3 = st.columns(3)
+        with h1:
+            hist_style = st.selectbox("Style", styles, index=styles.index(CHAINLINK) if CHAINLINK in styles else 0,
+                                      format_func=style_label, key="hist_style")
+        with h2:
+            hist_since = st.selectbox("From", months, index=max(0, len(months) - 12), key="hist_since")
+        with h3:
+            hist_until = st.selectbox("To", months, index=len(months) - 1, key="hist_until")
+
+        style_rows = [r for r in get_style(hist_style).ROWS if r in jobs_df.columns]
+        hist_by = st.multiselect("Group by", ["month", "height", "finish", "user"],
+                                 default=["month", "height", "finish"], key="hist_by") or ["month"]
+        hist_rows = st.multiselect("Materials", style_rows, default=style_rows[:3] if hist_style != CHAINLINK
+                                   else [r for r in ("FABRIC", "LINE POST", "TOP RAIL") if r in style_rows],
+                                   key="hist_rows")
+
+        table = history_rollup(len(jobs_df), tuple(hist_by), tuple(hist_rows), hist_style, hist_since, hist_until)
+        unit_of = analytics.units()
+        st.dataframe(table.rename(columns={r: f"{r} ({unit_of.get(r, '')})" for r in hist_rows}),
+                     hide_index=True, width="stretch")
+
+        if hist_rows:
+            monthly = history_rollup(len(jobs_df), ("month",), tuple(hist_rows), hist_style, hist_since, hist_until)
+            st.bar_chart(monthly.set_index("month")[hist_rows])
+
 
 # ---------------- Override Section ----------------
 override_lp = False
@@ -566,10 +926,12 @@ with st.expander("Weird Project Override (Line Posts)"):
 
 # ---------------- Calculate ----------------
 # ---------------- Calculate ----------------
+rev_note = st.text_input("Revision note (optional)", key="rev_note",
+                         help="Saved with the job's revision when a Project Name is set, e.g. \"added 12' DD gate\".")
 if st.button("Calculate", key="calc_btn"):
     height = to_int(height_str)
     spacing = to_float(spacing_str)
-    length = to_float(length_str)
+    length = to_length(length_str)
 
     cor_post = to_int(cor_post_str)
     end_post = to_int(end_post_str)
@@ -578,9 +940,10 @@ if st.button("Calculate", key="calc_btn"):
     mid_count = to_int(mid_count_str) if mid_opt == "Yes" else 0
     hog_spacing = to_float(hog_spacing_str) if has_hog else None
     bw_strands = to_int(bw_strands_str) if has_bw else 0
-    ws_feet = to_float(ws_feet_str) if has_ws else None
+    ws_feet = to_length(ws_feet_str) if has_ws else None
     ws_roll_len = to_float(ws_roll_len_str) if has_ws else None
     lp_override = to_int(override_lp_str) if override_lp else None
+    rail_stock = to_float(rail_stock_str)
 
     total_rails = (1 if has_top else 0) + mid_count + (1 if has_bottom else 0)
 
@@ -593,11 +956,18 @@ if st.button("Calculate", key="calc_btn"):
         ("End Posts", end_post, True),
         ("Gate Posts", gate_post, True),
         ("Rails Selected", total_rails, False),
+        ("Rail Stock Length", rail_stock, False),
     ]:
         err = req(name, val, allow_zero=allow_zero)
         if err:
             errors.append(err)
 
+    if length is None and (length_str or "").strip():
+        try:
+            parse_length(length_str)
+        except ValueError as e:   # say what's wrong with it rather than "required"
+            errors[errors.index(req("Length", None))] = f"• Length: {e}."
+
     if has_hog:
         err = req("Hog Ring Spacing", hog_spacing)
         if err:
@@ -616,13 +986,20 @@ if st.button("Calculate", key="calc_btn"):
         if err:
             errors.append(err)
 
+    if has_footings:
+        for (field, cls), raw in footing_strs.items():
+            footing_cfg[field][cls] = to_float(raw)
+            if footing_cfg["fill"][cls] != "none":
+                err = req(f"{cls.title()} hole {'diameter' if field == 'dia_in' else 'depth'}", footing_cfg[field][cls])
+                if err:
+                    errors.append(err)
+
     if override_lp:
         err = req("Line Post Override", lp_override, allow_zero=True)
         if err:
             errors.append(err)
 
-    if end_post is not None and cor_post is not None and end_post > cor_post:
-        errors.append("• End posts cannot exceed terminal posts.")
+    errors += get_style(CHAINLINK).check({"cor_post": cor_post, "end_post": end_post})
 
     if gate_post and gate_tab == "No":
         errors.append("• Gate posts entered but Gates tab is set to No.")
@@ -632,84 +1009,63 @@ if st.button("Calculate", key="calc_btn"):
     else:
         # ---------------- Auto-save descriptions on Calculate ----------------
         if _height_for_desc > 0 and _finish_for_desc != "UNSPEC":
-            for category, desc in desc_registry:
-                add_entry(
-                    style=fence_style,
-                    height_ft=_height_for_desc,
-                    finish=_finish_for_desc,
-                    category=category,
-                    description=desc
-                )
+            add_entries(
+                [(fence_style, _height_for_desc, _finish_for_desc, category, desc) for category, desc in desc_registry],
+                user=current_user(),
+                team=current_team(),
+            )
 
         # ---------------- Calculations ----------------
-        if override_lp:
-            line_posts = max(0, lp_override)
-        else:
-            line_posts = math.ceil((length / spacing) - cor_post - gate_post)
-            if line_posts < 0:
-                line_posts = 0
-
-        ties_lp = round_up_to(height * line_posts, 50)
-
-        top_rail = math.ceil(length / 21) if has_top else 0
-        mid_rail = math.ceil((length * mid_count) / 21) if mid_count else 0
-        bottom_rail = math.ceil(length / 21) if has_bottom else 0
-        total_rail_sticks = top_rail + mid_rail + bottom_rail
-
-        ties_tr = round_up_to(length / 1.25, 50) if has_top else 0
-
-        true_corners = max(0, cor_post - end_post)
-        ten_bar = (true_corners * 2) + (end_post * 1) + (gate_post * 1)
-
-        bb = round_up_to(
-            ((true_corners * 4) + (end_post * 2) + (gate_post * 2)) * total_rails,
-            50
-        )
-
-        tb = round_up_to((height - 1) * ten_bar, 50)
-        n_b = math.ceil((bb + tb) / 100)
-
-        rail_ends = ((true_corners * 2) + end_post + gate_post) * total_rails
-        line_rc = (mid_count + (1 if has_bottom else 0)) * line_posts
-
-        ten_wire = int(length) if has_tw else 0
-
-        truss_rods = truss_tight = cor_post if has_truss else 0
-        ws_rolls = math.ceil(ws_feet / ws_roll_len) if has_ws and ws_feet and ws_roll_len else 0
-
-        items_by_row = {
-            "FABRIC": {"qty": int(length), "desc": fabric_desc},
-
-            "LINE POST": {"qty": line_posts, "desc": line_post_desc},
-            "LINE POST CAP": {"qty": line_posts, "desc": line_post_cap_desc},
-            "TIES LINE POST": {"qty": ties_lp, "desc": ties_line_post_desc},
-
-            "TOP RAIL": {"qty": total_rail_sticks, "desc": top_rail_desc},
-            "TIES TOP RAIL": {"qty": ties_tr if has_top else "", "desc": ties_top_rail_desc if has_top else ""},
-
-            "CORNER POST": {"qty": cor_post, "desc": corner_post_desc},
-            "CORNER POST CAPS": {"qty": cor_post, "desc": corner_post_cap_desc},
-
-            "GATE POST": {"qty": gate_post, "desc": gate_post_pipe_desc},
-            "GATE POST CAPS": {"qty": gate_post, "desc": gate_post_cap_desc},
-
-            "TENSION BARS": {"qty": ten_bar, "desc": tension_bar_desc},
-            "BRACE BANDS": {"qty": bb, "desc": brace_band_desc},
-            "TENSION BANDS": {"qty": tb, "desc": tension_band_desc},
-
-            'C/B - 5/16" X 1-1/4"': {"qty": n_b, "desc": 'C/B 5/16" x 1-1/4"'},
-            "RAIL ENDS": {"qty": rail_ends, "desc": rail_end_desc},
-            "LINE RAIL CLAMPS": {"qty": line_rc if line_rc else "", "desc": line_rail_clamp_desc if line_rc else ""},
-
-            "TENSION WIRE": {"qty": ten_wire if has_tw else "", "desc": tension_wire_desc if has_tw else ""},
-
-            "TRUSS ROD - 3/8 X": {"qty": truss_rods if has_truss else "", "desc": truss_rod_desc if has_truss else ""},
-            "TRUSS TIGHTENERS": {"qty": truss_tight if has_truss else "", "desc": "Truss Tighteners" if has_truss else ""},
-
-            "WINDSCREEN": {"qty": int(ws_feet) if has_ws and ws_feet is not None else "", "desc": windscreen_desc if has_ws else ""},
+        spec = {
+            "height": height,
+            "spacing": spacing,
+            "length": length,
+            "cor_post": cor_post,
+            "end_post": end_post,
+            "gate_post": gate_post,
+            "has_top": has_top,
+            "mid_count": mid_count,
+            "has_bottom": has_bottom,
+            "has_tw": has_tw,
+            "hog_spacing": hog_spacing,
+            "has_bw": has_bw,
+            "bw_strands": bw_strands,
+            "has_truss": has_truss,
+            "has_ws": has_ws,
+            "ws_feet": ws_feet,
+            "ws_roll_len": ws_roll_len,
+            "lp_override": lp_override,
+            "rail_stock": rail_stock,
+            "spans": st.session_state.get("layout_spans"),
+            "footings": footing_cfg if has_footings else None,
+        }
+        descs = {
+            "FABRIC": fabric_desc,
+            "LINE POST": line_post_desc,
+            "LINE POST CAP": line_post_cap_desc,
+            "TIES LINE POST": ties_line_post_desc,
+            "TOP RAIL": top_rail_desc,
+            "TIES TOP RAIL": ties_top_rail_desc,
+            "CORNER POST": corner_post_desc,
+            "CORNER POST CAPS": corner_post_cap_desc,
+            "GATE POST": gate_post_pipe_desc,
+            "GATE POST CAPS": gate_post_cap_desc,
+            "TENSION BARS": tension_bar_desc,
+            "BRACE BANDS": brace_band_desc,
+            "TENSION BANDS": tension_band_desc,
+            "RAIL ENDS": rail_end_desc,
+            "LINE RAIL CLAMPS": line_rail_clamp_desc,
+            "TENSION WIRE": tension_wire_desc,
+            "TRUSS ROD - 3/8 X": truss_rod_desc,
+            "WINDSCREEN": windscreen_desc,
         }
 
-        st.session_state.last_items_by_row = items_by_row
+        codes = codes_for(descs, _spec_row, _finish_for_desc)
+        items_by_row, cut_plans = cached("takeoff", [spec, descs, codes],
+                                         lambda: compute_chainlink(spec, descs, codes), ttl=86400)
+
+        session_store.put("last_items_by_row", items_by_row)
+        session_store.put("last_cut_plans", {name: plan.summary() for name, plan in cut_plans.items()})
 
         # Save meta for export tab
         height_val = to_int(height_str) or ""
@@ -723,7 +1079,15 @@ if st.button("Calculate", key="calc_btn"):
             "height_style": f"{height_val}  {finish_val}".strip(),
         }
 
-        st.success("Calculated. Go to Export / PDF tab to generate the PDF.")
+        rev = revisions.save_revision(proj_name, items_by_row, spec=spec, user=current_user(), note=rev_note,
+                                      meta=st.session_state.last_project_meta)
+        log_event("calculate", current_user(), job=proj_name, finish=finish, duty=duty,
+                  spec=spec, descs=descs, items_by_row=items_by_row, rev=rev)
+
+        if rev:
+            st.success(f"Calculated (revision {rev} of {proj_name}). Go to Export / PDF tab to generate the PDF.")
+        else:
+            st.success("Calculated. Go to Export / PDF tab to generate the PDF.")
 
 
 # ---------------- Output (safe on reruns) ----------------
@@ -731,128 +1095,33 @@ with tab_takeoff:
     st.divider()
     st.subheader("Output")
 
-    items_by_row = st.session_state.get("last_items_by_row")
+    items_by_row = session_store.get("last_items_by_row")
 
     if not items_by_row:
         st.info("Enter inputs and click Calculate.")
     else:
         # Show the Excel/PDF rows
-        for item_name, data in items_by_row.items():
-            qty = data.get("qty", "")
-            desc = data.get("desc", "")
-            if qty != "" and qty is not None:
-                st.write(f"**{item_name}:** {qty} — {desc or 'N/A'}")
-
-
-
-
-
-# ---------------- Build quote items ----------------
-#quote_items = []
-
-# Fabric
-#quote_items.append({
- #   "item": "FABRIC",
- #   "description": fabric_desc,
-  #  "unit": "LF",
-   # "qty": int(length)
-#})
-
-# Posts / caps / ties / rails (only if quantities > 0)
-#def add_line(code, desc, unit, qty):
- #   qty_int = int(qty or 0)
-  #  if qty_int > 0:
-   #     quote_items.append({"item": code, "description": desc, "unit": unit, "qty": qty_int})
-
-#add_line("LINE POST", line_post_desc, "EA", line_posts)
-#add_line("LP CAP", line_post_cap_desc, "EA", line_posts)
-#add_line("LP TIES", ties_line_post_desc, "EA", ties_lp)
-
-#add_line("TOP RAIL", top_rail_desc, "EA", total_rail_sticks)
-#if has_top:
- #   add_line("TR TIES", ties_top_rail_desc, "EA", ties_tr)
-
-#add_line("CORNER POST", corner_post_desc, "EA", cor_post)
-#add_line("CORNER CAP", corner_post_cap_desc, "EA", cor_post)
-
-#add_line("GATE POST", gate_post_pipe_desc, "EA", gate_post)
-#add_line("GATE CAP", gate_post_cap_desc, "EA", gate_post)
-
-#add_line("TENSION BAR", tension_bar_desc, "EA", ten_bar)
-#add_line("BRACE BAND", brace_band_desc, "EA", bb)
-#add_line("TENSION BAND", tension_band_desc, "EA", tb)
-#add_line('C/B 5/16 x 1-1/4', 'C/B 5/16" x 1-1/4"', "EA", n_b)
-#add_line("RAIL END", rail_end_desc, "EA", rail_ends)
-
-#if line_rc:
- #   add_line("LINE CLAMP", line_rail_clamp_desc, "EA", line_rc)
-
-#if has_tw:
- #   add_line("TENSION WIRE", tension_wire_desc, "LF", ten_wire)
-#if has_hog:
- #   add_line("HOG RINGS", "Hog Rings", "EA", hog_rings)
-
-#if has_bw:
- #   add_line("BARB WIRE", "Barbed Wire", "LF", bw_feet)
-  #  add_line("BARB ROLLS", "Barbed Wire Rolls", "RL", bw_rolls)
-
-#if has_truss:
- #   add_line("TRUSS ROD", truss_rod_desc, "EA", truss_rods)
-  #  add_line("TRUSS TIGHT", "Truss Tighteners", "EA", truss_tight)
-
-#if has_ws:
- #   add_line("WINDSCREEN", windscreen_desc, "LF", int(ws_feet))
-  #  add_line("WS ROLLS", "Windscreen Rolls", "RL", ws_rolls)
-
-#if gate_tab == "Yes":
-    # placeholder until we wire gates_ui()
- #   add_line("GATES", gates_desc, "EA", 1)
-
-# ---------------- Output ----------------
-#st.subheader("Output")
-
-#st.write(f"**Fabric:** {int(length)} LF — {fabric_desc or 'N/A'}")
-
-#st.write(f"**Corner Posts:** {cor_post} — {corner_post_desc or 'N/A'}")
-#st.write(f"**Corner Post Caps:** {cor_post} — {corner_post_cap_desc or 'N/A'}")
-
-#st.write(f"**Gate Posts:** {gate_post} — {gate_post_pipe_desc or 'N/A'}")
-#st.write(f"**Gate Post Caps:** {gate_post} — {gate_post_cap_desc or 'N/A'}")
-
-#st.write(f"**Line Posts:** {line_posts} — {line_post_desc or 'N/A'}")
-#st.write(f"**Line Post Caps:** {line_posts} — {line_post_cap_desc or 'N/A'}")
-#st.write(f"**Line Post Ties:** {ties_lp} — {ties_line_post_desc or 'N/A'}")
-
-#st.write(f"**Top Rail (21'):** {total_rail_sticks} — {top_rail_desc or 'N/A'}")
-#if has_top:
- #   st.write(f"**Top Rail Ties:** {ties_tr} — {ties_top_rail_desc or 'N/A'}")
-
-#st.write(f"**Tension Bars:** {ten_bar} — {tension_bar_desc or 'N/A'}")
-#st.write(f"**Brace Bands:** {bb} — {brace_band_desc or 'N/A'}")
-#st.write(f"**Tension Bands:** {tb} — {tension_band_desc or 'N/A'}")
-#st.write(f'**C/B 5/16" x 1-1/4":** {n_b}')
-#st.write(f"**Rail Ends:** {rail_ends} — {rail_end_desc or 'N/A'}")
-#if line_rc:
- #   st.write(f"**Line Rail Clamps:** {line_rc} — {line_rail_clamp_desc or 'N/A'}")
-
-#if has_tw:
- #   st.write(f"**Tension Wire:** {ten_wire} LF — {tension_wire_desc or 'N/A'}")
-  #  if has_hog:
-   #     st.write(f"**Hog Rings:** {hog_rings}")
-
-#if has_bw:
- #   st.write(f"**Barbed Wire:** {bw_feet} LF")
-  #  st.write(f"**Barbed Wire Rolls:** {bw_rolls}")
-
-#if has_truss:
- #   st.write(f"**Truss Rods:** {truss_rods} — {truss_rod_desc or 'N/A'}")
-  #  st.write(f"**Truss Tighteners:** {truss_tight}")
-
-#if has_ws:
- #   st.write(f"**Windscreen Footage:** {int(ws_feet)} LF — {windscreen_desc or 'N/A'}")
-  #  st.write(f"**Windscreen Rolls:** {ws_rolls}")
-
-#if gate_tab == "Yes":
- #   st.write(f"**Gates:** (see gate posts) — {gates_desc or 'N/A'}")
-
-     
+        show_output(items_by_row)
+
+        for name, summary in (session_store.get("last_cut_plans") or {}).items():
+            st.caption(f"Cut plan — {name}: {summary}")
+
+        if inventory.has_stock():
+            st.markdown("**Yard stock**")
+            checked = inventory.check(items_by_row, job=proj_name)
+            short = inventory.shortages(checked)
+            if short:
+                st.warning("Short: " + ", ".join(f"{r['row']} ({r['short']:g} {r['unit']})" for r in short))
+            show_inventory(checked)
+            if proj_name:
+                i1, i2 = st.columns(2)
+                with i1:
+                    if st.button(f"Reserve stock for {proj_name}", key="reserve_btn"):
+                        inventory.reserve(proj_name, items_by_row, user=current_user())
+                        st.rerun()
+                with i2:
+                    if any(r["reserved"] for r in checked) and st.button("Release reservation", key="release_btn"):
+                        inventory.release(proj_name)
+                        st.rerun()
+            else:
+                st.caption("Set a Project Name to reserve stock for this job.")
@@ -1,31 +1,291 @@
+import base64
+import getpass
+import hashlib
 import hmac
+import json
+import os
+import secrets
+import sys
+import time
+
 import streamlit as st
 
-# Simple login gate (good enough for internal tool).
-# Change these credentials later.
-USERS = {
-    "pau9113": "Mark76078!",   # username: password
-    "estimator1": "Fence123!",
-}
+from modules.filelock import locked
+from modules.keys import secret as _secret
+
+# Login gate backed by data/users.json.
+# Passwords are stored as PBKDF2 hashes and checked once at login. After that the
+# session carries a signed token in st.session_state (never in the URL, where it
+# would end up in browser history and copied links) that we verify with a single
+# HMAC per rerun, so a revoked token or removed user is signed out at once.
+# Every token has its own id ("j"). Logging out revokes just that token: its id
+# goes into data/revoked_tokens/<expiry date>.txt, and a day's file is deleted
+# once every token in it has expired. Each user also has a token generation
+# ("gen") in users.json that is signed into the token; revoke_tokens (an admin
+# action, `python auth.py revoke`) bumps it, signing the user out everywhere.
+USERS_PATH = os.path.join("data", "users.json")
+REVOKED_DIR = os.path.join("data", "revoked_tokens")
+
+ROLES = ["admin", "estimator"]
+
+PBKDF2_ITERATIONS = 600_000
+TOKEN_TTL_SECONDS = 12 * 60 * 60
+
+_users_cache = (None, {})   # (users.json mtime_ns, users)
+_revoked_cache = {}         # revoked-ids file -> ((mtime_ns, size), ids)
+
+
+def _b64e(b: bytes) -> str:
+    return base64.urlsafe_b64encode(b).decode("ascii").rstrip("=")
+
+
+def _b64d(s: str) -> bytes:
+    return base64.urlsafe_b64decode(s + "=" * (-len(s) % 4))
+
+
+# ---------------- User store ----------------
+def _load_users():
+    if not os.path.exists(USERS_PATH):
+        return {}
+    with open(USERS_PATH, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _save_users(users):
+    os.makedirs("data", exist_ok=True)
+    with open(USERS_PATH, "w", encoding="utf-8") as f:
+        json.dump(users, f, indent=2)
+
+
+def _users():
+    """_load_users(), re-read only when users.json changes (checked on every rerun)."""
+    global _users_cache
+    try:
+        mtime = os.stat(USERS_PATH).st_mtime_ns
+    except FileNotFoundError:
+        return {}
+    if _users_cache[0] != mtime:
+        _users_cache = (mtime, _load_users())
+    return _users_cache[1]
+
+
+def hash_password(password: str, salt: bytes = None, iterations: int = PBKDF2_ITERATIONS) -> str:
+    salt = salt or secrets.token_bytes(16)
+    dk = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, iterations)
+    return f"pbkdf2_sha256${iterations}${_b64e(salt)}${_b64e(dk)}"
+
+
+def _check_password(password: str, stored: str) -> bool:
+    try:
+        algo, iterations, salt, expected = stored.split("$")
+    except ValueError:
+        return False
+    if algo != "pbkdf2_sha256":
+        return False
+    dk = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), _b64d(salt), int(iterations))
+    return hmac.compare_digest(dk, _b64d(expected))
+
+
+def add_user(username: str, password: str, role: str = "estimator", team: str = None):
+    username = (username or "").strip()
+    if not username or not password:
+        raise ValueError("username and password are required")
+    if role not in ROLES:
+        raise ValueError(f"role must be one of {ROLES}")
+    users = _load_users()
+    old = users.get(username)
+    users[username] = {"password": hash_password(password), "role": role}
+    if old is not None:
+        users[username]["gen"] = old.get("gen", 0) + 1   # a password reset ends old sessions
+    if team:
+        users[username]["team"] = team
+    _save_users(users)
+
+
+def remove_user(username: str):
+    users = _load_users()
+    users.pop(username, None)
+    _save_users(users)
+
+
+def authenticate(username: str, password: str):
+    """Slow path: returns {"user", "role", "team"} if the password matches, else None."""
+    username = (username or "").strip()
+    user = _load_users().get(username)
+    if not user or not _check_password(password or "", user.get("password", "")):
+        return None
+    return {"user": username, "role": user.get("role", "estimator"), "team": user.get("team")}
+
+
+# ---------------- Session tokens ----------------
+def _sign(payload: str) -> str:
+    return _b64e(hmac.new(_secret(), payload.encode("utf-8"), hashlib.sha256).digest())
+
+
+def make_token(username: str, role: str, team: str = None, ttl: int = TOKEN_TTL_SECONDS) -> str:
+    gen = _users().get(username, {}).get("gen", 0)
+    data = {"u": username, "r": role, "g": team, "n": gen, "j": secrets.token_urlsafe(12),
+            "exp": int(time.time()) + ttl}
+    payload = _b64e(json.dumps(data).encode("utf-8"))
+    return f"{payload}.{_sign(payload)}"
+
+
+def _token_data(token: str):
+    """The signed, unexpired payload of token, else None."""
+    if not token or "." not in token:
+        return None
+    payload, sig = token.rsplit(".", 1)
+    if not hmac.compare_digest(sig, _sign(payload)):
+        return None
+    try:
+        data = json.loads(_b64d(payload))
+    except (ValueError, json.JSONDecodeError):
+        return None
+    if not isinstance(data, dict) or data.get("exp", 0) < time.time():
+        return None
+    return data
+
+
+def check_token(token: str):
+    """Fast path: returns {"user", "role", "team"} for a valid, unexpired token, else None."""
+    data = _token_data(token)
+    if data is None:
+        return None
+    user = _users().get(data.get("u"))
+    if user is None or data.get("n", 0) != user.get("gen", 0):
+        return None   # user removed, or tokens revoked since this one was issued
+    if data.get("j") in _revoked_ids(data["exp"]):
+        return None   # logged out
+    return {"user": data.get("u"), "role": data.get("r"), "team": data.get("g")}
+
+
+def _revoked_path(exp: float) -> str:
+    return os.path.join(REVOKED_DIR, time.strftime("%Y-%m-%d", time.gmtime(exp)) + ".txt")
+
+
+def _revoked_ids(exp: float) -> set:
+    """Ids revoked among tokens expiring on exp's day, re-read only when that file changes."""
+    path = _revoked_path(exp)
+    try:
+        info = os.stat(path)
+    except FileNotFoundError:
+        return set()
+    stamp = (info.st_mtime_ns, info.st_size)
+    hit = _revoked_cache.get(path)
+    if hit is None or hit[0] != stamp:
+        with open(path, "r", encoding="utf-8") as f:
+            hit = _revoked_cache[path] = (stamp, set(f.read().split()))
+    return hit[1]
+
+
+def revoke_token(token: str) -> None:
+    """Invalidate this one token (a logout); the user's other sessions keep working."""
+    data = _token_data(token)
+    if data is None or not data.get("j"):
+        return
+    os.makedirs(REVOKED_DIR, exist_ok=True)
+    with open(_revoked_path(data["exp"]), "a", encoding="utf-8") as f, locked(f):
+        f.write(data["j"] + "\n")
+
+    # Days whose tokens have all expired need no denylist any more
+    today = os.path.basename(_revoked_path(time.time()))
+    for name in os.listdir(REVOKED_DIR):
+        if name.endswith(".txt") and name < today:
+            try:
+                os.remove(os.path.join(REVOKED_DIR, name))
+            except OSError:
+                pass
+
+
+def revoke_tokens(username: str) -> None:
+    """Invalidate every token issued to username so far (all browsers and copied links)."""
+    users = _load_users()
+    if username in users:
+        users[username]["gen"] = users[username].get("gen", 0) + 1
+        _save_users(users)
+
+
+# ---------------- Streamlit helpers ----------------
+def current_user():
+    return st.session_state.get("user")
+
+
+def current_role():
+    return st.session_state.get("role")
+
+
+def current_team():
+    return st.session_state.get("team")
+
+
+def has_role(*roles) -> bool:
+    return st.session_state.get("authed", False) and current_role() in roles
+
+
+def logout():
+    revoke_token(st.session_state.get("auth_token"))
+    for k in ("authed", "user", "role", "team", "auth_token"):
+        st.session_state.pop(k, None)
+
+
+def _accept(session: dict, token: str):
+    st.session_state.authed = True
+    st.session_state.user = session["user"]
+    st.session_state.role = session["role"]
+    st.session_state.team = session.get("team")
+    st.session_state.auth_token = token
+
 
 def login_gate():
     if "authed" not in st.session_state:
         st.session_state.authed = False
 
-    if st.session_state.authed:
+    token = st.session_state.get("auth_token")
+    session = check_token(token)
+    if session:
+        if not st.session_state.authed:
+            _accept(session, token)
         return True
 
+    st.session_state.authed = False
+
     st.title("JBS Fence Takeoff Login")
 
     u = st.text_input("Username")
     p = st.text_input("Password", type="password")
 
     if st.button("Log in"):
-        if u in USERS and hmac.compare_digest(USERS[u], p):
-            st.session_state.authed = True
+        session = authenticate(u, p)
+        if session:
+            token = make_token(session["user"], session["role"], session["team"])
+            _accept(session, token)
             st.rerun()
         else:
             st.error("Invalid username or password.")
 
     st.stop()
 
+
+# ---------------- CLI ----------------
+# python auth.py add <username> [role] [team]
+# python auth.py remove <username>
+# python auth.py revoke <username>
+# python auth.py list
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if args[:1] == ["add"] and len(args) in (2, 3, 4):
+        pw = getpass.getpass(f"Password for {args[1]}: ")
+        add_user(args[1], pw, *args[2:])
+        print(f"Saved {args[1]}.")
+    elif args[:1] == ["remove"] and len(args) == 2:
+        remove_user(args[1])
+        print(f"Removed {args[1]}.")
+    elif args[:1] == ["revoke"] and len(args) == 2:
+        revoke_tokens(args[1])
+        print(f"Signed {args[1]} out everywhere.")
+    elif args[:1] == ["list"]:
+        for name, user in _load_users().items():
+            print(f"{name}\t{user.get('role', '')}\t{user.get('team') or ''}")
+    else:
+        print("usage: python auth.py add <username> [role] [team] | remove <username> | revoke <username> | list")
+        sys.exit(1)
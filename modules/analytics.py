@@ -0,0 +1,147 @@
+import os
+import pickle
+import threading
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from modules import audit
+
+# Material usage across past takeoffs, read from the audit log.
+# Every "calculate" event and every run of a "project" event becomes one job row:
+#   ts, month, style, height, finish, user, job, then one float column per material row.
+# The job table is cached in data/audit/analytics.pkl together with how far into
+# each index segment it has read, so a refresh only parses events logged since.
+# Rollups are pandas group-bys over that table.
+
+CACHE_PATH = os.path.join(audit.AUDIT_DIR, "analytics.pkl")
+KEY_COLS = ["ts", "month", "style", "height", "finish", "user", "job"]
+CATEGORY_COLS = ["month", "style", "finish", "user"]
+
+_state = {"jobs": None, "units": {}, "positions": {}}
+_lock = threading.Lock()
+
+
+def _job_rows(ev):
+    d = ev.get("data") or {}
+    base = {
+        "ts": ev["ts"],
+        "month": datetime.fromtimestamp(ev["ts"]).strftime("%Y-%m"),
+        "finish": (d.get("finish") or "").strip().upper() or "UNSPEC",
+        "user": ev["user"],
+    }
+    if ev["kind"] == "calculate":
+        job = d.get("job") or ev["ref"]
+        yield {**base, "style": "chainlink", "height": (d.get("spec") or {}).get("height") or 0,
+               "job": job}, d.get("items_by_row") or {}
+    else:
+        for i, (run, items) in enumerate(zip(d.get("runs") or [], d.get("run_items") or [])):
+            job = f"{d.get('job') or ev['ref']} #{i + 1}"
+            yield {**base, "style": run.get("style", ""), "height": (run.get("spec") or {}).get("height") or 0,
+                   "job": job}, items or {}
+
+
+def _frame(events, units: dict) -> pd.DataFrame:
+    keys, qtys = [], []
+    for ev in events:
+        for key, items in _job_rows(ev):
+            q = {}
+            for row, data in items.items():
+                if data.get("qty") in ("", None):
+                    continue
+                q[row] = float(data["qty"])
+                units.setdefault(row, data.get("unit", ""))
+            keys.append(key)
+            qtys.append(q)
+    if not keys:
+        return pd.DataFrame(columns=KEY_COLS)
+    df = pd.concat([pd.DataFrame(keys), pd.DataFrame(qtys).astype("float32")], axis=1)
+    df["height"] = df["height"].astype("int16")
+    return _categorize(df)
+
+
+def _categorize(df: pd.DataFrame) -> pd.DataFrame:
+    for col in CATEGORY_COLS:
+        df[col] = df[col].astype("category")
+    return df
+
+
+def _load_cache():
+    try:
+        with open(CACHE_PATH, "rb") as f:
+            state = pickle.load(f)
+        if set(state) == set(_state):
+            _state.update(state)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+        pass
+
+
+def _save_cache():
+    os.makedirs(os.path.dirname(CACHE_PATH) or ".", exist_ok=True)
+    tmp = f"{CACHE_PATH}.{os.getpid()}.{threading.get_ident()}.tmp"   # concurrent sessions each write their own
+    with open(tmp, "wb") as f:
+        pickle.dump(_state, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, CACHE_PATH)
+
+
+def jobs() -> pd.DataFrame:
+    """The job table, brought up to date with anything logged since the last call."""
+    with _lock:
+        if _state["jobs"] is None:
+            _load_cache()
+        new = []
+        for kind in ("calculate", "project"):
+            positions = _state["positions"].setdefault(kind, {})
+            new.extend(audit.iter_events(kind=kind, positions=positions))
+        if new or _state["jobs"] is None:
+            frame = _frame(sorted(new, key=lambda e: e["ts"]), _state["units"])
+            if _state["jobs"] is None or _state["jobs"].empty:
+                _state["jobs"] = frame
+            elif not frame.empty:
+                as_str = {c: object for c in CATEGORY_COLS}
+                _state["jobs"] = _categorize(pd.concat([_state["jobs"].astype(as_str), frame.astype(as_str)],
+                                                       ignore_index=True))
+            if new:
+                _save_cache()
+        return _state["jobs"]
+
+
+def units() -> dict:
+    return dict(_state["units"])
+
+
+def materials(df: pd.DataFrame) -> list[str]:
+    return [c for c in df.columns if c not in KEY_COLS]
+
+
+def rollup(df: pd.DataFrame, by=("month", "height", "finish"), rows: list = None,
+           style: str = None, since: str = None, until: str = None) -> pd.DataFrame:
+    """
+    Sum material quantities per group. A job recalculated several times counts
+    once (its latest calculation). since/until are "YYYY-MM" months, inclusive.
+    """
+    if df.empty:
+        return pd.DataFrame(columns=list(by) + ["jobs"])
+    df = df.drop_duplicates(subset=["job", "user"], keep="last")
+    mask = np.ones(len(df), dtype=bool)
+    if style:
+        mask &= (df["style"] == style).to_numpy()
+    if since:
+        mask &= (df["month"].astype(str) >= since).to_numpy()
+    if until:
+        mask &= (df["month"].astype(str) <= until).to_numpy()
+    df = df[mask]
+    rows = [r for r in (rows or materials(df)) if r in df.columns]
+    grouped = df.groupby(list(by), observed=True)
+    out = grouped[rows].sum(min_count=1)
+    out.insert(0, "jobs", grouped.size())
+    return out.dropna(how="all", subset=rows).reset_index()
+
+
+def reset() -> None:
+    """Forget the cache and rebuild from the audit log on the next call."""
+    with _lock:
+        _state.update({"jobs": None, "units": {}, "positions": {}})
+        if os.path.exists(CACHE_PATH):
+            os.remove(CACHE_PATH)
@@ -0,0 +1,211 @@
+import argparse
+import atexit
+import glob
+import json
+import os
+import queue
+import struct
+import sys
+import threading
+import time
+import zlib
+from datetime import datetime
+
+from modules.filelock import locked
+
+# Append-only audit log of calculations and exports.
+# Events go onto a queue and a background thread writes them, so the UI never
+# waits on disk. Storage is segmented under data/audit/:
+#   <YYYYMM>-<seq>.log   records: header + zlib-compressed JSON payload
+#   <YYYYMM>-<seq>.idx   one fixed-size entry per record (offset, time, kind, user)
+# Segments rotate monthly and when they pass MAX_SEGMENT_BYTES. Scans and
+# filters read only the .idx files and seek into .log for the payloads they need.
+# Several processes (Streamlit workers, CLI runs) may append to the same segment;
+# each batch is written under an exclusive lock on the .log, so index offsets
+# always point at that batch's own records.
+
+AUDIT_DIR = os.path.join("data", "audit")
+MAX_SEGMENT_BYTES = 16 * 1024 * 1024
+
+KINDS = ["calculate", "project", "pdf", "xlsx"]
+
+_REC = struct.Struct("<IId B")        # payload length, crc32, timestamp, kind
+_IDX = struct.Struct("<QId B 32s")    # record offset, payload length, timestamp, kind, user
+
+
+# ---------------- Writing ----------------
+class _Writer:
+    def __init__(self, root):
+        self.root = root
+        self.q = queue.Queue()
+        self.thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+        self.thread.start()
+
+    def _segment(self, ts: float):
+        month = datetime.fromtimestamp(ts).strftime("%Y%m")
+        existing = sorted(glob.glob(os.path.join(self.root, f"{month}-*.log")))
+        seq = int(os.path.basename(existing[-1])[7:-4]) if existing else 1
+        path = os.path.join(self.root, f"{month}-{seq:04d}")
+        if os.path.exists(path + ".log") and os.path.getsize(path + ".log") >= MAX_SEGMENT_BYTES:
+            path = os.path.join(self.root, f"{month}-{seq + 1:04d}")
+        return path
+
+    def _write(self, batch):
+        os.makedirs(self.root, exist_ok=True)
+        by_segment = {}
+        for ev in batch:
+            by_segment.setdefault(self._segment(ev[0]), []).append(ev)
+        for path, events in by_segment.items():
+            with open(path + ".log", "ab") as log, open(path + ".idx", "ab") as idx, locked(log):
+                offset = os.fstat(log.fileno()).st_size
+                recs, entries = [], []
+                for ts, kind, user, payload in events:
+                    recs.append(_REC.pack(len(payload), zlib.crc32(payload), ts, kind) + payload)
+                    entries.append(_IDX.pack(offset, len(payload), ts, kind, user.encode("utf-8")[:32]))
+                    offset += _REC.size + len(payload)
+                # Record data first, index second: an index entry never points past the log
+                log.write(b"".join(recs))
+                log.flush()
+                idx.write(b"".join(entries))
+                idx.flush()
+
+    def _run(self):
+        while True:
+            batch = [self.q.get()]
+            while True:
+                try:
+                    batch.append(self.q.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._write(batch)
+            except OSError as e:
+                print(f"audit: write failed: {e}", file=sys.stderr)
+            finally:
+                for _ in batch:
+                    self.q.task_done()
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def _get_writer():
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = _Writer(AUDIT_DIR)
+                atexit.register(flush)
+    return _writer
+
+
+def log_event(kind: str, user: str, **data) -> None:
+    """Queue one event. data must be JSON-serializable (inputs, items_by_row, project meta...)."""
+    if kind not in KINDS:
+        raise ValueError(f"unknown audit event kind: {kind}")
+    payload = zlib.compress(json.dumps(data, separators=(",", ":"), default=str).encode("utf-8"))
+    _get_writer().q.put((time.time(), KINDS.index(kind), user or "", payload))
+
+
+def flush() -> None:
+    """Block until every queued event is on disk."""
+    if _writer is not None:
+        _writer.q.join()
+
+
+# ---------------- Reading ----------------
+def segments(root: str = AUDIT_DIR) -> list[str]:
+    return sorted(p[:-4] for p in glob.glob(os.path.join(root, "*.idx")))
+
+
+def _read_payload(log, offset: int, length: int):
+    log.seek(offset)
+    head = log.read(_REC.size)
+    if len(head) < _REC.size:
+        return None
+    n, crc, _, _ = _REC.unpack(head)
+    payload = log.read(n)
+    if n != length or len(payload) != n or zlib.crc32(payload) != crc:
+        return None
+    return json.loads(zlib.decompress(payload))
+
+
+def iter_events(since: float = None, until: float = None, kind: str = None, user: str = None,
+                with_payload: bool = True, root: str = AUDIT_DIR, positions: dict = None):
+    """
+    Yields {"ts", "kind", "user", "ref", "data"?} oldest first. Filters run on the
+    index, so payloads are only read for matching events.
+    positions: {segment: index bytes already read}; only newer entries are read and
+    the dict is updated in place, so a caller can tail the log incrementally.
+    """
+    kind_code = KINDS.index(kind) if kind else None
+    month_lo = datetime.fromtimestamp(since).strftime("%Y%m") if since else None
+    month_hi = datetime.fromtimestamp(until).strftime("%Y%m") if until else None
+    for seg in segments(root):
+        month = os.path.basename(seg)[:6]
+        if (month_lo and month < month_lo) or (month_hi and month > month_hi):
+            continue
+        start = (positions or {}).get(os.path.basename(seg), 0)
+        with open(seg + ".idx", "rb") as f:
+            f.seek(start)
+            raw = f.read()
+        usable = len(raw) - len(raw) % _IDX.size
+        if positions is not None:
+            positions[os.path.basename(seg)] = start + usable
+        log = open(seg + ".log", "rb") if with_payload else None
+        try:
+            for offset, length, ts, k, u in _IDX.iter_unpack(raw[:usable]):
+                if (since and ts < since) or (until and ts > until) or (kind_code is not None and k != kind_code):
+                    continue
+                name = u.rstrip(b"\0").decode("utf-8", "replace")
+                if user and name != user:
+                    continue
+                ev = {"ts": ts, "kind": KINDS[k] if k < len(KINDS) else str(k), "user": name,
+                      "ref": f"{os.path.basename(seg)}:{offset}"}
+                if log is not None:
+                    ev["data"] = _read_payload(log, offset, length)
+                yield ev
+        finally:
+            if log is not None:
+                log.close()
+
+
+def get_event(ref: str, root: str = AUDIT_DIR):
+    """ref is "<segment>:<offset>" as returned by iter_events."""
+    seg, offset = ref.rsplit(":", 1)
+    with open(os.path.join(root, seg + ".log"), "rb") as log:
+        log.seek(int(offset))
+        head = log.read(_REC.size)
+        n, _, ts, k = _REC.unpack(head)
+        return {"ts": ts, "kind": KINDS[k], "ref": ref, "data": _read_payload(log, int(offset), n)}
+
+
+# ---------------- CLI ----------------
+def _parse_date(s):
+    return datetime.strptime(s, "%Y-%m-%d").timestamp() if s else None
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m modules.audit")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    ls = sub.add_parser("list", help="list events (index only)")
+    ls.add_argument("--since", help="YYYY-MM-DD")
+    ls.add_argument("--until", help="YYYY-MM-DD")
+    ls.add_argument("--kind", choices=KINDS)
+    ls.add_argument("--user")
+    show = sub.add_parser("show", help="print one event as JSON")
+    show.add_argument("ref")
+    args = ap.parse_args(argv)
+
+    if args.cmd == "list":
+        for ev in iter_events(_parse_date(args.since), _parse_date(args.until), args.kind, args.user,
+                              with_payload=False):
+            print(f"{datetime.fromtimestamp(ev['ts']):%Y-%m-%d %H:%M:%S}  {ev['kind']:<10} {ev['user']:<16} {ev['ref']}")
+    else:
+        print(json.dumps(get_event(args.ref), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
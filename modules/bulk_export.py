@@ -0,0 +1,153 @@
+import argparse
+import csv
+import io
+import os
+import sys
+import tempfile
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from modules import revisions
+from modules.pdf_export import DEFAULT_ROWS, PROFILES, export_chainlink_order_form_pdf_bytes, render_order_forms
+from modules.xlsx_io import export_order_form_xlsx_bytes
+
+# Bulk export: the latest revision of many saved jobs in one ZIP.
+#   python -m modules.bulk_export OUT.zip [JOB ...] [--all] [--xlsx] [--combined] [--profile compact] [-j N]
+# (OUT "-" = stdout). --combined puts every job's form in one PDF instead of one
+# PDF per job; with the compact profile its pages share a single copy of the layout.
+# Jobs render in worker processes; each finished file is written into the
+# archive in CHUNK-sized pieces and dropped, and at most WINDOW files per worker
+# are in flight, so memory stays flat however many jobs are in the package.
+# The archive goes straight to a file (or pipe); nothing is built up in memory.
+
+FORMATS = ["pdf", "xlsx"]
+CHUNK = 64 * 1024
+WINDOW = 2   # renders queued ahead per worker
+
+
+def _file_stem(job: str) -> str:
+    return revisions._safe_name(job).replace(" ", "_")
+
+
+def render_job(job: str, fmt: str = "pdf", profile: str = "standard"):
+    """-> (job, rev, bytes) for the job's latest revision. Runs in a worker; only the name is sent over."""
+    rec = revisions.latest(job)
+    if rec is None:
+        return job, None, b""
+    meta = {"job_name": job, **rec["meta"]}
+    if fmt == "xlsx":
+        data = export_order_form_xlsx_bytes(meta, rec["items_by_row"])
+    else:
+        data = export_chainlink_order_form_pdf_bytes(project=meta, items_by_row=rec["items_by_row"], profile=profile)
+    return job, rec["rev"], data
+
+
+def _renders(tasks, workers: int, profile: str):
+    """Yields render_job results in task order, keeping at most workers * WINDOW in flight."""
+    if workers <= 1:
+        for job, fmt in tasks:
+            yield fmt, render_job(job, fmt, profile)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for job, fmt in tasks:
+            pending.append((fmt, pool.submit(render_job, job, fmt, profile)))
+            if len(pending) >= workers * WINDOW:
+                fmt_done, fut = pending.popleft()
+                yield fmt_done, fut.result()
+        while pending:
+            fmt_done, fut = pending.popleft()
+            yield fmt_done, fut.result()
+
+
+def combined_pdf(jobs: list[str], profile: str = "standard") -> tuple[bytes, dict]:
+    """Every job's latest revision as one page of a single PDF -> (bytes, render report)."""
+    forms = []
+    for job in jobs:
+        rec = revisions.latest(job)
+        if rec is not None:
+            forms.append({"project": {"job_name": job, **rec["meta"]}, "title": "CHAINLINK",
+                          "rows": DEFAULT_ROWS, "items_by_row": rec["items_by_row"]})
+    return render_order_forms(forms, profile)
+
+
+def _write_member(zf, name: str, data: bytes) -> None:
+    with zf.open(name, "w") as member:
+        view = memoryview(data)
+        for i in range(0, len(view), CHUNK):
+            member.write(view[i:i + CHUNK])
+
+
+def write_zip(jobs: list[str], out, formats=("pdf",), workers: int = None, profile: str = "standard",
+              combined: bool = False) -> list[dict]:
+    """
+    Streams the package into out (a path or a writable binary file, seekable or not).
+    Returns the manifest, one row per file; it's also written into the archive as index.csv.
+    """
+    per_job = [f for f in formats if not (combined and f == "pdf")]
+    tasks = [(job, fmt) for job in jobs for fmt in per_job]
+    workers = max(1, min(workers or os.cpu_count() or 1, len(tasks) or 1))
+    manifest = []
+    with zipfile.ZipFile(out, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for fmt, (job, rev, data) in _renders(tasks, workers, profile):
+            if rev is None:
+                continue
+            name = f"{_file_stem(job)}.{fmt}"
+            _write_member(zf, name, data)
+            manifest.append({"file": name, "job": job, "revision": rev, "bytes": len(data)})
+
+        if combined and "pdf" in formats:
+            data, report = combined_pdf(jobs, profile)
+            name = f"All_{report['pages']}_jobs.pdf"
+            _write_member(zf, name, data)
+            manifest.append({"file": name, "job": f"{report['pages']} jobs", "revision": "", "bytes": len(data)})
+
+        index = io.StringIO()
+        w = csv.DictWriter(index, fieldnames=["file", "job", "revision", "bytes"])
+        w.writeheader()
+        w.writerows(manifest)
+        zf.writestr("index.csv", index.getvalue())
+    return manifest
+
+
+def zip_to_tempfile(jobs: list[str], formats=("pdf",), workers: int = None, profile: str = "standard",
+                    combined: bool = False):
+    """The package in an unnamed temp file on disk, rewound; for handing to a download button."""
+    f = tempfile.TemporaryFile(prefix="jbs-bulk-", suffix=".zip")
+    write_zip(jobs, f, formats, workers, profile, combined)
+    f.seek(0)
+    return f
+
+
+def package_name(n_jobs: int) -> str:
+    return f"JBS_Order_Forms_{n_jobs}_jobs_{datetime.now():%Y%m%d_%H%M}.zip"
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m modules.bulk_export")
+    ap.add_argument("out", help='zip file to write, or "-" for stdout')
+    ap.add_argument("jobs", nargs="*")
+    ap.add_argument("--all", action="store_true", help="every job with a saved revision")
+    ap.add_argument("--xlsx", action="store_true", help="include the XLSX order form too")
+    ap.add_argument("--combined", action="store_true", help="one PDF with a page per job")
+    ap.add_argument("--profile", choices=list(PROFILES), default="standard")
+    ap.add_argument("-j", "--workers", type=int, default=None)
+    args = ap.parse_args(argv)
+
+    jobs = revisions.jobs() if args.all else args.jobs
+    if not jobs:
+        ap.error("name some jobs or pass --all")
+    formats = FORMATS if args.xlsx else ["pdf"]
+    out = sys.stdout.buffer if args.out == "-" else args.out
+    manifest = write_zip(jobs, out, formats, args.workers, args.profile, args.combined)
+    missing = [j for j in jobs if revisions.latest(j) is None]
+    print(f"Wrote {len(manifest)} files for {len(jobs) - len(missing)} jobs to {args.out}", file=sys.stderr)
+    if missing:
+        print(f"No saved revisions for: {', '.join(missing)}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,381 @@
+import argparse
+import hashlib
+import hmac
+import json
+import os
+import pickle
+import socket
+import socketserver
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlparse
+
+from modules.keys import derived_key
+
+# Shared cache for suggestions, takeoff results and generated files.
+# Pick a backend with JBS_CACHE:
+#   lru                      in-process LRU (default; one per worker)
+#   sqlite:///data/cache.db  on-disk, shared by every worker on the host
+#   redis://host:6379/0      any Redis-protocol server, shared across hosts
+# Values are pickled, HMAC-signed with a key derived from the session secret
+# (JBS_SESSION_SECRET, so every host sharing a backend must share it) and
+# namespaced. An entry whose signature doesn't match its key is never unpickled;
+# it counts as a miss. invalidate(ns) bumps the namespace's generation counter,
+# so every worker stops seeing old entries at once; they age out by TTL. A
+# backend that's down (connection, OS or database errors) counts as a miss;
+# anything else is a bug and raises.
+# `python -m modules.cache serve` runs a small Redis-protocol stand-in server.
+
+DEFAULT_URL = "lru"
+LRU_MAX_ENTRIES = 2048
+RETRY_AFTER = 30.0   # seconds to skip a backend after it fails
+
+
+# ---------------- Backends ----------------
+class BackendError(Exception):
+    """The cache server answered with an error reply."""
+
+
+class LRUBackend:
+    def __init__(self, max_entries: int = LRU_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._data = OrderedDict()   # key -> (expires or None, value)
+        self._lock = threading.Lock()
+
+    def _live(self, key):
+        hit = self._data.get(key)
+        if hit is None:
+            return None
+        if hit[0] is not None and hit[0] < time.time():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return hit
+
+    def get(self, key):
+        with self._lock:
+            hit = self._live(key)
+            return hit[1] if hit else None
+
+    def set(self, key, value: bytes, ttl: float = None):
+        with self._lock:
+            self._data[key] = (time.time() + ttl if ttl else None, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def incr(self, key) -> int:
+        with self._lock:
+            hit = self._live(key)
+            n = int(hit[1]) + 1 if hit else 1
+            self._data[key] = (None, str(n).encode())
+            return n
+
+
+class SQLiteBackend:
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._local = threading.local()
+        with self._conn() as db:
+            db.execute("CREATE TABLE IF NOT EXISTS kv (key TEXT PRIMARY KEY, value BLOB, expires REAL)")
+
+    def _conn(self):
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = self._local.db = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+        return db
+
+    def get(self, key):
+        row = self._conn().execute("SELECT value, expires FROM kv WHERE key = ?", (key,)).fetchone()
+        if row is None or (row[1] is not None and row[1] < time.time()):
+            return None
+        return row[0]
+
+    def set(self, key, value: bytes, ttl: float = None):
+        self._conn().execute("INSERT OR REPLACE INTO kv VALUES (?, ?, ?)",
+                             (key, value, time.time() + ttl if ttl else None))
+
+    def delete(self, key):
+        self._conn().execute("DELETE FROM kv WHERE key = ?", (key,))
+
+    def incr(self, key) -> int:
+        db = self._conn()
+        db.execute("INSERT INTO kv VALUES (?, '1', NULL) "
+                   "ON CONFLICT(key) DO UPDATE SET value = CAST(CAST(value AS INTEGER) + 1 AS TEXT)", (key,))
+        return int(db.execute("SELECT value FROM kv WHERE key = ?", (key,)).fetchone()[0])
+
+    def purge_expired(self) -> int:
+        return self._conn().execute("DELETE FROM kv WHERE expires IS NOT NULL AND expires < ?",
+                                    (time.time(),)).rowcount
+
+
+def _resp_encode(*args) -> bytes:
+    out = [b"*%d\r\n" % len(args)]
+    for a in args:
+        a = a if isinstance(a, bytes) else str(a).encode()
+        out.append(b"$%d\r\n%s\r\n" % (len(a), a))
+    return b"".join(out)
+
+
+def _resp_read(f):
+    line = f.readline()
+    if not line:
+        raise ConnectionError("connection closed")
+    kind, rest = line[:1], line[1:-2]
+    if kind == b"+":
+        return rest
+    if kind == b"-":
+        raise BackendError(rest.decode())
+    if kind == b":":
+        return int(rest)
+    if kind == b"$":
+        n = int(rest)
+        if n < 0:
+            return None
+        data = f.read(n + 2)
+        return data[:-2]
+    if kind == b"*":
+        n = int(rest)
+        return None if n < 0 else [_resp_read(f) for _ in range(n)]
+    raise BackendError(f"bad reply: {line!r}")
+
+
+class RedisBackend:
+    """Minimal RESP client (GET / SET PX / DEL / INCR); one connection per thread."""
+
+    def __init__(self, host="127.0.0.1", port=6379, db=0, password=None, timeout=1.0):
+        self.addr = (host, port)
+        self.db, self.password, self.timeout = db, password, timeout
+        self._local = threading.local()
+
+    def _conn(self):
+        f = getattr(self._local, "f", None)
+        if f is None:
+            sock = socket.create_connection(self.addr, timeout=self.timeout)
+            f = self._local.f = sock.makefile("rwb")
+            if self.password:
+                self._call("AUTH", self.password)
+            if self.db:
+                self._call("SELECT", self.db)
+        return f
+
+    def _call(self, *args):
+        f = self._conn()
+        try:
+            f.write(_resp_encode(*args))
+            f.flush()
+            return _resp_read(f)
+        except (OSError, BackendError):
+            self._local.f = None
+            raise
+
+    def get(self, key):
+        return self._call("GET", key)
+
+    def set(self, key, value: bytes, ttl: float = None):
+        if ttl:
+            self._call("SET", key, value, "PX", int(ttl * 1000))
+        else:
+            self._call("SET", key, value)
+
+    def delete(self, key):
+        self._call("DEL", key)
+
+    def incr(self, key) -> int:
+        return self._call("INCR", key)
+
+
+def backend_from_url(url: str):
+    if not url or url == "lru":
+        return LRUBackend()
+    u = urlparse(url)
+    if u.scheme == "sqlite":
+        # sqlite:///relative/path, sqlite:////absolute/path
+        return SQLiteBackend(u.path[1:] or os.path.join("data", "cache.db"))
+    if u.scheme == "redis":
+        return RedisBackend(u.hostname or "127.0.0.1", u.port or 6379, int((u.path or "/0")[1:] or 0), u.password)
+    raise ValueError(f"unknown cache backend: {url}")
+
+
+# ---------------- Namespaced cache ----------------
+class Cache:
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = self.misses = self.errors = self.rejected = 0
+        self._down_until = 0.0
+        self._sign_key = None
+
+    def _safe(self, fn, *args, default=None):
+        # After a failure the backend is left alone for a while, so an unreachable
+        # server costs one timeout rather than one per lookup
+        if self._down_until > time.time():
+            return default
+        try:
+            return fn(*args)
+        except (OSError, sqlite3.OperationalError, BackendError):
+            self.errors += 1
+            self._down_until = time.time() + RETRY_AFTER
+            return default
+
+    def _gen(self, ns: str) -> str:
+        v = self._safe(self.backend.get, f"gen:{ns}") or b"0"
+        return v.decode() if isinstance(v, bytes) else str(v)
+
+    def key(self, ns: str, parts) -> str:
+        blob = json.dumps(parts, sort_keys=True, default=str, separators=(",", ":")).encode()
+        return f"{ns}:{self._gen(ns)}:{hashlib.sha1(blob).hexdigest()}"
+
+    # ---- signed payloads: sha256(key + pickle) || pickle ----
+    def _sig(self, key: str, blob: bytes) -> bytes:
+        if self._sign_key is None:
+            self._sign_key = derived_key("cache")
+        return hmac.new(self._sign_key, key.encode("utf-8") + b"\0" + blob, hashlib.sha256).digest()
+
+    def _dumps(self, key: str, value) -> bytes:
+        blob = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        return self._sig(key, blob) + blob
+
+    def _loads(self, key: str, raw: bytes):
+        """(True, value) for a correctly signed entry, else (False, None)."""
+        sig, blob = raw[:32], raw[32:]
+        if len(sig) < 32 or not hmac.compare_digest(sig, self._sig(key, blob)):
+            self.rejected += 1
+            return False, None
+        return True, pickle.loads(blob)
+
+    def get(self, ns: str, parts):
+        key = self.key(ns, parts)
+        raw = self._safe(self.backend.get, key)
+        return None if raw is None else self._loads(key, raw)[1]
+
+    def set(self, ns: str, parts, value, ttl: float = None):
+        key = self.key(ns, parts)
+        self._safe(self.backend.set, key, self._dumps(key, value), ttl)
+
+    def cached(self, ns: str, parts, compute, ttl: float = None):
+        """compute() on a miss; parts is any JSON-able description of the inputs."""
+        key = self.key(ns, parts)
+        raw = self._safe(self.backend.get, key)
+        if raw is not None:
+            ok, value = self._loads(key, raw)
+            if ok:
+                self.hits += 1
+                return value
+        self.misses += 1
+        value = compute()
+        self._safe(self.backend.set, key, self._dumps(key, value), ttl)
+        return value
+
+    def invalidate(self, ns: str) -> None:
+        self._safe(self.backend.incr, f"gen:{ns}")
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> Cache:
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = Cache(backend_from_url(os.environ.get("JBS_CACHE", DEFAULT_URL)))
+    return _cache
+
+
+def cached(ns: str, parts, compute, ttl: float = None):
+    return get_cache().cached(ns, parts, compute, ttl)
+
+
+def invalidate(ns: str) -> None:
+    get_cache().invalidate(ns)
+
+
+def generation(ns: str) -> str:
+    """ns's current generation, for keys that depend on more than one namespace."""
+    return get_cache()._gen(ns)
+
+
+# ---------------- Stand-in server ----------------
+class _RespHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        store = self.server.store
+        while True:
+            try:
+                cmd = _resp_read(self.rfile)
+            except (ConnectionError, OSError):
+                return
+            name, args = cmd[0].upper(), cmd[1:]
+            try:
+                if name == b"PING":
+                    reply = b"+PONG\r\n"
+                elif name == b"GET":
+                    v = store.get(args[0].decode())
+                    reply = b"$-1\r\n" if v is None else b"$%d\r\n%s\r\n" % (len(v), v)
+                elif name == b"SET":
+                    ttl = None
+                    if len(args) >= 4 and args[2].upper() in (b"PX", b"EX"):
+                        ttl = int(args[3]) / (1000 if args[2].upper() == b"PX" else 1)
+                    store.set(args[0].decode(), args[1], ttl)
+                    reply = b"+OK\r\n"
+                elif name == b"DEL":
+                    for k in args:
+                        store.delete(k.decode())
+                    reply = b":%d\r\n" % len(args)
+                elif name == b"INCR":
+                    reply = b":%d\r\n" % store.incr(args[0].decode())
+                elif name in (b"SELECT", b"AUTH"):
+                    reply = b"+OK\r\n"
+                elif name == b"FLUSHDB":
+                    store.__init__(store.max_entries)
+                    reply = b"+OK\r\n"
+                else:
+                    reply = b"-ERR unknown command\r\n"
+            except (IndexError, ValueError):
+                reply = b"-ERR bad arguments\r\n"
+            self.wfile.write(reply)
+            self.wfile.flush()
+
+
+class StandInServer(socketserver.ThreadingTCPServer):
+    """Redis-protocol server backed by an LRUBackend. For tests and single-host setups."""
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host="127.0.0.1", port=6390, max_entries=100_000):
+        self.store = LRUBackend(max_entries)
+        super().__init__((host, port), _RespHandler)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m modules.cache")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("serve", help="run the Redis-protocol stand-in server")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=6390)
+    sub.add_parser("purge", help="drop expired entries from a sqlite backend")
+    args = ap.parse_args(argv)
+
+    if args.cmd == "serve":
+        with StandInServer(args.host, args.port) as srv:
+            print(f"cache server on {args.host}:{args.port}")
+            srv.serve_forever()
+    else:
+        backend = get_cache().backend
+        if isinstance(backend, SQLiteBackend):
+            print(f"purged {backend.purge_expired()} entries")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
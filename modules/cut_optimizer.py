@@ -0,0 +1,162 @@
+import bisect
+import math
+from dataclasses import dataclass, field
+
+# Cutting-stock for rails, pipe and wire rolls.
+# Each requested piece (a span of rail, a strand of wire, ...) longer than the stock
+# takes whole sticks/rolls first; the remainders are then packed together so offcuts
+# from one run feed the next. Best Fit Decreasing handles any size of project; small
+# remainder sets are re-solved exactly by branch and bound.
+
+RAIL_STOCK_FT = 21.0
+BARB_ROLL_FT = 1320.0
+EXACT_MAX_PIECES = 14
+EXACT_MAX_NODES = 200_000     # search budget; the best plan found so far is kept
+_EPS = 1e-6
+
+
+@dataclass
+class CutPlan:
+    stock_length: float
+    full_sticks: int = 0                          # whole sticks used as-is inside long pieces
+    sticks: list = field(default_factory=list)    # cut sticks: list of piece lengths each
+    naive_count: int = 0                          # sticks if every piece were rounded up on its own
+    method: str = "bfd"
+
+    @property
+    def count(self) -> int:
+        return self.full_sticks + len(self.sticks)
+
+    @property
+    def ordered_ft(self) -> float:
+        return self.count * self.stock_length
+
+    @property
+    def waste_ft(self) -> float:
+        return sum(self.stock_length - sum(s) for s in self.sticks)
+
+    @property
+    def waste_pct(self) -> float:
+        return 100.0 * self.waste_ft / self.ordered_ft if self.count else 0.0
+
+    def summary(self) -> str:
+        saved = self.naive_count - self.count
+        txt = f"{self.count} x {self.stock_length:g}' — waste {self.waste_ft:,.1f} ft ({self.waste_pct:.1f}%)"
+        if saved > 0:
+            txt += f", {saved} fewer than rounding each run"
+        return txt
+
+
+def _split(pieces, stock):
+    """Long pieces -> (whole sticks, leftover remainders)."""
+    full = 0
+    rest = []
+    for p in pieces:
+        p = float(p)
+        if p <= _EPS:
+            continue
+        n = int(p // stock)
+        full += n
+        r = p - n * stock
+        if r > _EPS:
+            rest.append(r)
+    return full, rest
+
+
+def _best_fit_decreasing(pieces, stock, kerf):
+    # free: sorted remaining capacities, paired with bin indices
+    free = []
+    bins = []
+    for p in sorted(pieces, reverse=True):
+        need = p + kerf
+        i = bisect.bisect_left(free, (p - _EPS, -1))
+        if i < len(free):
+            cap, b = free.pop(i)
+            bins[b].append(p)
+            bisect.insort(free, (max(0.0, cap - need), b))
+        else:
+            b = len(bins)
+            bins.append([p])
+            bisect.insort(free, (max(0.0, stock - need), b))
+    return bins
+
+
+def _exact(pieces, stock, kerf, upper):
+    """Branch and bound on bin count; returns bins or None if nothing beats `upper`."""
+    pieces = sorted(pieces, reverse=True)
+    total = sum(pieces)
+    best = [None, upper]
+    caps = []
+    bins = []
+    nodes = [0]
+
+    def dfs(i, remaining):
+        nodes[0] += 1
+        if nodes[0] > EXACT_MAX_NODES:
+            return
+        if len(bins) + max(0, math.ceil((remaining - sum(caps)) / stock - _EPS)) >= best[1]:
+            return
+        if i == len(pieces):
+            best[0] = [list(b) for b in bins]
+            best[1] = len(bins)
+            return
+        p = pieces[i]
+        need = p + kerf
+        tried = set()
+        for b in range(len(bins)):
+            c = round(caps[b], 6)
+            if caps[b] >= p - _EPS and c not in tried:
+                tried.add(c)
+                old = caps[b]
+                caps[b] = max(0.0, old - need)
+                bins[b].append(p)
+                dfs(i + 1, remaining - p)
+                bins[b].pop()
+                caps[b] = old
+        if len(bins) + 1 < best[1]:
+            bins.append([p])
+            caps.append(max(0.0, stock - need))
+            dfs(i + 1, remaining - p)
+            bins.pop()
+            caps.pop()
+
+    dfs(0, total)
+    return best[0]
+
+
+def optimize_cuts(pieces, stock_length: float = RAIL_STOCK_FT, kerf: float = 0.0, exact: bool = None) -> CutPlan:
+    """
+    pieces: lengths in ft (spans, strands, ...). Returns a CutPlan.
+    exact:  None = automatic (exact when the remainders are few), True/False to force.
+    """
+    stock = float(stock_length)
+    if stock <= 0:
+        raise ValueError("stock_length must be > 0")
+
+    pieces = [float(p) for p in pieces if p and float(p) > _EPS]
+    naive = sum(math.ceil(p / stock - _EPS) for p in pieces)
+    full, rest = _split(pieces, stock)
+
+    bins = _best_fit_decreasing(rest, stock, kerf)
+    method = "bfd"
+
+    use_exact = exact if exact is not None else len(rest) <= EXACT_MAX_PIECES
+    if use_exact and rest:
+        lower = math.ceil(sum(rest) / stock - _EPS)
+        if len(bins) > lower:
+            better = _exact(rest, stock, kerf, len(bins))
+            if better is not None:
+                bins = better
+        method = "exact"
+
+    return CutPlan(stock_length=stock, full_sticks=full, sticks=bins, naive_count=naive, method=method)
+
+
+def plan_rails(spans, rails_per_span: int, stock_length: float = RAIL_STOCK_FT, **kw) -> CutPlan:
+    """Top / mid / bottom rails all cut from the same stock across every span."""
+    return optimize_cuts([s for s in spans for _ in range(max(0, rails_per_span))], stock_length, **kw)
+
+
+def plan_rolls(runs, strands: int, roll_length: float, **kw) -> CutPlan:
+    """Wire / windscreen rolls: each strand of each run is one piece; partial rolls carry over."""
+    return optimize_cuts([r for r in runs for _ in range(max(0, strands))], roll_length, **kw)
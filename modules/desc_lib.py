@@ -1,42 +1,177 @@
+import hashlib
 import json
 import os
+import re
+import threading
 
+from modules.cache import cached, invalidate
+from modules.desc_strings import normalize, pack, shared, unpack
+
+# Description library, layered by scope:
+#   user   -> data/desc_library/user/<username>.json
+#   team   -> data/desc_library/team/<team>.json
+#   global -> data/desc_library.json
+# Lookups read through user, then team, then global. Writes only touch one layer.
 LIB_PATH = os.path.join("data", "desc_library.json")
+LAYERS_DIR = os.path.join("data", "desc_library")
+SCOPES = ["user", "team", "global"]
+
+# On disk each layer is {"strings": [...], "keys": {key: [string ids]}}; in memory
+# it's {key: [desc, ...]} built from the shared string table in desc_strings.
+# path -> (mtime_ns, lib). Each layer is cached on its own and reloaded only
+# when its file changes on disk, so reruns cost a stat per layer and no JSON.
+# Only a cold load (first use in this process, or the file changed) goes to the
+# shared cache (modules.cache), keyed by the file's content hash under the
+# layer's own namespace ("desc:<path>"): the key is the same on every host, so
+# one worker's parse serves the rest. Saving a layer bumps its namespace.
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def _safe_name(name: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", str(name).strip()) or "_"
+
+
+def layer_path(scope: str, name: str = None) -> str:
+    if scope == "global":
+        return LIB_PATH
+    if scope not in SCOPES:
+        raise ValueError(f"scope must be one of {SCOPES}")
+    if not name:
+        raise ValueError(f"{scope} layer needs a name")
+    return os.path.join(LAYERS_DIR, scope, f"{_safe_name(name)}.json")
 
-def _load():
-    os.makedirs("data", exist_ok=True)
-    if not os.path.exists(LIB_PATH):
+
+def layer_paths(user: str = None, team: str = None) -> list[str]:
+    """Layer files in lookup priority order (highest first)."""
+    paths = []
+    if user:
+        paths.append(layer_path("user", user))
+    if team:
+        paths.append(layer_path("team", team))
+    paths.append(LIB_PATH)
+    return paths
+
+
+def _load(path=LIB_PATH):
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
         return {}
-    with open(LIB_PATH, "r", encoding="utf-8") as f:
-        return json.load(f)
 
-def _save(lib):
-    os.makedirs("data", exist_ok=True)
-    with open(LIB_PATH, "w", encoding="utf-8") as f:
-        json.dump(lib, f, indent=2)
+    with _cache_lock:
+        hit = _cache.get(path)
+    if hit and hit[0] == mtime:
+        return hit[1]
+
+    with open(path, "rb") as f:
+        raw = f.read()
+    digest = hashlib.sha1(raw).hexdigest()
+    lib = cached(f"desc:{path}", [digest], lambda: unpack(json.loads(raw)), ttl=3600)
+    with _cache_lock:
+        _cache[path] = (mtime, lib)
+    return lib
+
+
+def _dump(packed, f):
+    # One string / one key per line: readable in a diff without indenting every id.
+    f.write('{\n  "strings": [\n')
+    f.write(",\n".join("    " + json.dumps(s) for s in packed["strings"]))
+    f.write('\n  ],\n  "keys": {\n')
+    f.write(",\n".join(f"    {json.dumps(k)}: {json.dumps(ids)}" for k, ids in packed["keys"].items()))
+    f.write("\n  }\n}\n")
+
+
+def _save(lib, path=LIB_PATH):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    # Write aside and swap in, so a session reading mid-save never sees half a file
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        _dump(pack(lib), f)
+    os.replace(tmp, path)
+    with _cache_lock:
+        _cache[path] = (os.stat(path).st_mtime_ns, lib)
+    invalidate(f"desc:{path}")
+
 
 def make_key(style: str, height_ft: int, finish: str, category: str) -> str:
     # style example: "chainlink", "ornamental", etc.
     return f"{style}|{height_ft}|{finish}|{category}"
 
-def get_suggestions(style: str, height_ft: int, finish: str, category: str):
-    lib = _load()
+
+def get_suggestions(style: str, height_ft: int, finish: str, category: str, user: str = None, team: str = None):
     key = make_key(style, height_ft, finish, category)
-    return lib.get(key, [])
+    merged = []
+    seen = set()
+    for path in layer_paths(user, team):
+        for desc in _load(path).get(key, []):
+            if normalize(desc) not in seen:
+                seen.add(normalize(desc))
+                merged.append(shared(desc))
+    return merged
 
-def add_entry(style: str, height_ft: int, finish: str, category: str, description: str, max_entries=25):
-    description = (description or "").strip()
-    if not description:
-        return
 
-    lib = _load()
-    key = make_key(style, height_ft, finish, category)
+# Order-form row -> description category (same categories the app saves under).
+ROW_CATEGORIES = {
+    "FABRIC": "fabric",
+    "LINE POST": "posts",
+    "CORNER POST": "posts",
+    "GATE POST": "posts",
+    "LINE POST CAP": "caps",
+    "CORNER POST CAPS": "caps",
+    "GATE POST CAPS": "caps",
+    "TIES LINE POST": "ties",
+    "TIES TOP RAIL": "ties",
+    "TOP RAIL": "rails",
+    "TENSION BARS": "fittings",
+    "BRACE BANDS": "fittings",
+    "TENSION BANDS": "fittings",
+    "RAIL ENDS": "fittings",
+    "LINE RAIL CLAMPS": "fittings",
+    "TRUSS ROD - 3/8 X": "fittings",
+    "TENSION WIRE": "wire",
+    "WINDSCREEN": "accessories",
+    "SS GATES": "gates",
+    "SLIDING GATES": "gates",
+    "DD GATES": "gates",
+}
+
+
+def add_entry(style: str, height_ft: int, finish: str, category: str, description: str, max_entries=25,
+              user: str = None, team: str = None, scope: str = None):
+    """
+    Saves a description into exactly one layer.
+    scope defaults to "user" when a user is given, otherwise "global".
+    """
+    add_entries([(style, height_ft, finish, category, description)], max_entries=max_entries,
+                user=user, team=team, scope=scope)
+
+
+def add_entries(entries, max_entries=25, user: str = None, team: str = None, scope: str = None) -> int:
+    """
+    Bulk version of add_entry: entries is an iterable of
+    (style, height_ft, finish, category, description). The layer is loaded and
+    written once, no matter how many entries. Returns how many were applied.
+    """
+    scope = scope or ("user" if user else "global")
+    path = layer_path(scope, user if scope == "user" else team)
+
+    lib = dict(_load(path))
+    applied = 0
+    for style, height_ft, finish, category, description in entries:
+        description = shared(description)
+        if not description:
+            continue
+        key = make_key(style, height_ft, finish, category)
+
+        # keep unique (after normalization), newest first; the newest spelling is kept
+        norm = normalize(description)
+        existing = [d for d in lib.get(key, []) if normalize(d) != norm]
+        existing.insert(0, description)
 
-    existing = lib.get(key, [])
-    # keep unique, newest first
-    if description in existing:
-        existing.remove(description)
-    existing.insert(0, description)
+        lib[key] = existing[:max_entries]
+        applied += 1
 
-    lib[key] = existing[:max_entries]
-    _save(lib)
+    if applied:
+        _save(lib, path)
+    return applied
@@ -0,0 +1,266 @@
+import argparse
+import gzip
+import json
+import os
+import sys
+import threading
+from datetime import datetime
+
+from modules.cache import invalidate
+from modules.desc_lib import LIB_PATH, SCOPES, layer_path, _load, _save
+from modules.desc_strings import dedupe, pack, shared, unpack
+
+# Maintenance CLI for the description library:
+#   python -m modules.desc_maint stats   [PATH]
+#   python -m modules.desc_maint export  OUT [--scope S --name N]
+#   python -m modules.desc_maint import  IN... [--scope S --name N] [--rule newest|ours|theirs]
+#   python -m modules.desc_maint merge   IN... --out OUT [--rule newest|ours|theirs]
+#   python -m modules.desc_maint prune   [PATH] [--dry-run]
+#   python -m modules.desc_maint compact [PATH] [--out OUT]
+# Exports are JSON Lines, one {"key", "descs"} per line after a header line,
+# optionally gzipped (.gz). Inputs are read a line at a time: exports, the
+# one-entry-per-line library layout _dump() writes, and (as a fallback) any
+# other JSON layout the library has used.
+
+MAX_ENTRIES = 25
+RULES = ["newest", "ours", "theirs"]
+FORMAT = "jbs-desc-library"
+
+
+def _open(path, mode="rt"):
+    if path.endswith(".gz"):
+        return gzip.open(path, mode, encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+# ---------------- Reading ----------------
+def source_time(path: str) -> float:
+    """When a source was last written: an export's header, else the file mtime."""
+    with _open(path) as f:
+        first = f.readline()
+    try:
+        head = json.loads(first)
+        if isinstance(head, dict) and head.get("format") == FORMAT:
+            return float(head.get("exported_at") or 0)
+    except json.JSONDecodeError:
+        pass
+    return os.path.getmtime(path)
+
+
+def iter_entries(path: str):
+    """Yields (key, [desc, ...]) without holding more than the string table in memory."""
+    with _open(path) as f:
+        first = f.readline()
+        try:
+            head = json.loads(first)
+        except json.JSONDecodeError:
+            head = None
+
+        if isinstance(head, dict) and head.get("format") == FORMAT:
+            for line in f:
+                if line.strip():
+                    rec = json.loads(line)
+                    yield rec["key"], dedupe(rec["descs"])
+            return
+
+        if first.strip() == "{" and f.readline().strip() == '"strings": [':
+            # _dump() layout: one string per line, then one key per line
+            strings = []
+            for line in f:
+                line = line.strip()
+                if line.startswith("]"):
+                    break
+                if line:
+                    strings.append(shared(json.loads(line.rstrip(","))))
+            for line in f:
+                line = line.strip().rstrip(",")
+                if not line or line in ('"keys": {', "}"):
+                    continue
+                rec = json.loads("{" + line + "}")
+                for key, ids in rec.items():
+                    yield key, dedupe(strings[i] for i in ids)
+            return
+
+    # Minified or older layouts: no line structure to stream on
+    with _open(path) as f:
+        yield from unpack(json.load(f)).items()
+
+
+def parse_key(key: str):
+    parts = key.split("|")
+    if len(parts) != 4:
+        return None
+    style, height, finish, category = parts
+    try:
+        height = int(height)
+    except ValueError:
+        return None
+    return style, height, finish, category
+
+
+def is_dead(key: str, descs) -> bool:
+    """Keys nothing will ever look up: unparseable, height 0, no finish, or no descriptions."""
+    parsed = parse_key(key)
+    if parsed is None or not descs:
+        return True
+    _, height, finish, _ = parsed
+    return height <= 0 or finish.strip().upper() in ("", "UNSPEC")
+
+
+# ---------------- Merging ----------------
+def merge_sources(paths: list[str], rule: str = "newest", base: dict = None, max_entries: int = MAX_ENTRIES) -> dict:
+    """
+    Union of every source, per key. rule decides whose descriptions lead each list:
+      newest  most recently written source first (base, if given, goes last)
+      ours    base first, then sources in the order given
+      theirs  sources (last given first), then base
+    """
+    if rule not in RULES:
+        raise ValueError(f"rule must be one of {RULES}")
+    if rule == "newest":
+        paths = sorted(paths, key=source_time, reverse=True)
+    elif rule == "theirs":
+        paths = list(reversed(paths))
+
+    out = {}
+    if rule == "ours" and base:
+        out = {k: list(v) for k, v in base.items()}
+    for path in paths:
+        for key, descs in iter_entries(path):
+            merged = out.setdefault(key, [])
+            seen = set(merged)
+            merged.extend(d for d in descs if d not in seen)
+    if rule != "ours" and base:
+        for key, descs in base.items():
+            merged = out.setdefault(key, [])
+            seen = set(merged)
+            merged.extend(d for d in descs if d not in seen)
+    return {k: v[:max_entries] for k, v in out.items()}
+
+
+# ---------------- Writing ----------------
+def write_export(lib_items, out: str) -> int:
+    n = 0
+    with _open(out, "wt") as f:
+        f.write(json.dumps({"format": FORMAT, "exported_at": datetime.now().timestamp()}) + "\n")
+        for key, descs in lib_items:
+            f.write(json.dumps({"key": key, "descs": list(descs)}, separators=(",", ":")) + "\n")
+            n += 1
+    return n
+
+
+def write_library(lib: dict, out: str, minify: bool = False) -> None:
+    """Library layout (packed string table). Minified for archives; gzipped if out ends in .gz."""
+    if not (minify or out.endswith(".gz")):
+        _save(lib, out)
+        return
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    # Same swap-in as _save(): out may be the live library that sessions are reading
+    tmp = f"{out}.{os.getpid()}.{threading.get_ident()}.tmp"
+    if out.endswith(".gz"):
+        tmp += ".gz"
+    try:
+        with _open(tmp, "wt") as f:
+            json.dump(pack(lib), f, separators=(",", ":"), ensure_ascii=False)
+        os.replace(tmp, out)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    invalidate(f"desc:{out}")
+
+
+def prune(lib_items, max_entries: int = MAX_ENTRIES):
+    """-> (kept lib, number of dead keys dropped)."""
+    kept, dropped = {}, 0
+    for key, descs in lib_items:
+        if is_dead(key, descs):
+            dropped += 1
+        else:
+            kept[key] = descs[:max_entries]
+    return kept, dropped
+
+
+# ---------------- CLI ----------------
+def _layer(args) -> str:
+    return layer_path(args.scope, args.name)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m modules.desc_maint")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    def scoped(p):
+        p.add_argument("--scope", choices=SCOPES, default="global")
+        p.add_argument("--name", help="user or team name for --scope user/team")
+
+    p = sub.add_parser("stats")
+    p.add_argument("path", nargs="?", default=LIB_PATH)
+    p = sub.add_parser("export")
+    p.add_argument("out")
+    scoped(p)
+    p = sub.add_parser("import")
+    p.add_argument("sources", nargs="+")
+    p.add_argument("--rule", choices=RULES, default="newest")
+    scoped(p)
+    p = sub.add_parser("merge")
+    p.add_argument("sources", nargs="+")
+    p.add_argument("--out", required=True)
+    p.add_argument("--rule", choices=RULES, default="newest")
+    p = sub.add_parser("prune")
+    p.add_argument("path", nargs="?", default=LIB_PATH)
+    p.add_argument("--dry-run", action="store_true")
+    p = sub.add_parser("compact")
+    p.add_argument("path", nargs="?", default=LIB_PATH)
+    p.add_argument("--out", help="write here instead (.gz to gzip); default rewrites PATH")
+    args = ap.parse_args(argv)
+
+    if args.cmd == "stats":
+        keys = entries = dead = 0
+        strings = set()
+        for key, descs in iter_entries(args.path):
+            keys += 1
+            entries += len(descs)
+            strings.update(descs)
+            dead += is_dead(key, descs)
+        print(f"{args.path}: {os.path.getsize(args.path):,} bytes, {keys} keys ({dead} dead), "
+              f"{entries} entries, {len(strings)} distinct strings")
+
+    elif args.cmd == "export":
+        n = write_export(iter_entries(_layer(args)), args.out)
+        print(f"Exported {n} keys to {args.out}")
+
+    elif args.cmd == "import":
+        path = _layer(args)
+        if args.rule == "newest" and os.path.exists(path):
+            # the layer itself competes on its mtime
+            lib = merge_sources(args.sources + [path], "newest")
+        else:
+            lib = merge_sources(args.sources, args.rule, base=_load(path))
+        _save(lib, path)
+        print(f"Imported into {path}: {len(lib)} keys")
+
+    elif args.cmd == "merge":
+        lib = merge_sources(args.sources, args.rule)
+        if args.out.endswith((".jsonl", ".jsonl.gz")):
+            write_export(lib.items(), args.out)
+        else:
+            write_library(lib, args.out)
+        print(f"Merged {len(args.sources)} sources into {args.out}: {len(lib)} keys")
+
+    elif args.cmd == "prune":
+        lib, dropped = prune(iter_entries(args.path))
+        if not args.dry_run:
+            write_library(lib, args.path)
+        print(f"{'Would drop' if args.dry_run else 'Dropped'} {dropped} dead keys; {len(lib)} kept")
+
+    elif args.cmd == "compact":
+        before = os.path.getsize(args.path)
+        lib, dropped = prune(iter_entries(args.path))
+        out = args.out or args.path
+        write_library(lib, out, minify=True)
+        print(f"{args.path}: {before:,} -> {out}: {os.path.getsize(out):,} bytes ({dropped} dead keys dropped)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
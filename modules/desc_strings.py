@@ -0,0 +1,94 @@
+import re
+import sys
+import threading
+
+# Description string table.
+# normalize() folds case, whitespace and inch/foot mark spellings so near-duplicates
+# like '4" Dome Caps' and '4" DOME CAPS' compare equal; it is only ever used as a
+# dedupe/lookup key, never shown. shared() hands back one string object per exact
+# (trimmed) spelling, so the library, items_by_row and every widget option list
+# point at the same strings instead of holding copies. The table is capped at
+# MAX_SHARED strings; past that, strings are passed through unshared.
+
+_QUOTES = str.maketrans({
+    "″": '"', "“": '"', "”": '"', "„": '"',
+    "′": "'", "‘": "'", "’": "'", "`": "'",
+})
+
+_RE_DOUBLE_TICK = re.compile(r"''")
+_RE_INCH_WORD = re.compile(r"(\d)\s*(?:inches|inch|in\.)(?![a-z])", re.IGNORECASE)
+_RE_FOOT_WORD = re.compile(r"(\d)\s*(?:feet|foot|ft\.?)(?![a-z])", re.IGNORECASE)
+_RE_MARK_SPACE = re.compile(r"(\d)\s+([\"'])")
+_RE_SPACES = re.compile(r"\s+")
+
+MAX_SHARED = 50_000
+
+_shared = {}  # exact string -> the shared copy
+_lock = threading.Lock()
+
+
+def normalize(s: str) -> str:
+    s = (s or "").translate(_QUOTES)
+    s = _RE_DOUBLE_TICK.sub('"', s)
+    s = _RE_INCH_WORD.sub(r'\1"', s)
+    s = _RE_FOOT_WORD.sub(r"\1'", s)
+    s = _RE_MARK_SPACE.sub(r"\1\2", s)
+    return _RE_SPACES.sub(" ", s).strip().casefold()
+
+
+def shared(s: str) -> str:
+    """s with surrounding whitespace trimmed, as the shared copy of that exact spelling."""
+    s = (s or "").strip()
+    if not s:
+        return ""
+    hit = _shared.get(s)
+    if hit is not None:
+        return hit
+    with _lock:
+        if len(_shared) >= MAX_SHARED:
+            return s
+        return _shared.setdefault(s, sys.intern(s))
+
+
+def dedupe(descs) -> list[str]:
+    """Order-preserving copy of descs without near-duplicates; the first spelling in descs is kept."""
+    out = []
+    seen = set()
+    for d in descs:
+        c = shared(d)
+        n = normalize(c)
+        if n and n not in seen:
+            seen.add(n)
+            out.append(c)
+    return out
+
+
+def pack(lib: dict) -> dict:
+    """{key: [desc, ...]} -> {"strings": [desc, ...], "keys": {key: [id, ...]}}"""
+    strings = []
+    ids = {}
+    keys = {}
+    for key, descs in lib.items():
+        row = []
+        for d in descs:
+            c = shared(d)
+            i = ids.get(c)
+            if i is None:
+                i = ids[c] = len(strings)
+                strings.append(c)
+            if i not in row:
+                row.append(i)
+        keys[key] = row
+    return {"strings": strings, "keys": keys}
+
+
+def unpack(data: dict) -> dict:
+    """Inverse of pack(). Also accepts the older {key: [desc, ...]} layout."""
+    if "strings" not in data or "keys" not in data:
+        return {key: dedupe(descs) for key, descs in data.items()}
+    strings = [shared(s) for s in data["strings"]]
+    return {key: dedupe(strings[i] for i in ids) for key, ids in data["keys"].items()}
+
+
+def table_size() -> int:
+    return len(_shared)
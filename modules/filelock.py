@@ -0,0 +1,44 @@
+import os
+from contextlib import contextmanager
+
+# Exclusive lock on an open file, held across processes while appending.
+# POSIX uses flock on the whole file; Windows has no flock, so msvcrt.locking
+# locks the file's first byte instead (a region past EOF is fine there). Every
+# writer of a given file goes through locked(), so the two never have to mix.
+
+if os.name == "nt":
+    import msvcrt
+
+    def _lock(f) -> None:
+        f.flush()
+        os.lseek(f.fileno(), 0, os.SEEK_SET)
+        while True:
+            try:
+                msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)   # retries for ~10 s, then raises
+                return
+            except OSError:
+                continue
+
+    def _unlock(f) -> None:
+        f.flush()
+        os.lseek(f.fileno(), 0, os.SEEK_SET)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+else:
+    import fcntl
+
+    def _lock(f) -> None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+
+    def _unlock(f) -> None:
+        f.flush()
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+@contextmanager
+def locked(f):
+    """Hold an exclusive lock on open file f (opened for writing/appending) for the block."""
+    _lock(f)
+    try:
+        yield f
+    finally:
+        _unlock(f)
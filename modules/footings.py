@@ -0,0 +1,124 @@
+import math
+
+import numpy as np
+
+from modules.quantities import Qty
+from modules.specs import od_inches
+
+# Post footings: fills the CONCRETE and QUICK ROCK order-form rows.
+# Every post class (line / corner / gate) has its own hole diameter and depth and
+# is set in concrete, quick rock (fast-setting mix) or nothing. Volume per hole is
+# the hole cylinder minus the post, times a soil factor for blow-out and waste.
+# Volumes for every run and post class are one numpy expression; the bag / yard
+# rounding happens in finalize() like any other Qty.
+
+POST_CLASSES = ("line", "corner", "gate")
+FILLS = ["concrete", "quick rock", "none"]
+
+SOIL_FACTORS = {
+    "firm": 1.0,
+    "normal": 1.1,
+    "sandy": 1.2,
+    "loose / fill": 1.35,
+}
+
+# order choice -> (order unit, cubic feet per unit)
+CONCRETE_ORDERS = {
+    "80 lb bags": ("BG", 0.60),
+    "60 lb bags": ("BG", 0.45),
+    "yards": ("YD", 27.0),
+}
+QUICK_ROCK_ORDERS = {
+    "50 lb bags": ("BG", 0.375),
+}
+
+DEFAULT_HOLES = {"line": (8, 30), "corner": (10, 36), "gate": (12, 36)}   # (diameter, depth) in inches
+
+FOOTING_DEFAULTS = {
+    "fill": {"line": "concrete", "corner": "concrete", "gate": "concrete"},
+    "dia_in": {c: DEFAULT_HOLES[c][0] for c in POST_CLASSES},
+    "depth_in": {c: DEFAULT_HOLES[c][1] for c in POST_CLASSES},
+    "post_od_in": {c: 0.0 for c in POST_CLASSES},
+    "soil": "normal",
+    "concrete_order": "80 lb bags",
+    "quick_rock_order": "50 lb bags",
+}
+
+
+def defaults_for(spec_row: dict = None, height_ft: int = 0) -> dict:
+    """
+    Footing defaults sized from a spec table row: holes three times the post OD
+    (rounded up to an even inch, 8" minimum) and as deep as the post's embedment.
+    """
+    cfg = {k: (dict(v) if isinstance(v, dict) else v) for k, v in FOOTING_DEFAULTS.items()}
+    if not spec_row:
+        return cfg
+    for cls, od_key, len_key in (("line", "line_post_od", "line_post_len"),
+                                 ("corner", "terminal_post_od", "terminal_post_len"),
+                                 ("gate", "gate_post_od", "gate_post_len")):
+        od = od_inches(spec_row.get(od_key, ""))
+        cfg["post_od_in"][cls] = od
+        if od:
+            cfg["dia_in"][cls] = max(8, 2 * math.ceil(1.5 * od))
+        embed = (spec_row.get(len_key) or 0) - (height_ft or 0)
+        if embed > 0:
+            cfg["depth_in"][cls] = embed * 12
+    return cfg
+
+
+def posts_from_quantities(q: dict) -> dict:
+    """Post counts per class from a takeoff's {row: Qty} (END POST, where a style has it, counts as corner)."""
+    def raw(row):
+        return float(q[row].raw) if q.get(row) is not None else 0.0
+    return {"line": raw("LINE POST"), "corner": raw("CORNER POST") + raw("END POST"), "gate": raw("GATE POST")}
+
+
+def hole_volumes(counts, dia_in, depth_in, post_od_in, soil) -> np.ndarray:
+    """Cubic feet of fill; all arguments broadcast together (e.g. runs x post classes)."""
+    counts, dia, depth, od = (np.asarray(a, dtype=float) for a in (counts, dia_in, depth_in, post_od_in))
+    annulus = np.pi / 4 * np.maximum(dia ** 2 - od ** 2, 0)
+    return counts * annulus * depth / 1728.0 * np.asarray(soil, dtype=float)
+
+
+def footing_quantities_many(post_counts: list, configs: list) -> list:
+    """
+    post_counts: [{class: count}], configs: [footing config or None], one per run.
+    Returns [{"CONCRETE": Qty or None, "QUICK ROCK": Qty or None}] in the same order.
+    """
+    n = len(post_counts)
+    cfgs = [{**FOOTING_DEFAULTS, **(c or {})} for c in configs]
+
+    def grid(key):
+        return np.array([[c[key].get(cls, FOOTING_DEFAULTS[key][cls]) for cls in POST_CLASSES] for c in cfgs],
+                        dtype=float).reshape(n, len(POST_CLASSES))
+
+    counts = np.array([[p.get(cls, 0) for cls in POST_CLASSES] for p in post_counts], dtype=float).reshape(n, -1)
+    soil = np.array([SOIL_FACTORS[c["soil"]] for c in cfgs], dtype=float).reshape(n, 1)
+    vol = hole_volumes(counts, grid("dia_in"), grid("depth_in"), grid("post_od_in"), soil)
+
+    fill = np.array([[c["fill"].get(cls, "none") for cls in POST_CLASSES] for c in cfgs]).reshape(n, -1)
+    concrete = np.where(fill == "concrete", vol, 0).sum(axis=1)
+    quick_rock = np.where(fill == "quick rock", vol, 0).sum(axis=1)
+
+    out = []
+    for i, c in enumerate(cfgs):
+        active = configs[i] is not None
+        cu, cy = CONCRETE_ORDERS[c["concrete_order"]]
+        qu, qy = QUICK_ROCK_ORDERS[c["quick_rock_order"]]
+        out.append({
+            "CONCRETE": Qty.volume(concrete[i], cy, cu) if active and concrete[i] > 0 else None,
+            "QUICK ROCK": Qty.volume(quick_rock[i], qy, qu) if active and quick_rock[i] > 0 else None,
+        })
+    return out
+
+
+def footing_quantities(post_counts: dict, config: dict) -> dict:
+    return footing_quantities_many([post_counts], [config])[0]
+
+
+def footing_descs(config: dict) -> dict:
+    c = {**FOOTING_DEFAULTS, **(config or {})}
+    return {
+        "CONCRETE": f"Concrete mix, {c['concrete_order']}",
+        "QUICK ROCK": f"Quick rock fast-setting mix, {c['quick_rock_order']}",
+    }
@@ -0,0 +1,290 @@
+import json
+from dataclasses import dataclass, field
+
+import numpy as np
+
+# Geometry takeoff: fence layout (polylines or GeoJSON, in feet) -> fence length,
+# corner / end / gate post counts and the spans between terminal posts.
+#
+# Every run is split into segments; each segment end is a "side" attached to a
+# post location. Locations are merged by rounded coordinate, so closed loops and
+# runs that meet at a shared point need no special handling. A run that ends on,
+# or crosses, the middle of another segment splits that segment there first, so
+# a T or X junction is a shared point too:
+#   - any gate side                          -> gate post
+#   - 1 fence side                           -> end post
+#   - 3+ fence sides                         -> corner post
+#   - 2 fence sides, turn >= angle threshold -> corner post (else a plain line post)
+# All of the per-segment and per-location math is numpy over the whole layout.
+
+DEFAULT_CORNER_ANGLE = 15.0   # degrees of direction change that needs a terminal post
+_SNAP = 100.0                 # merge points closer than 1/100 ft
+_BLOCK = 1 << 20              # junction search: candidate segment pairs per batch
+
+
+@dataclass
+class LayoutTakeoff:
+    fence_length: float = 0.0
+    corner_posts: int = 0     # true corners only
+    end_posts: int = 0
+    gate_posts: int = 0
+    gate_openings: list = field(default_factory=list)   # ft, one per gate segment
+    spans: list = field(default_factory=list)           # ft of fence between terminal posts
+
+    def to_inputs(self) -> dict:
+        """Values in the shape of the app's base inputs ("Corner Posts" is all terminals)."""
+        return {
+            "length": round(self.fence_length, 2),
+            "cor_post": self.corner_posts + self.end_posts,
+            "end_post": self.end_posts,
+            "gate_post": self.gate_posts,
+        }
+
+
+# ---------------- Parsing ----------------
+def parse_polyline_text(text: str) -> list[dict]:
+    """
+    One "x, y" per line, in feet. A blank line starts a new run.
+    Put "gate" after a point to make the segment ending there a gate opening.
+    Lines starting with # are ignored. A pasted GeoJSON object is also accepted.
+    """
+    text = text or ""
+    if text.lstrip().startswith("{"):
+        return parse_geojson(text)
+
+    runs = []
+    pts, gates = [], []
+    for lineno, raw in enumerate(text.splitlines(), start=1):
+        line = raw.split("#", 1)[0].strip()
+        if not line:
+            if pts:
+                runs.append({"points": pts, "gates": gates})
+            pts, gates = [], []
+            continue
+        is_gate = line.lower().endswith("gate")
+        if is_gate:
+            line = line[:-4].strip()
+        parts = line.replace(",", " ").split()
+        if len(parts) != 2:
+            raise ValueError(f"Line {lineno}: expected 'x, y' (got {raw.strip()!r})")
+        try:
+            x, y = float(parts[0]), float(parts[1])
+        except ValueError:
+            raise ValueError(f"Line {lineno}: expected numbers (got {raw.strip()!r})")
+        if pts:
+            gates.append(is_gate)
+        pts.append((x, y))
+    if pts:
+        runs.append({"points": pts, "gates": gates})
+    return runs
+
+
+def parse_geojson(obj) -> list[dict]:
+    """
+    LineString / MultiLineString features (or bare geometries), coordinates in feet.
+    properties.gate = true marks the whole line as a gate opening;
+    properties.gate_segments = [i, ...] marks individual segments.
+    """
+    if isinstance(obj, str):
+        obj = json.loads(obj)
+    if not isinstance(obj, dict):
+        raise ValueError("GeoJSON: expected an object")
+
+    if obj.get("type") == "FeatureCollection":
+        features = obj.get("features", [])
+    elif obj.get("type") == "Feature":
+        features = [obj]
+    else:
+        features = [{"type": "Feature", "geometry": obj, "properties": {}}]
+
+    runs = []
+    for n, feat in enumerate(features if isinstance(features, list) else [], start=1):
+        geom = (feat.get("geometry") if isinstance(feat, dict) else None) or {}
+        props = (feat.get("properties") if isinstance(feat, dict) else None) or {}
+        if not isinstance(geom, dict) or not isinstance(props, dict):
+            raise ValueError(f"GeoJSON feature {n}: geometry and properties must be objects")
+        if geom.get("type") == "LineString":
+            lines = [geom["coordinates"]]
+        elif geom.get("type") == "MultiLineString":
+            lines = geom["coordinates"]
+        else:
+            continue
+        try:
+            marked = set(props.get("gate_segments") or [])
+        except TypeError:
+            raise ValueError(f"GeoJSON feature {n}: gate_segments must be a list of segment numbers")
+        try:
+            lines = [[(float(c[0]), float(c[1])) for c in coords] for coords in lines]
+        except (TypeError, IndexError, ValueError):
+            raise ValueError(f"GeoJSON feature {n}: coordinates must be [x, y] number pairs")
+        for pts in lines:
+            gates = [bool(props.get("gate")) or i in marked for i in range(len(pts) - 1)]
+            runs.append({"points": pts, "gates": gates})
+    return runs
+
+
+# ---------------- Takeoff ----------------
+def compute_layout(runs: list[dict], corner_angle: float = DEFAULT_CORNER_ANGLE) -> LayoutTakeoff:
+    runs = [r for r in runs if len(r["points"]) >= 2]
+    if not runs:
+        return LayoutTakeoff()
+
+    # Flatten to segments: start point, end point, gate flag, run id
+    a = np.concatenate([np.asarray(r["points"][:-1], dtype=float) for r in runs])
+    b = np.concatenate([np.asarray(r["points"][1:], dtype=float) for r in runs])
+    gate = np.concatenate([np.asarray(r["gates"], dtype=bool) for r in runs])
+    run_id = np.concatenate([np.full(len(r["points"]) - 1, i) for i, r in enumerate(runs)])
+
+    d = b - a
+    seg_len = np.hypot(d[:, 0], d[:, 1])
+    keep = seg_len > 1.0 / _SNAP
+    a, b, gate, run_id = _split_at_junctions(a[keep], b[keep], gate[keep], run_id[keep])
+    if not len(a):
+        return LayoutTakeoff()
+    d = b - a
+    seg_len = np.hypot(d[:, 0], d[:, 1])
+    u = d / seg_len[:, None]
+
+    # Sides: each segment contributes one at each end, with an outward unit vector
+    n = len(seg_len)
+    side_pts = np.concatenate([a, b])
+    side_dir = np.concatenate([u, -u])
+    side_gate = np.concatenate([gate, gate])
+
+    keys = np.round(side_pts * _SNAP).astype(np.int64)
+    _, loc = np.unique(keys, axis=0, return_inverse=True)
+    loc = loc.ravel()
+    n_loc = loc.max() + 1
+
+    fence_w = (~side_gate).astype(float)
+    fence_sides = np.bincount(loc, weights=fence_w, minlength=n_loc)
+    gate_sides = np.bincount(loc, weights=side_gate.astype(float), minlength=n_loc)
+    sx = np.bincount(loc, weights=side_dir[:, 0] * fence_w, minlength=n_loc)
+    sy = np.bincount(loc, weights=side_dir[:, 1] * fence_w, minlength=n_loc)
+
+    # Two outward unit vectors u1, u2: |u1 + u2|^2 = 2 + 2cos(theta); straight-through is theta = 180
+    cos_t = np.clip((sx * sx + sy * sy) / 2.0 - 1.0, -1.0, 1.0)
+    turn = 180.0 - np.degrees(np.arccos(cos_t))
+
+    is_gate = gate_sides > 0
+    is_end = ~is_gate & (fence_sides == 1)
+    is_corner = ~is_gate & ((fence_sides >= 3) | ((fence_sides == 2) & (turn >= corner_angle)))
+    terminal = is_gate | is_end | is_corner
+
+    # Spans: consecutive fence segments of a run between terminal posts
+    start_loc = loc[:n]
+    fence = ~gate
+    new_span = terminal[start_loc] | np.r_[True, run_id[1:] != run_id[:-1]] | np.r_[True, gate[:-1]]
+    span_id = np.cumsum(new_span) - 1
+    spans = np.bincount(span_id[fence], weights=seg_len[fence], minlength=span_id.max() + 1)
+    spans = _merge_loop_wrap(spans, span_id, run_id, fence, start_loc, loc[n:], terminal)
+
+    return LayoutTakeoff(
+        fence_length=float(seg_len[fence].sum()),
+        corner_posts=int(is_corner.sum()),
+        end_posts=int(is_end.sum()),
+        gate_posts=int(is_gate.sum()),
+        gate_openings=[round(float(x), 2) for x in seg_len[gate]],
+        spans=[round(float(x), 2) for x in spans if x > 0],
+    )
+
+
+def _split_at_junctions(a, b, gate, run_id):
+    """
+    Cut each segment wherever another segment's end lies on its interior (a T) or
+    another segment crosses it (an X). Pieces keep their run order, gate flag and
+    run id. Candidate pairs come from a sort-and-sweep over the segments' extents,
+    so only segments whose bounding boxes overlap are compared.
+    """
+    n = len(a)
+    if n < 2:
+        return a, b, gate, run_id
+    d = b - a
+    seg_len = np.hypot(d[:, 0], d[:, 1])
+    u = d / seg_len[:, None]
+    eps = 1.0 / _SNAP
+    lo, hi = np.minimum(a, b) - eps, np.maximum(a, b) + eps
+
+    # Sweep along the axis where boxes overlap least; pair p with the later boxes that start before it ends
+    spread = (hi - lo).sum(axis=0) / np.maximum(hi.max(axis=0) - lo.min(axis=0), eps)
+    k = int(np.argmin(spread))
+    order = np.argsort(lo[:, k], kind="stable")
+    stop = np.searchsorted(lo[order, k], hi[order, k], side="right")
+    counts = stop - np.arange(n) - 1
+    total = np.cumsum(counts)
+
+    cut_seg, cut_pos, cut_pt = [], [], []
+    p0 = 0
+    while p0 < n:
+        p1 = max(p0 + 1, int(np.searchsorted(total, (total[p0 - 1] if p0 else 0) + _BLOCK, side="right")))
+        c = counts[p0:p1]
+        p = np.repeat(np.arange(p0, p1), c)
+        q = p + 1 + np.arange(len(p)) - np.repeat(np.cumsum(c) - c, c)
+        i, j = order[p], order[q]
+        o = 1 - k
+        near = (lo[j, o] <= hi[i, o]) & (lo[i, o] <= hi[j, o])
+        i, j = i[near], j[near]
+        for x, y in ((i, j), (j, i)):
+            for seg, pos, pt in _cuts(x, y, a, b, u, seg_len, eps):
+                cut_seg.append(seg)
+                cut_pos.append(pos)
+                cut_pt.append(pt)
+        p0 = p1
+
+    cut_seg = np.concatenate(cut_seg)
+    if not len(cut_seg):
+        return a, b, gate, run_id
+
+    # Every segment starts at its own a; cuts add more start points along it
+    seg = np.concatenate([np.arange(n), cut_seg])
+    pos = np.concatenate([np.zeros(n), np.concatenate(cut_pos)])
+    pt = np.concatenate([a, np.concatenate(cut_pt)])
+    order = np.lexsort((pos, seg))
+    seg, pt = seg[order], pt[order]
+    keys = np.round(pt * _SNAP).astype(np.int64)
+    dup = np.r_[False, (seg[1:] == seg[:-1]) & (keys[1:] == keys[:-1]).all(axis=1)]
+    seg, pt = seg[~dup], pt[~dup]
+
+    last = np.r_[seg[1:] != seg[:-1], True]
+    end = np.r_[pt[1:], pt[:1]]
+    end[last] = b[seg[last]]
+    return pt, end, gate[seg], run_id[seg]
+
+
+def _cuts(i, j, a, b, u, seg_len, eps):
+    """(segment, distance along it, point) for each place segment j meets segment i's interior."""
+    li = seg_len[i]
+
+    # An end of j lying on i, away from i's own ends
+    for end in (a[j], b[j]):
+        rel = end - a[i]
+        t = rel[:, 0] * u[i, 0] + rel[:, 1] * u[i, 1]
+        off = np.abs(rel[:, 0] * u[i, 1] - rel[:, 1] * u[i, 0])
+        m = (off < eps) & (t > eps) & (t < li - eps)
+        yield i[m], t[m], end[m]
+
+    # A proper crossing: a[i] + t u[i] == a[j] + s u[j], interior to both
+    rel = a[j] - a[i]
+    cross = u[i, 0] * u[j, 1] - u[i, 1] * u[j, 0]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = (rel[:, 0] * u[j, 1] - rel[:, 1] * u[j, 0]) / cross
+        s = (rel[:, 0] * u[i, 1] - rel[:, 1] * u[i, 0]) / cross
+    m = (np.abs(cross) > 1e-9) & (t > eps) & (t < li - eps) & (s > eps) & (s < seg_len[j] - eps)
+    yield i[m], t[m], a[i[m]] + u[i[m]] * t[m][:, None]
+
+
+def _merge_loop_wrap(spans, span_id, run_id, fence, start_loc, end_loc, terminal):
+    """A closed run whose start point isn't a terminal post: its first and last spans are one piece."""
+    spans = spans.copy()
+    first = np.r_[True, run_id[1:] != run_id[:-1]]
+    last = np.r_[run_id[1:] != run_id[:-1], True]
+    for i, j in zip(np.flatnonzero(first), np.flatnonzero(last)):
+        loop = end_loc[j] == start_loc[i]
+        if loop and not terminal[start_loc[i]] and fence[i] and fence[j] and span_id[i] != span_id[j]:
+            spans[span_id[i]] += spans[span_id[j]]
+            spans[span_id[j]] = 0
+    return spans
+
+
+def takeoff_from_text(text: str, corner_angle: float = DEFAULT_CORNER_ANGLE) -> LayoutTakeoff:
+    return compute_layout(parse_polyline_text(text), corner_angle=corner_angle)
@@ -0,0 +1,270 @@
+import argparse
+import base64
+import difflib
+import gzip
+import json
+import math
+import os
+import random
+import re
+import sys
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+from modules.pdf_export import code_fits, export_chainlink_order_form_pdf_bytes, export_order_form_pdf_bytes
+from modules.specs import DUTIES, lookup, generated_descs, codes_for
+from modules.styles import available_styles, get_style, compute_project
+from modules.takeoff import compute_chainlink
+
+# Golden-file / property harness for the takeoff math.
+# Generates a fixed, seeded set of random job specs, runs them through the same
+# code the Calculate button uses, and compares material counts and order-form
+# PDF text against recorded outputs. Run it before and after any refactor:
+#   python -m modules.golden record          (writes data/golden/takeoffs.jsonl.gz)
+#   python -m modules.golden check           (exit 1 on any difference)
+# Every case is generated from its own seed, so results don't depend on how the
+# work is split across processes.
+
+GOLDEN_PATH = os.path.join("data", "golden", "takeoffs.jsonl.gz")
+DEFAULT_CASES = 2000
+DEFAULT_SEED = 20240601
+
+FINISHES = ["GALV", "BLK"]
+
+
+# ---------------- Case generation ----------------
+def _chainlink_spec(rng: random.Random) -> dict:
+    cor_post = rng.randint(0, 12)
+    has_tw = rng.random() < 0.4
+    has_bw = rng.random() < 0.3
+    has_ws = rng.random() < 0.3
+    mid = rng.choice([0, 0, 0, 1, 2])
+    length = round(rng.uniform(10, 2500), rng.choice([0, 1]))
+    return {
+        "height": rng.randint(3, 12),
+        "spacing": rng.choice([8.0, 10.0, 10.0, 12.0, 7.5]),
+        "length": length,
+        "cor_post": cor_post,
+        "end_post": rng.randint(0, cor_post),
+        "gate_post": rng.choice([0, 0, 2, 4]),
+        "has_top": mid > 0 or rng.random() < 0.9,
+        "mid_count": mid,
+        "has_bottom": rng.random() < 0.2,
+        "has_tw": has_tw,
+        "hog_spacing": rng.choice([None, 1.0, 2.0]) if has_tw else None,
+        "has_bw": has_bw,
+        "bw_strands": rng.randint(1, 6) if has_bw else 0,
+        "has_truss": rng.random() < 0.3,
+        "has_ws": has_ws,
+        "ws_feet": round(length * rng.uniform(0.2, 1.0)) if has_ws else None,
+        "ws_roll_len": rng.choice([50.0, 100.0, 150.0]) if has_ws else None,
+        "lp_override": rng.randint(0, 60) if rng.random() < 0.05 else None,
+        "rail_stock": rng.choice([21.0, 21.0, 24.0]),
+    }
+
+
+_RANGES = {
+    "height": (3, 8),
+    "length": (10, 1500),
+    "spacing": (6, 10),
+    "panel_width": (4, 8),
+    "rail_stock": (8, 16),
+    "picket_width": (3.5, 5.5),
+    "picket_gap": (0, 2),
+    "rails": (2, 4),
+    "corners": (0, 8),
+    "ends": (0, 6),
+    "gate_post": (0, 4),
+}
+
+
+def _plugin_spec(rng: random.Random, plugin) -> dict:
+    spec = {}
+    for f in plugin.INPUTS:
+        lo, hi = _RANGES.get(f["key"], (0, 10))
+        if f["type"] == "bool":
+            spec[f["key"]] = rng.random() < 0.5
+        elif f["type"] == "choice":
+            spec[f["key"]] = rng.choice(f["choices"])
+        elif f["type"] == "int":
+            spec[f["key"]] = rng.randint(max(int(lo), f.get("min", 0)), int(hi))
+        else:
+            spec[f["key"]] = round(rng.uniform(lo, hi), 1)
+    return spec
+
+
+def make_case(seed: int, i: int) -> dict:
+    rng = random.Random(f"{seed}:{i}")
+    style = "chainlink" if i % 4 else rng.choice([s for s in available_styles() if s != "chainlink"])
+    if style == "chainlink":
+        spec = _chainlink_spec(rng)
+    else:
+        spec = _plugin_spec(rng, get_style(style))
+    return {"id": i, "style": style, "finish": rng.choice(FINISHES), "duty": rng.choice(DUTIES), "spec": spec}
+
+
+# ---------------- Running ----------------
+def _pdf_text(pdf: bytes) -> list[str]:
+    """Strings drawn on each page, in drawing order (timestamp footer dropped)."""
+    lines = []
+    for m in re.finditer(rb"<<(.*?)>>\s*stream\r?\n(.*?)endstream", pdf, re.S):
+        header, data = m.group(1), m.group(2)
+        if b"ASCII85Decode" in header:
+            data = base64.a85decode(data.strip().removeprefix(b"<~").removesuffix(b"~>"))
+        if b"FlateDecode" in header:
+            data = zlib.decompress(data)
+        for s in re.findall(rb"\(((?:\\.|[^\\)])*)\)\s*Tj", data):
+            text = s.decode("latin-1")
+            if not text.startswith("Generated:"):
+                lines.append(text)
+    return lines
+
+
+def run_case(case: dict) -> dict:
+    spec, finish = case["spec"], case["finish"]
+    project = {"job_name": f"CASE {case['id']}", "height_style": f"{spec.get('height', '')}  {finish}"}
+    if case["style"] == "chainlink":
+        row = lookup("chainlink", spec["height"], case["duty"])
+        descs = generated_descs(row, finish)
+        items, plans = compute_chainlink(spec, descs, codes_for(descs, row, finish))
+        pdf = export_chainlink_order_form_pdf_bytes(project, items)
+        extra = {name: plan.count for name, plan in plans.items()}
+    else:
+        plugin = get_style(case["style"])
+        descs = {r: t[0] for r, t in plugin.TYPICALS.items()}
+        items = compute_project([{"style": case["style"], "spec": spec, "descs": descs}])[0][0]
+        pdf = export_order_form_pdf_bytes(project, [{"title": plugin.TITLE, "rows": plugin.ROWS, "items_by_row": items}])
+        extra = {}
+    return {
+        "id": case["id"],
+        "style": case["style"],
+        "qty": {r: [d["qty"], d["unit"]] for r, d in items.items() if d["qty"] not in ("", None)},
+        "plans": extra,
+        "pdf": _pdf_text(pdf),
+        "errors": check_properties(case, items),
+    }
+
+
+def _run_chunk(args):
+    seed, ids = args
+    return [run_case(make_case(seed, i)) for i in ids]
+
+
+def run_all(n: int = DEFAULT_CASES, seed: int = DEFAULT_SEED, workers: int = None) -> list[dict]:
+    workers = workers or os.cpu_count() or 1
+    ids = list(range(n))
+    size = max(1, math.ceil(n / (workers * 4)))
+    chunks = [(seed, ids[i:i + size]) for i in range(0, n, size)]
+    if workers == 1:
+        return [r for c in chunks for r in _run_chunk(c)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return [r for rs in pool.map(_run_chunk, chunks) for r in rs]
+
+
+# ---------------- Properties ----------------
+def check_properties(case: dict, items: dict) -> list[str]:
+    """Rules that must hold for every spec, whatever the recorded outputs say."""
+    errors = []
+    for row, d in items.items():
+        q = d["qty"]
+        if q in ("", None):
+            continue
+        if not isinstance(q, int) or q < 0:
+            errors.append(f"{row}: qty {q!r} is not a whole number >= 0")
+        if not d.get("unit"):
+            errors.append(f"{row}: no unit")
+        if d.get("code") and not code_fits(d["code"]):
+            errors.append(f"{row}: product code {d['code']!r} is cut off on the order form")
+    if case["style"] != "chainlink":
+        return errors
+
+    s = case["spec"]
+    qty = {r: d["qty"] for r, d in items.items() if d["qty"] not in ("", None)}
+    for row in ("TIES LINE POST", "TIES TOP RAIL", "BRACE BANDS", "TENSION BANDS"):
+        if row in qty and qty[row] % 50:
+            errors.append(f"{row}: {qty[row]} is not a multiple of 50")
+    bands = qty.get("BRACE BANDS", 0) + qty.get("TENSION BANDS", 0)
+    cb = qty.get('C/B - 5/16" X 1-1/4"')
+    if bands and cb != math.ceil(bands / 100):
+        errors.append(f"C/B: {cb} boxes for {bands} bands")
+    true_corners = max(0, s["cor_post"] - s["end_post"])
+    ten_bar = true_corners * 2 + s["end_post"] + s["gate_post"]
+    if qty.get("TENSION BARS") != ten_bar:
+        errors.append(f"TENSION BARS: {qty.get('TENSION BARS')} != {ten_bar}")
+    if qty.get("FABRIC") != int(s["length"]):
+        errors.append(f"FABRIC: {qty.get('FABRIC')} != {int(s['length'])}")
+    total_rails = (1 if s["has_top"] else 0) + s["mid_count"] + (1 if s["has_bottom"] else 0)
+    if total_rails and qty.get("TOP RAIL", 0) * s["rail_stock"] < s["length"] * total_rails:
+        errors.append(f"TOP RAIL: {qty.get('TOP RAIL')} sticks can't cover {s['length'] * total_rails} ft")
+    return errors
+
+
+# ---------------- Golden file ----------------
+def record(results: list[dict], path: str = GOLDEN_PATH) -> str:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        for r in results:
+            f.write(json.dumps({k: v for k, v in r.items() if k != "errors"}, sort_keys=True) + "\n")
+    return path
+
+
+def load(path: str = GOLDEN_PATH) -> dict:
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        return {r["id"]: r for r in map(json.loads, f)}
+
+
+def compare(results: list[dict], golden: dict, max_report: int = 20) -> list[str]:
+    report = []
+    for r in results:
+        old = golden.get(r["id"])
+        problems = [f"  property: {e}" for e in r["errors"]]
+        if old is None:
+            problems.append("  not in golden file")
+        else:
+            for row in sorted(set(old["qty"]) | set(r["qty"])):
+                a, b = old["qty"].get(row), r["qty"].get(row)
+                if a != b:
+                    problems.append(f"  {row}: {a} -> {b}")
+            if old["plans"] != r["plans"]:
+                problems.append(f"  cut plans: {old['plans']} -> {r['plans']}")
+            if old["pdf"] != r["pdf"]:
+                problems += ["  pdf " + l for l in difflib.unified_diff(old["pdf"], r["pdf"], lineterm="", n=0)
+                             if not l.startswith(("---", "+++", "@@"))]
+        if problems:
+            report.append(f"case {r['id']} ({r['style']}):\n" + "\n".join(problems))
+    if len(report) > max_report:
+        report = report[:max_report] + [f"... and {len(report) - max_report} more cases"]
+    return report
+
+
+# ---------------- CLI ----------------
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m modules.golden")
+    ap.add_argument("cmd", choices=["record", "check"])
+    ap.add_argument("-n", "--cases", type=int, default=DEFAULT_CASES)
+    ap.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    ap.add_argument("-j", "--workers", type=int, default=None)
+    ap.add_argument("--path", default=GOLDEN_PATH)
+    args = ap.parse_args(argv)
+
+    results = run_all(args.cases, args.seed, args.workers)
+    if args.cmd == "record":
+        bad = [r for r in results if r["errors"]]
+        if bad:
+            print("\n".join(compare(bad, {r["id"]: r for r in bad})))
+            print("Property failures; not recording.")
+            return 1
+        print(f"Recorded {len(results)} cases to {record(results, args.path)}")
+        return 0
+
+    report = compare(results, load(args.path))
+    if report:
+        print("\n\n".join(report))
+        print(f"\nFAILED: takeoff output differs from {args.path}")
+        return 1
+    print(f"OK: {len(results)} cases match {args.path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,286 @@
+import argparse
+import csv
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+from modules.desc_strings import normalize
+
+# Yard inventory: on-hand stock and per-job reservations in data/inventory.db.
+#   python -m modules.inventory import STOCK.csv [--replace]   (code, description, unit, on_hand)
+#   python -m modules.inventory list [--short JOB]
+#   python -m modules.inventory set CODE QTY [--desc D --unit U]
+#   python -m modules.inventory reservations [JOB]
+#   python -m modules.inventory release JOB
+#   python -m modules.inventory issue JOB                       (stock left the yard)
+# A stock item is keyed by product code, or by its normalized description when
+# it has no code; both are indexed. A takeoff is checked in one query: its rows
+# go into a temp table and are joined to stock (code first, then description)
+# and to the reservation totals. reserve() runs inside BEGIN IMMEDIATE, so two
+# estimators reserving the last rolls at once are serialized by SQLite's write
+# lock, across threads and processes alike.
+
+DB_PATH = os.path.join("data", "inventory.db")
+STATUSES = ["ok", "short", "unit", "not stocked"]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS stock (
+    sku TEXT PRIMARY KEY,
+    code TEXT NOT NULL DEFAULT '',
+    norm TEXT NOT NULL,
+    description TEXT NOT NULL DEFAULT '',
+    unit TEXT NOT NULL DEFAULT '',
+    on_hand REAL NOT NULL DEFAULT 0,
+    updated REAL
+);
+CREATE INDEX IF NOT EXISTS stock_code ON stock (code) WHERE code != '';
+CREATE INDEX IF NOT EXISTS stock_norm ON stock (norm);
+CREATE TABLE IF NOT EXISTS reservations (
+    job TEXT NOT NULL,
+    sku TEXT NOT NULL,
+    qty REAL NOT NULL,
+    user TEXT,
+    ts REAL,
+    PRIMARY KEY (job, sku)
+);
+CREATE INDEX IF NOT EXISTS reservations_sku ON reservations (sku);
+"""
+
+_CHECK = """
+WITH match AS (
+    SELECT n.pos, n.row, n.qty, n.unit AS need_unit,
+           COALESCE(sc.sku, (SELECT sd.sku FROM stock sd WHERE sd.norm = n.norm ORDER BY sd.sku LIMIT 1)) AS sku
+    FROM need n
+    LEFT JOIN stock sc ON n.code != '' AND sc.code = n.code
+)
+SELECT m.row, m.qty, m.need_unit, s.sku, s.code, s.description, s.unit, s.on_hand,
+       COALESCE((SELECT SUM(r.qty) FROM reservations r WHERE r.sku = s.sku AND r.job != :job), 0),
+       COALESCE((SELECT r.qty FROM reservations r WHERE r.sku = s.sku AND r.job = :job), 0)
+FROM match m
+LEFT JOIN stock s ON s.sku = m.sku
+ORDER BY m.pos
+"""
+
+_local = threading.local()
+
+
+def sku_for(code: str, desc: str) -> str:
+    code = (code or "").strip()
+    return code if code else "desc:" + normalize(desc or "")
+
+
+def _conn(path: str = None):
+    path = path or DB_PATH
+    conns = getattr(_local, "conns", None)
+    if conns is None:
+        conns = _local.conns = {}
+    db = conns.get(path)
+    if db is None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        db = conns[path] = sqlite3.connect(path, timeout=10, isolation_level=None)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.executescript(_SCHEMA)
+        db.execute("CREATE TEMP TABLE IF NOT EXISTS need (pos INTEGER, row TEXT, code TEXT, norm TEXT, "
+                   "qty REAL, unit TEXT)")
+    return db
+
+
+def has_stock(path: str = None) -> bool:
+    """False without touching disk when there's no inventory database yet."""
+    path = path or DB_PATH
+    if not os.path.exists(path):
+        return False
+    return _conn(path).execute("SELECT 1 FROM stock LIMIT 1").fetchone() is not None
+
+
+# ---------------- Stock ----------------
+def upsert_stock(items, path: str = None, replace: bool = False) -> int:
+    """items: iterable of {"code", "description", "unit", "on_hand"}. replace drops items not listed."""
+    db = _conn(path)
+    now = time.time()
+    rows = [
+        (sku_for(it.get("code"), it.get("description")), (it.get("code") or "").strip(),
+         normalize(it.get("description") or ""), (it.get("description") or "").strip(),
+         (it.get("unit") or "").strip().upper(), float(it.get("on_hand") or 0), now)
+        for it in items
+    ]
+    db.execute("BEGIN IMMEDIATE")
+    try:
+        if replace:
+            db.execute("DELETE FROM stock")
+        db.executemany(
+            "INSERT INTO stock VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT(sku) DO UPDATE SET "
+            "code = excluded.code, norm = excluded.norm, description = excluded.description, "
+            "unit = excluded.unit, on_hand = excluded.on_hand, updated = excluded.updated", rows)
+        db.execute("COMMIT")
+    except BaseException:
+        db.execute("ROLLBACK")
+        raise
+    return len(rows)
+
+
+def stock(path: str = None) -> list[dict]:
+    cur = _conn(path).execute(
+        "SELECT s.sku, s.code, s.description, s.unit, s.on_hand, COALESCE(SUM(r.qty), 0) "
+        "FROM stock s LEFT JOIN reservations r ON r.sku = s.sku GROUP BY s.sku ORDER BY s.description")
+    return [{"sku": r[0], "code": r[1], "description": r[2], "unit": r[3], "on_hand": r[4], "reserved": r[5],
+             "available": r[4] - r[5]} for r in cur]
+
+
+# ---------------- Checking ----------------
+def _check(db, items_by_row: dict, job: str) -> list[dict]:
+    need = [
+        (i, row, (d.get("code") or "").strip(), normalize(d.get("desc") or ""), float(d["qty"]),
+         (d.get("unit") or "").strip().upper())
+        for i, (row, d) in enumerate((items_by_row or {}).items())
+        if d.get("qty") not in ("", None, 0)
+    ]
+    db.execute("DELETE FROM need")
+    db.executemany("INSERT INTO need VALUES (?, ?, ?, ?, ?, ?)", need)
+    out = []
+    for row, qty, unit, sku, code, desc, s_unit, on_hand, other, mine in db.execute(_CHECK, {"job": job or ""}):
+        rec = {"row": row, "need": qty, "unit": unit, "sku": sku, "code": code or "", "stock_desc": desc or "",
+               "on_hand": on_hand, "reserved_other": other, "reserved": mine}
+        if sku is None:
+            rec.update(status="not stocked", available=None, short=None)
+        else:
+            available = on_hand - other
+            rec["available"] = available
+            if s_unit and unit and s_unit != unit:
+                rec.update(status="unit", short=None)
+            elif available < qty:
+                rec.update(status="short", short=qty - max(available, 0))
+            else:
+                rec.update(status="ok", short=0)
+        out.append(rec)
+    return out
+
+
+def check(items_by_row: dict, job: str = None, path: str = None) -> list[dict]:
+    """
+    One record per row with a quantity: need, matched stock, on hand, reserved by
+    other jobs / this job, available (on hand less other jobs' reservations), status.
+    """
+    return _check(_conn(path), items_by_row, job)
+
+
+def shortages(checked: list[dict]) -> list[dict]:
+    return [r for r in checked if r["status"] == "short"]
+
+
+# ---------------- Reservations ----------------
+def reserve(job: str, items_by_row: dict, user: str = None, path: str = None) -> list[dict]:
+    """
+    Replace job's reservations with this takeoff's needs, as far as stock allows
+    (a short item reserves what's left). Returns check() as seen inside the lock.
+    """
+    if not (job or "").strip():
+        raise ValueError("reservations need a job name")
+    db = _conn(path)
+    db.execute("BEGIN IMMEDIATE")
+    try:
+        db.execute("DELETE FROM reservations WHERE job = ?", (job,))
+        checked = _check(db, items_by_row, job)
+        now = time.time()
+        held = {}
+        for r in checked:
+            if r["status"] in ("ok", "short"):
+                held[r["sku"]] = held.get(r["sku"], 0) + min(r["need"], max(r["available"] - held.get(r["sku"], 0), 0))
+        db.executemany("INSERT INTO reservations VALUES (?, ?, ?, ?, ?)",
+                       [(job, sku, qty, user, now) for sku, qty in held.items() if qty > 0])
+        db.execute("COMMIT")
+    except BaseException:
+        db.execute("ROLLBACK")
+        raise
+    for r in checked:
+        r["reserved"] = held.get(r["sku"], 0) if r["sku"] else 0
+    return checked
+
+
+def release(job: str, path: str = None) -> int:
+    return _conn(path).execute("DELETE FROM reservations WHERE job = ?", (job,)).rowcount
+
+
+def issue(job: str, path: str = None) -> int:
+    """The job's reserved stock left the yard: take it off on-hand and drop the reservations."""
+    db = _conn(path)
+    db.execute("BEGIN IMMEDIATE")
+    try:
+        db.execute("UPDATE stock SET on_hand = on_hand - (SELECT r.qty FROM reservations r "
+                   "WHERE r.job = :job AND r.sku = stock.sku), updated = :now "
+                   "WHERE sku IN (SELECT sku FROM reservations WHERE job = :job)", {"job": job, "now": time.time()})
+        n = db.execute("DELETE FROM reservations WHERE job = ?", (job,)).rowcount
+        db.execute("COMMIT")
+    except BaseException:
+        db.execute("ROLLBACK")
+        raise
+    return n
+
+
+def reservations(job: str = None, path: str = None) -> list[dict]:
+    sql = ("SELECT r.job, r.sku, s.description, r.qty, s.unit, r.user, r.ts FROM reservations r "
+           "LEFT JOIN stock s ON s.sku = r.sku")
+    args = ()
+    if job:
+        sql += " WHERE r.job = ?"
+        args = (job,)
+    cur = _conn(path).execute(sql + " ORDER BY r.job, r.sku", args)
+    return [dict(zip(("job", "sku", "description", "qty", "unit", "user", "ts"), r)) for r in cur]
+
+
+# ---------------- CLI ----------------
+def read_stock_csv(path: str):
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        for rec in csv.DictReader(f):
+            rec = {k.strip().lower(): (v or "").strip() for k, v in rec.items() if k}
+            yield {"code": rec.get("code", ""), "description": rec.get("description") or rec.get("desc", ""),
+                   "unit": rec.get("unit", ""), "on_hand": rec.get("on_hand") or rec.get("qty") or 0}
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m modules.inventory")
+    ap.add_argument("--db", default=DB_PATH)
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("import", help="load stock counts from a CSV")
+    p.add_argument("csv")
+    p.add_argument("--replace", action="store_true", help="drop items missing from the CSV")
+    sub.add_parser("list")
+    p = sub.add_parser("set", help="set one item's on-hand count")
+    p.add_argument("code")
+    p.add_argument("qty", type=float)
+    p.add_argument("--desc", default="")
+    p.add_argument("--unit", default="")
+    p = sub.add_parser("reservations")
+    p.add_argument("job", nargs="?")
+    p = sub.add_parser("release")
+    p.add_argument("job")
+    p = sub.add_parser("issue")
+    p.add_argument("job")
+    args = ap.parse_args(argv)
+
+    if args.cmd == "import":
+        n = upsert_stock(read_stock_csv(args.csv), args.db, replace=args.replace)
+        print(f"Loaded {n} stock items into {args.db}")
+    elif args.cmd == "list":
+        for s in stock(args.db):
+            print(f"{s['code'] or '-':<22} {s['description'][:40]:<40} {s['on_hand']:>9g} {s['unit']:<3} "
+                  f"reserved {s['reserved']:g}, available {s['available']:g}")
+    elif args.cmd == "set":
+        current = {s["sku"]: s for s in stock(args.db)}.get(args.code, {})
+        upsert_stock([{"code": args.code, "description": args.desc or current.get("description", ""),
+                       "unit": args.unit or current.get("unit", ""), "on_hand": args.qty}], args.db)
+        print(f"{args.code}: {args.qty:g} on hand")
+    elif args.cmd == "reservations":
+        for r in reservations(args.job, args.db):
+            print(f"{r['job']:<24} {r['sku']:<22} {r['qty']:>9g} {r['unit'] or '':<3} {r['user'] or ''}")
+    elif args.cmd == "release":
+        print(f"Released {release(args.job, args.db)} reservations for {args.job}")
+    elif args.cmd == "issue":
+        print(f"Issued {issue(args.job, args.db)} reserved items for {args.job}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
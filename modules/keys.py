@@ -0,0 +1,37 @@
+import hashlib
+import hmac
+import os
+import secrets
+
+# The deployment's signing secret and the keys derived from it.
+# JBS_SESSION_SECRET wins; otherwise a random secret is created once in
+# data/.session_secret. Every host that shares session tokens or a cache backend
+# must share the secret. auth signs session tokens with it; library modules
+# (modules.cache) take a derived key so they never need the Streamlit-side auth.
+SECRET_PATH = os.path.join("data", ".session_secret")
+
+_secret_cache = None
+
+
+def secret() -> bytes:
+    global _secret_cache
+    if _secret_cache is not None:
+        return _secret_cache
+
+    env = os.environ.get("JBS_SESSION_SECRET")
+    if env:
+        _secret_cache = env.encode("utf-8")
+        return _secret_cache
+
+    os.makedirs("data", exist_ok=True)
+    if not os.path.exists(SECRET_PATH):
+        with open(SECRET_PATH, "wb") as f:
+            f.write(secrets.token_bytes(32))
+    with open(SECRET_PATH, "rb") as f:
+        _secret_cache = f.read()
+    return _secret_cache
+
+
+def derived_key(purpose: str) -> bytes:
+    """A key for signing something other than session tokens (e.g. shared cache entries)."""
+    return hmac.new(secret(), purpose.encode("utf-8"), hashlib.sha256).digest()
@@ -0,0 +1,216 @@
+import json
+import os
+import re
+import threading
+
+import numpy as np
+import pandas as pd
+
+from modules.specs import od_inches
+
+# Delivery load planning: weights, bundles and truck loads for one or many jobs.
+# data/handling.json has, per order-form row (with per-style overrides), how an
+# item ships: pipe (weight from OD / schedule / length in the description),
+# roll (fabric: weight per square foot times height) or each (fixed weight),
+# and how many go in a bundle / box / roll / pallet ("ship": false for rows
+# that go out as another row, e.g. BARBED WIRE feet as BARBED WIRE ROLLS).
+# materials() joins that to takeoff results; pack() puts the bundles on trucks with first-fit decreasing
+# (longest, then heaviest first) under each truck's weight, bed length and
+# floor-slot limits, placing runs of identical bundles in one step, then
+# drops every load onto the smallest truck that still carries it.
+
+HANDLING_PATH = os.path.join("data", "handling.json")
+MATERIAL_COLUMNS = ["job", "style", "row", "qty", "unit", "desc", "bundle", "per_bundle", "bundles",
+                    "each_lb", "len_ft", "slots", "weight_lb"]
+
+_RE_LEN = re.compile(r"x\s*(\d+(?:\.\d+)?)\s*'")
+_RE_SCH40 = re.compile(r"SCH\.?\s*40\b", re.IGNORECASE)
+_EPS = 1e-9
+
+_cache = {}
+_lock = threading.Lock()
+
+
+def handling(path: str = HANDLING_PATH) -> dict:
+    mtime = os.path.getmtime(path)
+    with _lock:
+        hit = _cache.get(path)
+        if hit is None or hit[0] != mtime:
+            with open(path, "r", encoding="utf-8") as f:
+                hit = _cache[path] = (mtime, json.load(f))
+        return hit[1]
+
+
+def default_trucks() -> list[dict]:
+    return [dict(t) for t in handling()["trucks"]]
+
+
+def _entry(table: dict, style: str, row: str):
+    return table["styles"].get(style, {}).get(row) or table["items"].get(row)
+
+
+def pipe_lb_per_ft(desc: str, table: dict) -> float:
+    """Steel pipe weight from the description's OD and schedule: 10.69 * (OD - wall) * wall."""
+    od = od_inches(desc)
+    if not od:
+        return 0.0
+    sched = "SCH. 40" if _RE_SCH40.search(desc or "") else "SCH. 20"
+    walls = table["pipe_wall_in"][sched]
+    nominal = min(walls, key=lambda k: abs(float(k) - od))
+    wall = walls[nominal]
+    actual_od = {1.625: 1.66, 1.875: 1.90}.get(od, od)   # fence pipe is named by nominal size
+    return 10.69 * (actual_od - wall) * wall
+
+
+def _shipping(entry: dict, desc: str, height: float, table: dict):
+    """-> (lb per unit, length ft) for one row."""
+    kind = entry["kind"]
+    m = _RE_LEN.search(desc or "")
+    length = float(m.group(1)) if m and kind == "pipe" else float(entry.get("len_ft") or 0)
+    if kind == "pipe":
+        return pipe_lb_per_ft(desc, table) * length, length
+    if kind == "roll":
+        return entry["lb_per_sqft"] * (height or 6), float(height or entry.get("len_ft") or 6)
+    lb = entry.get("lb_each", 0.0)
+    for needle, override in (entry.get("lb_by_desc") or {}).items():
+        if needle.lower() in (desc or "").lower():
+            lb = override
+    return float(lb), length
+
+
+# ---------------- Materials ----------------
+def materials(jobs: list[dict], table: dict = None) -> tuple[pd.DataFrame, list[str]]:
+    """
+    jobs: [{"job", "style", "height", "items_by_row"}].
+    -> (one row per job x shipped material, ["job: ROW", ...] rows with no handling data).
+    """
+    table = table or handling()
+    recs, unknown = [], []
+    for j in jobs:
+        for row, d in (j.get("items_by_row") or {}).items():
+            qty = d.get("qty")
+            if qty in ("", None) or not qty:
+                continue
+            entry = _entry(table, j.get("style", "chainlink"), row)
+            unit = (d.get("unit") or "").upper()
+            if entry is None:
+                unknown.append(f"{j['job']}: {row}")
+                continue
+            if entry.get("ship") is False or unit in entry.get("skip_units", []):
+                continue   # shipped as another row (BARBED WIRE -> ROLLS) or not by us (ready-mix)
+            each_lb, length = _shipping(entry, d.get("desc") or "", j.get("height"), table)
+            recs.append((j["job"], j.get("style", "chainlink"), row, float(qty), unit, d.get("desc") or "",
+                         entry.get("bundle", "bundle"), float(entry.get("per_bundle") or 1), each_lb, length,
+                         float(entry.get("slots", 1))))
+
+    df = pd.DataFrame(recs, columns=["job", "style", "row", "qty", "unit", "desc", "bundle", "per_bundle",
+                                     "each_lb", "len_ft", "slots"])
+    df["bundles"] = np.ceil(df["qty"] / df["per_bundle"] - _EPS).astype(int)
+    df["weight_lb"] = df["qty"] * df["each_lb"]
+    return df[MATERIAL_COLUMNS], unknown
+
+
+def summary(df: pd.DataFrame) -> dict:
+    return {"weight_lb": float(df["weight_lb"].sum()), "bundles": int(df["bundles"].sum()),
+            "longest_ft": float(df["len_ft"].max()) if len(df) else 0.0}
+
+
+# ---------------- Packing ----------------
+def _groups(df: pd.DataFrame) -> list[dict]:
+    """Runs of identical bundles: the full ones of each material, plus its partial last bundle."""
+    out = []
+    for r in df.itertuples(index=False):
+        full = int((r.qty + _EPS) // r.per_bundle)
+        rest = r.qty - full * r.per_bundle
+        for count, qty in ((full, r.per_bundle), (1 if rest > _EPS else 0, rest)):
+            if count:
+                out.append({"job": r.job, "row": r.row, "bundle": r.bundle, "count": count, "qty_each": qty,
+                            "lb": qty * r.each_lb, "len_ft": r.len_ft, "slots": r.slots})
+    out.sort(key=lambda g: (-g["len_ft"], -g["lb"]))
+    return out
+
+
+def _fits(truck: dict, lb: float, length: float, slots: float) -> bool:
+    return length <= truck["bed_ft"] + _EPS and lb <= truck["max_lb"] + _EPS and slots <= truck["slots"] + _EPS
+
+
+def _room(load: dict, g: dict) -> int:
+    """How many bundles of group g still fit on load."""
+    if g["len_ft"] > load["truck"]["bed_ft"] + _EPS:
+        return 0
+    by_lb = (load["truck"]["max_lb"] - load["lb"] + _EPS) // g["lb"] if g["lb"] > 0 else g["count"]
+    by_slots = (load["truck"]["slots"] - load["slots"] + _EPS) // g["slots"] if g["slots"] > 0 else g["count"]
+    return int(max(0, min(g["count"], by_lb, by_slots)))
+
+
+def _place(load: dict, g: dict, n: int) -> None:
+    key = (g["job"], g["row"])
+    item = load["items"].setdefault(key, {"job": g["job"], "row": g["row"], "bundle": g["bundle"],
+                                          "bundles": 0, "qty": 0.0, "lb": 0.0})
+    item["bundles"] += n
+    item["qty"] += n * g["qty_each"]
+    item["lb"] += n * g["lb"]
+    load["lb"] += n * g["lb"]
+    load["slots"] += n * g["slots"]
+    load["longest_ft"] = max(load["longest_ft"], g["len_ft"])
+
+
+def _pack_groups(groups: list[dict], fleet: list[dict]):
+    loads, unplaced = [], []
+    for g in groups:
+        g = dict(g)
+        for load in loads:
+            n = _room(load, g)
+            if n:
+                _place(load, g, n)
+                g["count"] -= n
+                if not g["count"]:
+                    break
+        while g["count"]:
+            truck = next((t for t in fleet if _fits(t, g["lb"], g["len_ft"], g["slots"])), None)
+            if truck is None:
+                unplaced.append(g)
+                break
+            load = {"truck": truck, "lb": 0.0, "slots": 0.0, "longest_ft": 0.0, "items": {}}
+            loads.append(load)
+            n = _room(load, g)
+            _place(load, g, n)
+            g["count"] -= n
+    return loads, unplaced
+
+
+def pack(df: pd.DataFrame, trucks: list[dict] = None, mix_jobs: bool = True) -> dict:
+    """
+    -> {"loads": [{"truck", "max_lb", "bed_ft", "lb", "slots", "longest_ft", "jobs", "items": [...]}],
+        "unplaced": [bundle groups no truck can carry], "weight_lb", "bundles"}
+    mix_jobs=False keeps every job on its own trucks.
+    """
+    fleet = sorted((t for t in (trucks or default_trucks()) if t.get("max_lb") and t.get("bed_ft")),
+                   key=lambda t: (-t["max_lb"], -t["bed_ft"]))
+    groups = _groups(df)
+    if mix_jobs:
+        loads, unplaced = _pack_groups(groups, fleet)
+    else:
+        loads, unplaced = [], []
+        for job in dict.fromkeys(g["job"] for g in groups):
+            jl, ju = _pack_groups([g for g in groups if g["job"] == job], fleet)
+            loads += jl
+            unplaced += ju
+
+    smallest_first = fleet[::-1]
+    out = []
+    for load in loads:
+        truck = next(t for t in smallest_first if _fits(t, load["lb"], load["longest_ft"], load["slots"]))
+        items = sorted(load["items"].values(), key=lambda i: (i["job"], -i["lb"]))
+        out.append({"truck": truck["name"], "max_lb": truck["max_lb"], "bed_ft": truck["bed_ft"],
+                    "lb": load["lb"], "slots": load["slots"], "max_slots": truck["slots"],
+                    "longest_ft": load["longest_ft"], "jobs": sorted({i["job"] for i in items}), "items": items})
+    return {"loads": out, "unplaced": unplaced, "weight_lb": float(df["weight_lb"].sum()),
+            "bundles": int(df["bundles"].sum())}
+
+
+def plan(jobs: list[dict], trucks: list[dict] = None, mix_jobs: bool = True) -> dict:
+    df, unknown = materials(jobs)
+    result = pack(df, trucks, mix_jobs)
+    result["unknown"] = unknown
+    return result
@@ -0,0 +1,275 @@
+import argparse
+import json
+import multiprocessing as mp
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+try:
+    import resource
+except ImportError:   # Windows
+    resource = None
+
+# Load test: per-session cost of app.py reruns.
+#   python -m modules.loadtest run --user NAME [--role admin] [--team T] [--sessions 1,2,4,8]
+#                                  [--iterations 3] [--script takeoff|browse|mixed]
+#                                  [--slo-ms 2000] [--json OUT] [--in-place]
+# Every session is a headless AppTest of app.py driven by an interaction script
+# (typing inputs, toggles, Calculate, Generate PDF), each session in its own
+# process, all started together. Each step level reports rerun latency
+# percentiles, CPU per rerun, memory per session and throughput.
+# These are per-process figures: the sessions compete for the machine's cores
+# and shared files, not for one server process's GIL and caches, so they don't
+# show where a single `streamlit run` server saturates. CPU per rerun only gives
+# an estimate of that ceiling (one core shared by every session).
+# --user must be an account in data/users.json; its token signs every session in.
+# Runs in a scratch copy of data/ unless --in-place, so the audit log, history,
+# revisions and description library aren't touched.
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+DEFAULT_SESSIONS = [1, 2, 4, 8]
+RUN_TIMEOUT = 300
+SCRATCH_SKIP = ("golden", "audit", "revisions", "cache.db", "cache.db-wal", "cache.db-shm")
+
+
+# ---------------- Interaction scripts ----------------
+# A step is (label, action); the harness times the rerun that follows the action.
+def _text(label, value):
+    def act(at):
+        for w in at.text_input:
+            if w.label == label or w.key == label:
+                w.input(value)
+                return
+        raise KeyError(label)
+    return act
+
+
+def _click(key):
+    def act(at):
+        at.button(key=key).click()
+    return act
+
+
+def _toggle(key, value):
+    def act(at):
+        at.toggle(key=key).set_value(value)
+    return act
+
+
+def _noop(at):
+    pass
+
+
+def takeoff_script(rng: random.Random) -> list:
+    """One estimator pricing a chain link job start to finish."""
+    length = rng.choice([120, 250, 300, 480, 1000])
+    return [
+        ("height", _text("Height (ft)", str(rng.choice([4, 5, 6, 8])))),
+        ("finish", _text("Finish (e.g., GALV / BLK)", rng.choice(["GALV", "BLK"]))),
+        ("spacing", _text("Post Spacing (ft)", "10")),
+        ("length", _text("length_str", str(length))),
+        ("corners", _text("cor_post_str", str(rng.randint(0, 6)))),
+        ("ends", _text("end_post_str", "2")),
+        ("gates", _text("gate_post_str", "0")),
+        ("calculate", _click("calc_btn")),
+        ("rerender", _noop),
+        ("preview off", _toggle("preview_order_form", False)),
+        ("generate pdf", _click("gen_pdf_export_tab")),
+        ("change length", _text("length_str", str(length + 40))),
+        ("recalculate", _click("calc_btn")),
+    ]
+
+
+def browse_script(rng: random.Random) -> list:
+    """Reruns that don't calculate: typing in fields, flipping previews."""
+    return [
+        ("project name", _text("Project Name", f"Job {rng.randint(1, 999)}")),
+        ("height", _text("Height (ft)", str(rng.choice([4, 6])))),
+        ("finish", _text("Finish (e.g., GALV / BLK)", "GALV")),
+        ("idle rerun", _noop),
+        ("spacing", _text("Post Spacing (ft)", "8")),
+        ("idle rerun", _noop),
+    ]
+
+
+SCRIPTS = {
+    "takeoff": takeoff_script,
+    "browse": browse_script,
+    "mixed": lambda rng: (takeoff_script if rng.random() < 0.5 else browse_script)(rng),
+}
+
+
+# ---------------- Measurement ----------------
+def rss_mb() -> float:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    if resource is None:
+        return 0.0
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024   # peak, on platforms without /proc
+
+
+def cpu_seconds() -> float:
+    return time.process_time()
+
+
+def _session(idx: int, script: str, iterations: int, seed: int, token: str, barrier, out) -> None:
+    from streamlit.testing.v1 import AppTest
+
+    rng = random.Random(seed * 1000 + idx)
+    latencies, errors = [], 0
+    at = AppTest.from_file(APP_PATH, default_timeout=RUN_TIMEOUT)
+    at.session_state["auth_token"] = token
+    rss0, cpu0 = rss_mb(), cpu_seconds()
+    barrier.wait()
+    for _ in range(iterations):
+        steps = [("open", _noop)] + SCRIPTS[script](rng)
+        for label, act in steps:
+            try:
+                act(at)
+                t0 = time.perf_counter()
+                at.run()
+                latencies.append((label, time.perf_counter() - t0))
+                errors += len(at.exception)
+            except Exception:   # a crashed rerun is a data point, not the end of the test
+                errors += 1
+    out.put({"latencies": latencies, "errors": errors, "cpu_s": cpu_seconds() - cpu0,
+             "rss_mb": rss_mb(), "session_mb": max(rss_mb() - rss0, 0)})
+
+
+def run_level(n: int, script: str, iterations: int, seed: int, token: str) -> dict:
+    """
+    One process per session: AppTest patches Streamlit's runtime globals on every
+    run, so two sessions can't share a process. The figures are per process;
+    1000 / cpu_ms_per_rerun only estimates what a single server process (one
+    core, GIL-bound) could sustain.
+    """
+    ctx = mp.get_context("fork" if "fork" in mp.get_all_start_methods() else "spawn")
+    out, barrier = ctx.Queue(), ctx.Barrier(n + 1)
+    procs = [ctx.Process(target=_session, args=(i, script, iterations, seed, token, barrier, out), daemon=True)
+             for i in range(n)]
+    for p in procs:
+        p.start()
+    barrier.wait()
+    t0 = time.perf_counter()
+    results = [out.get() for _ in procs]
+    wall = time.perf_counter() - t0
+    for p in procs:
+        p.join()
+
+    lat = np.array([s for r in results for _, s in r["latencies"]]) * 1000
+    by_step = {}
+    for r in results:
+        for label, s in r["latencies"]:
+            by_step.setdefault(label, []).append(s * 1000)
+    cpu = sum(r["cpu_s"] for r in results)
+
+    p50, p90, p95, p99 = np.percentile(lat, [50, 90, 95, 99]) if len(lat) else (0, 0, 0, 0)
+    return {
+        "sessions": n,
+        "reruns": int(len(lat)),
+        "errors": sum(r["errors"] for r in results),
+        "wall_s": wall,
+        "throughput": len(lat) / wall if wall else 0.0,
+        "p50_ms": float(p50), "p90_ms": float(p90), "p95_ms": float(p95), "p99_ms": float(p99),
+        "max_ms": float(lat.max()) if len(lat) else 0.0,
+        "cpu_ms_per_rerun": cpu * 1000 / max(len(lat), 1),
+        "cpu_util": cpu / wall if wall else 0.0,
+        "rss_mb": sum(r["rss_mb"] for r in results),
+        "mb_per_session": sum(r["session_mb"] for r in results) / n,
+        "slowest_steps": sorted(((k, float(np.median(v))) for k, v in by_step.items()),
+                                key=lambda kv: -kv[1])[:3],
+    }
+
+
+# ---------------- Scratch data ----------------
+def scratch_dir() -> str:
+    """Temp working directory with a copy of data/ (minus logs, caches and golden files)."""
+    root = tempfile.mkdtemp(prefix="jbs-loadtest-")
+    if os.path.isdir("data"):
+        shutil.copytree("data", os.path.join(root, "data"), ignore=lambda d, names: [
+            n for n in names if d == "data" and n in SCRATCH_SKIP])
+    return root
+
+
+# ---------------- CLI ----------------
+def _print_level(r: dict) -> None:
+    slow = ", ".join(f"{k} {v:.0f}" for k, v in r["slowest_steps"])
+    print(f"{r['sessions']:>4} {r['reruns']:>7} {r['throughput']:>8.2f} "
+          f"{r['p50_ms']:>7.0f} {r['p90_ms']:>7.0f} {r['p95_ms']:>7.0f} {r['p99_ms']:>7.0f} "
+          f"{r['cpu_ms_per_rerun']:>8.0f} {r['cpu_util'] * 100:>5.0f}% {r['rss_mb']:>7.0f} "
+          f"{r['mb_per_session']:>7.1f} {r['errors']:>4}  {slow}", flush=True)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m modules.loadtest")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("run", help="step through session counts and report per-process latency and cost")
+    p.add_argument("--user", required=True, help="account in data/users.json to sign sessions in as")
+    p.add_argument("--role", choices=["admin", "estimator"], default="estimator")
+    p.add_argument("--team")
+    p.add_argument("--sessions", default=",".join(map(str, DEFAULT_SESSIONS)),
+                   help="comma-separated concurrent session counts")
+    p.add_argument("--iterations", type=int, default=3, help="script repetitions per session")
+    p.add_argument("--script", choices=sorted(SCRIPTS), default="takeoff")
+    p.add_argument("--seed", type=int, default=1)
+    p.add_argument("--slo-ms", type=float, default=2000.0, help="p95 rerun latency budget")
+    p.add_argument("--json", help="also write the results here")
+    p.add_argument("--in-place", action="store_true", help="use the real data/ instead of a scratch copy")
+    args = ap.parse_args(argv)
+
+    json_out = os.path.abspath(args.json) if args.json else None
+    repo = os.path.dirname(APP_PATH)
+    if repo not in sys.path:
+        sys.path.insert(0, repo)
+    os.chdir(repo)
+    scratch = None
+    if not args.in_place:
+        scratch = scratch_dir()
+        os.chdir(scratch)
+
+    import auth
+    token = auth.make_token(args.user, args.role, args.team)
+    if not auth.check_token(token):
+        print(f"unknown user: {args.user}", file=sys.stderr)
+        return 2
+    counts = [int(n) for n in args.sessions.split(",") if n.strip()]
+
+    print(f"script={args.script} iterations={args.iterations} cpus={os.cpu_count()} "
+          f"cwd={os.getcwd()}")
+    print("sess  reruns  rerun/s     p50     p90     p95     p99  cpu ms/r   cpu     rss  MB/sess  err  slowest steps (median ms)")
+    levels = []
+    try:
+        for n in counts:
+            levels.append(run_level(n, args.script, args.iterations, args.seed, token))
+            _print_level(levels[-1])
+    finally:
+        if scratch:
+            os.chdir(repo)
+            shutil.rmtree(scratch, ignore_errors=True)
+
+    over = [r["sessions"] for r in levels if r["p95_ms"] > args.slo_ms]
+    print("Per-process figures (one process per session), not contention inside one server process.")
+    if over:
+        print(f"p95 over {args.slo_ms:.0f} ms at {', '.join(map(str, over))} sessions.")
+    if levels:
+        cpu_ms = float(np.median([r["cpu_ms_per_rerun"] for r in levels]))
+        print(f"CPU per rerun ~{cpu_ms:.0f} ms: estimated ceiling for one app.py process (one core for "
+              f"every session) ~{1000 / max(cpu_ms, 1e-9):.1f} reruns/s.")
+    if json_out:
+        with open(json_out, "w", encoding="utf-8") as f:
+            json.dump({"args": vars(args), "levels": levels, "slo_exceeded_at": over}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
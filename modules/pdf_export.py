@@ -1,8 +1,12 @@
+import argparse
 import os
+import sys
+import time
 from datetime import datetime
 from io import BytesIO
 
 from reportlab.lib.pagesizes import letter
+from reportlab.pdfbase import pdfdoc
 from reportlab.pdfgen import canvas
 from reportlab.pdfbase.pdfmetrics import stringWidth  # <-- IMPORTANT
 
@@ -29,15 +33,19 @@ DEFAULT_ROWS = [
     'C/B - 5/16" X 1-1/4"',
     "RAIL ENDS",
     "TENSION WIRE",
+    "HOG RINGS",
     "LINE RAIL CLAMPS",
     "TRUSS ROD - 3/8 X",
     "TRUSS TIGHTENERS",
+    "BARBED WIRE",
+    "BARBED WIRE ROLLS",
     "SS GATES",
     "SLIDING GATES",
     "SS HINGES",
     "DD GATES",
     "DD HINGES",
     "WINDSCREEN",
+    "WINDSCREEN ROLLS",
     "CONCRETE",
     "QUICK ROCK",
 ]
@@ -47,6 +55,18 @@ def _norm_key(s: str) -> str:
     return (s or "").strip().upper()
 
 
+# Order form table: MATERIALS | QUANTITY | DESCRIPTION | PDT CD (the rest of the width).
+# DESCRIPTION leaves the code column room for the longest generated product code.
+MARGIN = 40
+COL_MATERIALS, COL_QUANTITY, COL_DESCRIPTION = 150, 75, 200
+
+
+def code_fits(code: str) -> bool:
+    """True when a product code prints in full (no ellipsis) in the PDT CD column."""
+    code_w = letter[0] - 2 * MARGIN - COL_MATERIALS - COL_QUANTITY - COL_DESCRIPTION - 8
+    return stringWidth(str(code or ""), "Helvetica", 8) <= code_w
+
+
 def _fit_one_line(text: str, max_w: float, font="Helvetica", size=8) -> str:
     """Trim text with ellipsis so it fits on one line within max_w."""
     if not text:
@@ -64,45 +84,59 @@ def _fit_one_line(text: str, max_w: float, font="Helvetica", size=8) -> str:
 
 
 def _draw_chainlink_order_form(c: canvas.Canvas, project: dict, items_by_row: dict, rows: list[str]) -> None:
-    """Draws the PDF content onto an existing reportlab canvas."""
+    _draw_order_form(c, project, items_by_row, rows, title="CHAINLINK")
+
+
+def _draw_order_form(c: canvas.Canvas, project: dict, items_by_row: dict, rows: list[str], title: str,
+                     layer: str = "all") -> None:
+    """
+    Draws the PDF content onto an existing reportlab canvas.
+    layer: "all", or "static" (grid, labels, row names: the same on every page with
+    the same rows and title) / "values" (header values, quantities, footer).
+    """
     W, H = letter
+    static = layer in ("all", "static")
+    values = layer in ("all", "values")
 
     # ---- Page geometry ----
-    left = 40
-    right = W - 40
+    left = MARGIN
+    right = W - MARGIN
     top = H - 35
 
     # ---- Title ----
     c.setFont("Helvetica-Bold", 14)
-    c.drawCentredString(W / 2, top, "ESTIMATING & ORDER FORM CHAINLINK")
+    if static:
+        c.drawCentredString(W / 2, top, f"ESTIMATING & ORDER FORM {title}")
 
     y = top - 28
     c.setFont("Helvetica", 9)
 
     # ---- Header lines ----
-    c.drawString(left, y, "PROJECT:")
-    c.line(left + 55, y - 2, left + 260, y - 2)
+    if static:
+        c.drawString(left, y, "PROJECT:")
+        c.line(left + 55, y - 2, left + 260, y - 2)
 
-    c.drawString(W - 260, y, "DUE DATE")
-    c.line(W - 210, y - 2, W - 120, y - 2)
+        c.drawString(W - 260, y, "DUE DATE")
+        c.line(W - 210, y - 2, W - 120, y - 2)
 
-    c.drawString(W - 115, y, "ORDER DATE")
-    c.line(W - 55, y - 2, W - 40, y - 2)
+        c.drawString(W - 115, y, "ORDER DATE")
+        c.line(W - 55, y - 2, W - 40, y - 2)
 
-    y -= 18
-    c.drawString(left, y, "Job Name")
-    c.line(left + 55, y - 2, left + 260, y - 2)
+        c.drawString(left, y - 18, "Job Name")
+        c.line(left + 55, y - 20, left + 260, y - 20)
 
-    c.drawString(W - 260, y, "PO #")
-    c.line(W - 230, y - 2, W - 120, y - 2)
+        c.drawString(W - 260, y - 18, "PO #")
+        c.line(W - 230, y - 20, W - 120, y - 20)
 
-    y -= 18
-    c.drawString(left, y, "HEIGHT-STYLE:")
-    c.line(left + 75, y - 2, left + 180, y - 2)
+        c.drawString(left, y - 36, "HEIGHT-STYLE:")
+        c.line(left + 75, y - 38, left + 180, y - 38)
+    y -= 36
 
     # ---- Fill header values ----
     c.setFont("Helvetica-Bold", 9)
 
+    if not values:
+        project = {}
     proj_val = str(project.get("project", "") or "")[:30]
     due_val = str(project.get("due_date", "") or "")[:12]
     order_val = str(project.get("order_date", "") or "")[:12]
@@ -133,35 +167,36 @@ def _draw_chainlink_order_form(c: canvas.Canvas, project: dict, items_by_row: di
 
     # MATERIALS | QUANTITY | DESCRIPTION | PRODUCT CODE
     x0 = table_left
-    x1 = x0 + 150   # Materials
-    x2 = x1 + 75    # Quantity
-    x3 = x2 + 250   # Description
+    x1 = x0 + COL_MATERIALS
+    x2 = x1 + COL_QUANTITY
+    x3 = x2 + COL_DESCRIPTION
     x4 = table_right  # Product Code stretches
 
     header_h = 18
     row_h = 14
 
-    # Outer box
-    c.rect(table_left, table_bottom, table_right - table_left, table_top - table_bottom, stroke=1, fill=0)
+    if static:
+        # Outer box
+        c.rect(table_left, table_bottom, table_right - table_left, table_top - table_bottom, stroke=1, fill=0)
 
-    # Vertical lines
-    for x in (x1, x2, x3):
-        c.line(x, table_bottom, x, table_top)
+        # Vertical lines
+        for x in (x1, x2, x3):
+            c.line(x, table_bottom, x, table_top)
 
-    # Header separator
-    c.line(table_left, table_top - header_h, table_right, table_top - header_h)
+        # Header separator
+        c.line(table_left, table_top - header_h, table_right, table_top - header_h)
 
-    # Header labels centered
-    c.setFont("Helvetica-Bold", 8)
-    header_y = table_top - 13
-    c.drawCentredString((x0 + x1) / 2, header_y, "MATERIALS")
-    c.drawCentredString((x1 + x2) / 2, header_y, "QUANTITY")
-    c.drawCentredString((x2 + x3) / 2, header_y, "DESCRIPTION")
-    c.drawCentredString((x3 + x4) / 2, header_y, "PDT CD")
+        # Header labels centered
+        c.setFont("Helvetica-Bold", 8)
+        header_y = table_top - 13
+        c.drawCentredString((x0 + x1) / 2, header_y, "MATERIALS")
+        c.drawCentredString((x1 + x2) / 2, header_y, "QUANTITY")
+        c.drawCentredString((x2 + x3) / 2, header_y, "DESCRIPTION")
+        c.drawCentredString((x3 + x4) / 2, header_y, "PDT CD")
     c.setFont("Helvetica", 8)
 
     # Normalize keys
-    normalized_items = {_norm_key(k): v for k, v in (items_by_row or {}).items()}
+    normalized_items = {_norm_key(k): v for k, v in (items_by_row or {}).items()} if values else {}
 
     # Rows
     y_row = table_top - header_h
@@ -170,15 +205,16 @@ def _draw_chainlink_order_form(c: canvas.Canvas, project: dict, items_by_row: di
 
     for row_name in use_rows:
         y_row -= row_h
-        c.line(table_left, y_row, table_right, y_row)
-
         row = normalized_items.get(_norm_key(row_name), {}) or {}
         qty = row.get("qty", "")
         desc = row.get("desc", "")
         code = row.get("code", "")
 
-        # Materials label (left aligned)
-        c.drawString(x0 + 3, y_row + 4, row_name)
+        if static:
+            c.line(table_left, y_row, table_right, y_row)
+
+            # Materials label (left aligned)
+            c.drawString(x0 + 3, y_row + 4, row_name)
 
         # Quantity centered
         if qty not in ("", None):
@@ -197,18 +233,80 @@ def _draw_chainlink_order_form(c: canvas.Canvas, project: dict, items_by_row: di
             c.drawCentredString((x3 + x4) / 2, y_row + 4, code_txt)
 
     # Footer timestamp
-    c.setFont("Helvetica", 7)
-    c.drawRightString(table_right, 50, f"Generated: {datetime.now():%Y-%m-%d %H:%M}")
-
-
-def export_chainlink_order_form_pdf_bytes(project: dict, items_by_row: dict, rows=None) -> bytes:
-    rows = rows or DEFAULT_ROWS
+    if values:
+        c.setFont("Helvetica", 7)
+        c.drawRightString(table_right, 50, f"Generated: {datetime.now():%Y-%m-%d %H:%M}")
+
+
+# ---------------- Output profiles ----------------
+# standard  reportlab defaults: every stream Flate-compressed, then ASCII85-encoded
+#           (7-bit safe, ~25% bigger).
+# compact   binary Flate streams, and the static part of each form (grid, labels,
+#           row names) drawn once per document as a form XObject that every page
+#           with the same title and rows reuses. Multi-job PDFs then carry one copy
+#           of the layout plus a short value stream per page.
+PROFILES = {
+    "standard": {"a85": True, "shared_layout": False},
+    "compact": {"a85": False, "shared_layout": True},
+}
+
+
+def _binary_streams(c) -> None:
+    """
+    Flate-only (no ASCII85) page and form streams for this canvas. reportlab picks
+    the filters from the process-wide rl_config.useA85 when it saves, so the
+    streams are built here, per document, before save() would look at it. This
+    uses reportlab's document internals (idToObject, page Contents), hence the
+    upper bound on reportlab in requirements.txt and tests/test_pdf_export.py.
+    """
+    for obj in list(c._doc.idToObject.values()):
+        if isinstance(obj, (pdfdoc.PDFPage, pdfdoc.PDFFormXObject)) and obj.stream and not obj.Contents:
+            obj.Contents = pdfdoc.PDFStream(content=obj.stream, filters=[pdfdoc.PDFZCompress])
+            obj.compression = 0
+
+
+def render_order_forms(forms: list[dict], profile: str = "standard") -> tuple[bytes, dict]:
+    """
+    One order form page per entry of forms: [{"project", "title", "rows", "items_by_row"}].
+    Returns (pdf bytes, report) where report is {"profile", "pages", "bytes", "ms"}.
+    """
+    opts = PROFILES[profile]
+    t0 = time.perf_counter()
     buffer = BytesIO()
-    c = canvas.Canvas(buffer, pagesize=letter)
-    _draw_chainlink_order_form(c, project=project, items_by_row=items_by_row, rows=rows)
+    layouts = {}
+    uses = {}
+    for form in forms:
+        key = (form.get("title", ""), tuple(form.get("rows") or DEFAULT_ROWS))
+        uses[key] = uses.get(key, 0) + 1
+    c = canvas.Canvas(buffer, pagesize=letter, pageCompression=1)
+    for form in forms:
+        rows = form.get("rows") or DEFAULT_ROWS
+        title = form.get("title", "")
+        key = (title, tuple(rows))
+        if opts["shared_layout"] and uses[key] > 1:   # a layout used once is cheaper inline
+            if key not in layouts:
+                layouts[key] = f"layout{len(layouts)}"
+                c.beginForm(layouts[key])
+                _draw_order_form(c, {}, None, rows, title, layer="static")
+                c.endForm()
+            c.doForm(layouts[key])
+            _draw_order_form(c, form.get("project") or {}, form.get("items_by_row"), rows, title, layer="values")
+        else:
+            _draw_order_form(c, form.get("project") or {}, form.get("items_by_row"), rows, title)
+        c.showPage()
+    if not opts["a85"]:
+        _binary_streams(c)
     c.save()
-    buffer.seek(0)
-    return buffer.read()
+    data = buffer.getvalue()
+    report = {"profile": profile, "pages": len(forms), "bytes": len(data),
+              "ms": (time.perf_counter() - t0) * 1000}
+    return data, report
+
+
+def export_chainlink_order_form_pdf_bytes(project: dict, items_by_row: dict, rows=None,
+                                          profile: str = "standard") -> bytes:
+    form = {"project": project, "title": "CHAINLINK", "rows": rows or DEFAULT_ROWS, "items_by_row": items_by_row}
+    return render_order_forms([form], profile)[0]
 
 
 def export_chainlink_order_form_pdf(out_path: str, project: dict, items_by_row: dict, rows=None) -> str:
@@ -218,3 +316,269 @@ def export_chainlink_order_form_pdf(out_path: str, project: dict, items_by_row:
     _draw_chainlink_order_form(c, project=project, items_by_row=items_by_row, rows=rows)
     c.save()
     return out_path
+
+
+def section_rows(rows: list[str], items_by_row: dict) -> list[str]:
+    """Template rows plus any extra keys (custom items, "ROW (2)" splits from a rollup) right after their base row."""
+    out = list(rows)
+    known = {_norm_key(r) for r in rows}
+    for key in items_by_row or {}:
+        if _norm_key(key) in known:
+            continue
+        base = key.rsplit(" (", 1)[0]
+        idx = next((i for i, r in enumerate(out) if _norm_key(r) == _norm_key(base)), None)
+        if idx is None:
+            out.append(key)
+        else:
+            while idx + 1 < len(out) and _norm_key(out[idx + 1]).startswith(_norm_key(base) + " ("):
+                idx += 1
+            out.insert(idx + 1, key)
+        known.add(_norm_key(key))
+    return out
+
+
+def export_order_form_pdf_bytes(project: dict, sections: list[dict], profile: str = "standard") -> bytes:
+    """
+    One order form page per section.
+    sections: [{"title": "WOOD", "rows": [...], "items_by_row": {...}}, ...]
+    """
+    forms = [
+        {"project": project, "title": sec.get("title", ""), "items_by_row": sec.get("items_by_row"),
+         "rows": section_rows(sec.get("rows") or DEFAULT_ROWS, sec.get("items_by_row"))}
+        for sec in sections
+    ]
+    return render_order_forms(forms, profile)[0]
+
+
+def _qty_str(v) -> str:
+    if v in ("", None):
+        return ""
+    return f"{v:g}" if isinstance(v, float) else str(v)
+
+
+def _draw_change_order(c: canvas.Canvas, project: dict, changes: list[dict], rev_from: int, rev_to: int,
+                       title: str) -> list[dict]:
+    """
+    changes: rows from modules.revisions.change_rows (row, was, now, change, unit, desc).
+    Draws one page; returns the rows that didn't fit.
+    """
+    W, H = letter
+    left, right, top = 40, W - 40, H - 35
+
+    c.setFont("Helvetica-Bold", 14)
+    c.drawCentredString(W / 2, top, f"CHANGE ORDER {title}".strip())
+
+    y = top - 28
+    c.setFont("Helvetica", 9)
+    c.drawString(left, y, "Job Name")
+    c.line(left + 55, y - 2, left + 260, y - 2)
+    c.drawString(W - 260, y, "REVISION")
+    c.line(W - 205, y - 2, W - 40, y - 2)
+    c.setFont("Helvetica-Bold", 9)
+    c.drawString(left + 58, y, str(project.get("job_name", "") or "")[:30])
+    c.drawString(W - 202, y, f"{rev_from} -> {rev_to}")
+
+    y -= 18
+    c.setFont("Helvetica", 9)
+    c.drawString(left, y, "HEIGHT-STYLE:")
+    c.line(left + 75, y - 2, left + 180, y - 2)
+    c.setFont("Helvetica-Bold", 9)
+    c.drawString(left + 78, y, str(project.get("height_style", "") or "")[:20])
+
+    # MATERIALS | WAS | NOW | CHANGE | DESCRIPTION
+    table_top, table_bottom = y - 18, 65
+    x0 = left
+    x1 = x0 + 150
+    x2 = x1 + 60
+    x3 = x2 + 60
+    x4 = x3 + 60
+    x5 = right
+    header_h, row_h = 18, 14
+
+    c.rect(left, table_bottom, right - left, table_top - table_bottom, stroke=1, fill=0)
+    for x in (x1, x2, x3, x4):
+        c.line(x, table_bottom, x, table_top)
+    c.line(left, table_top - header_h, right, table_top - header_h)
+
+    c.setFont("Helvetica-Bold", 8)
+    header_y = table_top - 13
+    for (a, b), label in zip(((x0, x1), (x1, x2), (x2, x3), (x3, x4), (x4, x5)),
+                             ("MATERIALS", "WAS", "NOW", "CHANGE", "DESCRIPTION")):
+        c.drawCentredString((a + b) / 2, header_y, label)
+
+    y_row = table_top - header_h
+    max_rows = int((y_row - table_bottom) // row_h)
+    if not changes:
+        c.setFont("Helvetica", 8)
+        c.drawString(x0 + 3, y_row - row_h + 4, "No changes.")
+    for ch in changes[:max_rows]:
+        y_row -= row_h
+        c.line(left, y_row, right, y_row)
+        c.setFont("Helvetica", 8)
+        c.drawString(x0 + 3, y_row + 4, _fit_one_line(ch["row"], x1 - x0 - 6))
+        c.drawCentredString((x1 + x2) / 2, y_row + 4, _qty_str(ch["was"]))
+        c.drawCentredString((x2 + x3) / 2, y_row + 4, _qty_str(ch["now"]))
+        c.setFont("Helvetica-Bold", 8)
+        delta = ch["change"]
+        sign = "+" if delta > 0 else ""
+        c.drawCentredString((x3 + x4) / 2, y_row + 4, f"{sign}{_qty_str(delta)} {ch['unit']}".strip())
+        c.setFont("Helvetica", 8)
+        desc = ("* " if ch.get("desc_changed") else "") + (ch.get("desc") or "")
+        c.drawCentredString((x4 + x5) / 2, y_row + 4, _fit_one_line(desc, x5 - x4 - 8))
+
+    c.setFont("Helvetica", 7)
+    c.drawString(left, 50, "* description changed")
+    c.drawRightString(right, 50, f"Generated: {datetime.now():%Y-%m-%d %H:%M}")
+    return changes[max_rows:]
+
+
+def export_change_order_pdf_bytes(project: dict, changes: list[dict], rev_from: int, rev_to: int,
+                                  title: str = "CHAINLINK") -> bytes:
+    """Change order listing only the rows that differ between two revisions."""
+    buffer = BytesIO()
+    c = canvas.Canvas(buffer, pagesize=letter)
+    remaining = _draw_change_order(c, project, changes, rev_from, rev_to, title)
+    while remaining:
+        c.showPage()
+        remaining = _draw_change_order(c, project, remaining, rev_from, rev_to, title)
+    c.save()
+    buffer.seek(0)
+    return buffer.read()
+
+
+# ---------------- Load sheet ----------------
+def _load_lines(plan: dict) -> list[tuple]:
+    """The plan flattened to ("load", n, load) headings and ("item", item) rows."""
+    lines = []
+    for n, load in enumerate(plan["loads"], 1):
+        lines.append(("load", n, load))
+        lines += [("item", i) for i in load["items"]]
+    return lines
+
+
+def _draw_load_sheet(c: canvas.Canvas, project: dict, plan: dict, lines: list[tuple]) -> list[tuple]:
+    """One page of the load sheet; returns the lines that didn't fit."""
+    W, H = letter
+    left, right, top = 40, W - 40, H - 35
+
+    c.setFont("Helvetica-Bold", 14)
+    c.drawCentredString(W / 2, top, "LOAD SHEET")
+
+    y = top - 28
+    c.setFont("Helvetica", 9)
+    c.drawString(left, y, "Job Name")
+    c.line(left + 55, y - 2, left + 260, y - 2)
+    c.drawString(W - 260, y, "TOTAL")
+    c.line(W - 225, y - 2, W - 40, y - 2)
+    c.setFont("Helvetica-Bold", 9)
+    c.drawString(left + 58, y, str(project.get("job_name", "") or "")[:30])
+    c.drawString(W - 222, y, f"{len(plan['loads'])} loads, {plan['weight_lb']:,.0f} lb, {plan['bundles']} bundles")
+
+    # JOB | MATERIALS | BUNDLES | QTY | WEIGHT
+    table_top, table_bottom = y - 18, 65
+    x0 = left
+    x1 = x0 + 150
+    x2 = x1 + 150
+    x3 = x2 + 80
+    x4 = x3 + 70
+    x5 = right
+    header_h, row_h = 18, 14
+
+    c.rect(left, table_bottom, right - left, table_top - table_bottom, stroke=1, fill=0)
+    c.line(left, table_top - header_h, right, table_top - header_h)
+    for x in (x1, x2, x3, x4):
+        c.line(x, table_top - header_h, x, table_top)
+    c.setFont("Helvetica-Bold", 8)
+    header_y = table_top - 13
+    for (a, b), label in zip(((x0, x1), (x1, x2), (x2, x3), (x3, x4), (x4, x5)),
+                             ("JOB", "MATERIALS", "BUNDLES", "QTY", "WEIGHT (LB)")):
+        c.drawCentredString((a + b) / 2, header_y, label)
+
+    y_row = table_top - header_h
+    max_rows = int((y_row - table_bottom) // row_h)
+    for line in lines[:max_rows]:
+        y_row -= row_h
+        c.line(left, y_row, right, y_row)
+        if line[0] == "load":
+            _, n, load = line
+            c.setFillGray(0.9)
+            c.rect(left, y_row, right - left, row_h, stroke=0, fill=1)
+            c.setFillGray(0)
+            c.setFont("Helvetica-Bold", 8)
+            c.drawString(x0 + 3, y_row + 4, f"LOAD {n}: {load['truck']}")
+            c.drawRightString(x5 - 4, y_row + 4, f"{load['lb']:,.0f} / {load['max_lb']:,.0f} lb, "
+                                                 f"longest {load['longest_ft']:g}' of {load['bed_ft']:g}'")
+            continue
+        item = line[1]
+        for x in (x1, x2, x3, x4):   # column rules stop at the load headings
+            c.line(x, y_row, x, y_row + row_h)
+        c.setFont("Helvetica", 8)
+        c.drawString(x0 + 3, y_row + 4, _fit_one_line(str(item["job"]), x1 - x0 - 6))
+        c.drawString(x1 + 3, y_row + 4, _fit_one_line(item["row"], x2 - x1 - 6))
+        c.drawCentredString((x2 + x3) / 2, y_row + 4, f"{item['bundles']} {item['bundle']}")
+        c.drawCentredString((x3 + x4) / 2, y_row + 4, _qty_str(item["qty"]))
+        c.drawRightString(x5 - 4, y_row + 4, f"{item['lb']:,.0f}")
+
+    c.setFont("Helvetica", 7)
+    c.drawRightString(right, 50, f"Generated: {datetime.now():%Y-%m-%d %H:%M}")
+    return lines[max_rows:]
+
+
+def export_load_sheet_pdf_bytes(project: dict, plan: dict) -> bytes:
+    """Truck-by-truck load sheet for a modules.loads plan; goes out alongside the order form."""
+    buffer = BytesIO()
+    c = canvas.Canvas(buffer, pagesize=letter)
+    remaining = _draw_load_sheet(c, project, plan, _load_lines(plan))
+    while remaining:
+        c.showPage()
+        remaining = _draw_load_sheet(c, project, plan, remaining)
+    c.save()
+    buffer.seek(0)
+    return buffer.read()
+
+
+# ---------------- Size / timing report ----------------
+def _sample_forms(n: int) -> list[dict]:
+    return [
+        {"project": {"job_name": f"SAMPLE {i + 1}", "height_style": "6  GALV"}, "title": "CHAINLINK",
+         "rows": DEFAULT_ROWS,
+         "items_by_row": {r: {"qty": 10 + (i * 7 + j * 13) % 400, "desc": f"{r.title()} galvanized",
+                              "code": f"{j:02d}-{i:04d}"} for j, r in enumerate(DEFAULT_ROWS[:24])}}
+        for i in range(n)
+    ]
+
+
+def profile_report(forms: list[dict], repeat: int = 3) -> list[dict]:
+    """Each profile on the same forms: smallest-of-repeat timing, size, and size relative to standard."""
+    out = []
+    for profile in PROFILES:
+        best = None
+        for _ in range(repeat):
+            _, rep = render_order_forms(forms, profile)
+            if best is None or rep["ms"] < best["ms"]:
+                best = rep
+        out.append(best)
+    base = out[0]["bytes"] or 1
+    for rep in out:
+        rep["ratio"] = rep["bytes"] / base
+    return out
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m modules.pdf_export")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("report", help="size and render time of each output profile")
+    p.add_argument("--pages", default="1,10,100", help="comma-separated page counts of sample jobs")
+    p.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args(argv)
+
+    print(f"{'pages':>6} {'profile':<9} {'bytes':>9} {'vs std':>7} {'ms':>8} {'ms/page':>8}")
+    for n in (int(x) for x in args.pages.split(",") if x.strip()):
+        for rep in profile_report(_sample_forms(n), args.repeat):
+            print(f"{n:>6} {rep['profile']:<9} {rep['bytes']:>9,} {rep['ratio']:>6.0%} "
+                  f"{rep['ms']:>8.1f} {rep['ms'] / n:>8.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+from xml.sax.saxutils import escape
+
+from reportlab.lib.pagesizes import letter
+
+from modules.pdf_export import DEFAULT_ROWS, _draw_order_form
+
+# In-app preview of the order form.
+# _draw_order_form() only needs a handful of canvas calls, so SvgCanvas records
+# them as SVG elements instead of building a PDF. The preview comes from the
+# same drawing code as the export and costs a few milliseconds.
+
+_FONTS = {
+    "Helvetica": ("Helvetica, Arial, sans-serif", "normal"),
+    "Helvetica-Bold": ("Helvetica, Arial, sans-serif", "bold"),
+}
+
+
+class SvgCanvas:
+    """The subset of reportlab's Canvas used by the order form, drawn to SVG."""
+
+    def __init__(self, pagesize=letter):
+        self.w, self.h = pagesize
+        self._font = ("Helvetica", 10)
+        self._parts = []
+
+    def setFont(self, name, size):
+        self._font = (name, size)
+
+    def _text(self, x, y, text, anchor):
+        family, weight = _FONTS.get(self._font[0], _FONTS["Helvetica"])
+        self._parts.append(
+            f'<text x="{x:.1f}" y="{self.h - y:.1f}" font-family="{family}" font-weight="{weight}" '
+            f'font-size="{self._font[1]}" text-anchor="{anchor}">{escape(str(text))}</text>'
+        )
+
+    def drawString(self, x, y, text):
+        self._text(x, y, text, "start")
+
+    def drawCentredString(self, x, y, text):
+        self._text(x, y, text, "middle")
+
+    def drawRightString(self, x, y, text):
+        self._text(x, y, text, "end")
+
+    def line(self, x1, y1, x2, y2):
+        self._parts.append(
+            f'<line x1="{x1:.1f}" y1="{self.h - y1:.1f}" x2="{x2:.1f}" y2="{self.h - y2:.1f}"/>'
+        )
+
+    def rect(self, x, y, width, height, stroke=1, fill=0):
+        self._parts.append(
+            f'<rect x="{x:.1f}" y="{self.h - y - height:.1f}" width="{width:.1f}" height="{height:.1f}" '
+            f'fill="{"black" if fill else "none"}"/>'
+        )
+
+    def svg(self) -> str:
+        return (
+            f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {self.w:.0f} {self.h:.0f}" '
+            f'width="{self.w:.0f}" height="{self.h:.0f}">'
+            f'<rect width="100%" height="100%" fill="white"/>'
+            f'<g stroke="black" stroke-width="1">{"".join(p for p in self._parts if not p.startswith("<text"))}</g>'
+            f'<g fill="black">{"".join(p for p in self._parts if p.startswith("<text"))}</g>'
+            f"</svg>"
+        )
+
+
+def order_form_svg(project: dict, items_by_row: dict, rows=None, title: str = "CHAINLINK") -> str:
+    c = SvgCanvas()
+    _draw_order_form(c, project=project or {}, items_by_row=items_by_row, rows=rows or DEFAULT_ROWS, title=title)
+    return c.svg()
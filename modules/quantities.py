@@ -0,0 +1,129 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+# Unit-aware quantities.
+# A Qty holds a raw amount in a base unit (LF or EA) plus how it gets ordered:
+# round up to a multiple (ties by 50s), a pack size (box of 100, 1320' roll) and a
+# rounding policy. Nothing is rounded while the takeoff is being worked out;
+# finalize() converts every quantity in one vectorized pass at the end.
+
+UNITS = {
+    "LF": "linear feet",
+    "EA": "each",
+    "RL": "roll",
+    "BX": "box",
+    "CF": "cubic feet",
+    "BG": "bag",
+    "YD": "cubic yard",
+}
+
+POLICIES = ("ceil", "floor", "round", "trunc", "exact")
+
+
+@dataclass
+class Qty:
+    raw: float = 0.0
+    unit: str = "EA"          # base unit of raw: LF, EA or CF
+    order_unit: str = None    # unit on the order form (RL, BX); None = same as unit
+    pack: float = 1.0         # base units per order unit (100 per box, 1320 LF per roll)
+    multiple: float = 1.0     # round up to this many base units before packing (ties: 50)
+    policy: str = "ceil"      # how raw becomes a whole base amount before `multiple` ("exact": left as is)
+    of: tuple = ()            # derived: raw = sum of these rows' finalized base amounts
+
+    def __post_init__(self):
+        if self.unit not in UNITS or (self.order_unit and self.order_unit not in UNITS):
+            raise ValueError(f"unknown unit: {self.unit} / {self.order_unit}")
+        if self.policy not in POLICIES:
+            raise ValueError(f"policy must be one of {POLICIES}")
+
+    @property
+    def out_unit(self) -> str:
+        return self.order_unit or self.unit
+
+    # ---- constructors for the common shapes ----
+    @classmethod
+    def each(cls, raw, multiple=1, policy="ceil"):
+        return cls(raw=raw, unit="EA", multiple=multiple, policy=policy)
+
+    @classmethod
+    def feet(cls, raw, policy="trunc"):
+        return cls(raw=raw, unit="LF", policy=policy)
+
+    @classmethod
+    def boxes(cls, raw=0.0, per_box=100, of=()):
+        return cls(raw=raw, unit="EA", order_unit="BX", pack=per_box, of=tuple(of))
+
+    @classmethod
+    def rolls(cls, feet, roll_length):
+        return cls(raw=feet, unit="LF", order_unit="RL", pack=roll_length)
+
+    @classmethod
+    def volume(cls, cuft, per_unit, order_unit="BG"):
+        """Cubic feet ordered in bags (per_unit = yield per bag) or yards (27)."""
+        return cls(raw=cuft, unit="CF", order_unit=order_unit, pack=per_unit, policy="exact")
+
+
+def _whole(raw: np.ndarray, policy: np.ndarray) -> np.ndarray:
+    out = np.ceil(raw)
+    out = np.where(policy == "floor", np.floor(raw), out)
+    out = np.where(policy == "round", np.round(raw), out)
+    out = np.where(policy == "trunc", np.trunc(raw), out)
+    out = np.where(policy == "exact", raw, out)
+    return out
+
+
+def _convert(qtys: list, raw: np.ndarray):
+    """-> (base amounts after rounding/multiples, order amounts after packing)"""
+    policy = np.array([q.policy for q in qtys])
+    multiple = np.array([q.multiple for q in qtys], dtype=float)
+    pack = np.array([q.pack for q in qtys], dtype=float)
+
+    base = np.maximum(_whole(raw, policy), 0)
+    base = np.ceil(base / multiple) * multiple
+    order = np.ceil(base / pack)
+    return base, order
+
+
+def finalize(quantities: dict) -> dict:
+    """
+    {row: Qty or None} -> {row: {"qty": int or "", "unit": str}}
+    All plain quantities convert in one vectorized pass; rows derived from other
+    rows (`of=`) follow in a second pass over the first pass's base amounts.
+    """
+    return finalize_many([quantities])[0]
+
+
+def finalize_many(takeoffs: list) -> list:
+    """finalize() for several takeoffs (runs of a project) at once, still two numpy passes in total."""
+    out = [{} for _ in takeoffs]
+    base = {}   # (takeoff index, row) -> finalized base amount
+
+    plain, derived = [], []
+    for i, quantities in enumerate(takeoffs):
+        for k, q in quantities.items():
+            if q is None:
+                out[i][k] = {"qty": "", "unit": ""}
+            else:
+                (derived if q.of else plain).append((i, k, q))
+
+    for batch in (plain, derived):
+        if not batch:
+            continue
+        qtys = [q for _, _, q in batch]
+        raw = np.array(
+            [q.raw + sum(base.get((i, r), 0) for r in q.of) for i, _, q in batch],
+            dtype=float,
+        )
+        b, order = _convert(qtys, raw)
+        for (i, k, q), bb, o in zip(batch, b, order):
+            base[(i, k)] = bb
+            out[i][k] = {"qty": int(o), "unit": q.out_unit}
+
+    return [{k: o[k] for k in quantities} for o, quantities in zip(out, takeoffs)]
+
+
+def fmt(qty, unit: str) -> str:
+    if qty in ("", None):
+        return ""
+    return f"{qty} {unit}".strip()
@@ -0,0 +1,232 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+
+from modules.filelock import locked
+
+# Takeoff revisions per job, for change orders.
+# data/revisions/<job>-<hash>.jsonl is append-only, one revision per line. A revision
+# stores only the rows that changed, each as [old, new] (None = not on the form),
+# so a diff between any two revisions is the composition of the deltas in
+# between and never touches unchanged rows. Every SNAPSHOT_EVERY revisions the
+# full form is stored as well, so rebuilding an old revision replays at most
+# that many deltas. The short hash of the raw job name keeps jobs whose names
+# sanitize alike ("A/B", "A B") in separate files; appends hold a lock on the
+# file so concurrent saves never both write the same revision number.
+
+REV_DIR = os.path.join("data", "revisions")
+SNAPSHOT_EVERY = 25
+
+_cache = {}   # path -> {"size": bytes parsed, "revs": [...], "head": items after the last rev}
+_lock = threading.Lock()
+_jobs_cache = {"mtime": None, "jobs": []}
+
+
+def _safe_name(name: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", str(name).strip()) or "_"
+
+
+def job_path(job: str) -> str:
+    digest = hashlib.sha1(str(job).encode("utf-8")).hexdigest()[:8]
+    return os.path.join(REV_DIR, f"{_safe_name(job)}-{digest}.jsonl")
+
+
+def jobs() -> list[str]:
+    """Saved job names. Only re-read when a job file is added or removed (directory mtime)."""
+    try:
+        mtime = os.stat(REV_DIR).st_mtime_ns
+    except FileNotFoundError:
+        return []
+    with _lock:
+        if _jobs_cache["mtime"] == mtime:
+            return list(_jobs_cache["jobs"])
+    out = []
+    for name in sorted(os.listdir(REV_DIR)):
+        if name.endswith(".jsonl"):
+            with open(os.path.join(REV_DIR, name), encoding="utf-8") as f:
+                first = f.readline()
+            if first.endswith("\n"):
+                out.append(json.loads(first).get("job") or name[:-6])
+    with _lock:
+        _jobs_cache.update(mtime=mtime, jobs=out)
+    return list(out)
+
+
+def _row_value(data: dict):
+    """Comparable value of one order-form row; None when the row is empty."""
+    if not data or data.get("qty") in ("", None):
+        return None
+    v = {"qty": data["qty"], "unit": data.get("unit", ""), "desc": data.get("desc", "")}
+    if data.get("code"):
+        v["code"] = data["code"]
+    return v
+
+
+def _apply(state: dict, rows: dict) -> None:
+    for row, (_, new) in rows.items():
+        if new is None:
+            state.pop(row, None)
+        else:
+            state[row] = new
+
+
+def _load(job: str):
+    """Parsed history for a job, reading only what was appended since last time."""
+    path = job_path(job)
+    try:
+        size = os.path.getsize(path)
+    except FileNotFoundError:
+        return {"size": 0, "revs": [], "head": {}}
+    with _lock:
+        entry = _cache.get(path)
+        if entry is None or entry["size"] > size:
+            entry = _cache[path] = {"size": 0, "revs": [], "head": {}}
+        if entry["size"] < size:
+            with open(path, "rb") as f:
+                f.seek(entry["size"])
+                tail = f.read(size - entry["size"])
+            complete = tail[:tail.rfind(b"\n") + 1]
+            for line in complete.splitlines():
+                rev = json.loads(line)
+                entry["revs"].append(rev)
+                _apply(entry["head"], rev["rows"])
+            entry["size"] += len(complete)
+        return entry
+
+
+# ---------------- Writing ----------------
+def save_revision(job: str, items_by_row: dict, spec: dict = None, user: str = None, note: str = "",
+                  meta: dict = None):
+    """
+    Append a revision if anything changed. Returns its number, or None when nothing did.
+    meta is the order form header (height-style, PO, ...) for re-exporting the job later.
+    """
+    if not (job or "").strip():
+        return None
+    os.makedirs(REV_DIR, exist_ok=True)
+    with open(job_path(job), "a", encoding="utf-8") as f, locked(f):
+        # Re-read the tail under the lock: another process may have just appended
+        rev = _next_revision(job, _load(job), items_by_row, spec, user, note, meta)
+        if rev is not None:
+            f.write(json.dumps(rev, separators=(",", ":")) + "\n")
+            f.flush()
+    return rev["rev"] if rev is not None else None
+
+
+def _next_revision(job, entry, items_by_row, spec, user, note, meta):
+    """The revision to append on top of entry's history, or None when nothing changed."""
+    head = entry["head"]
+    new = {row: v for row, v in ((r, _row_value(d)) for r, d in (items_by_row or {}).items()) if v is not None}
+
+    rows = {}
+    for row in head.keys() | new.keys():
+        old_v, new_v = head.get(row), new.get(row)
+        if old_v != new_v:
+            rows[row] = [old_v, new_v]
+    if not rows and entry["revs"]:
+        return None
+
+    prev_spec = (entry["revs"][-1].get("spec_full") if entry["revs"] else None) or {}
+    spec = {k: v for k, v in (spec or {}).items() if k != "spans"}
+    rev_no = len(entry["revs"]) + 1
+    rev = {
+        "job": job,
+        "rev": rev_no,
+        "ts": time.time(),
+        "user": user or "",
+        "note": note or "",
+        "rows": rows,
+        "spec": {k: [prev_spec.get(k), v] for k, v in spec.items() if prev_spec.get(k) != v},
+        "spec_full": spec,
+        "meta": meta or {},
+    }
+    if rev_no % SNAPSHOT_EVERY == 0:
+        rev["snapshot"] = {**head, **{r: v for r, (_, v) in rows.items() if v is not None}}
+        for r, (_, v) in rows.items():
+            if v is None:
+                rev["snapshot"].pop(r, None)
+    return rev
+
+
+# ---------------- Reading ----------------
+def revisions(job: str) -> list[dict]:
+    """Revision headers, oldest first."""
+    return [
+        {"rev": r["rev"], "ts": r["ts"], "user": r["user"], "note": r["note"], "changed": len(r["rows"])}
+        for r in _load(job)["revs"]
+    ]
+
+
+def latest(job: str) -> dict:
+    """{"rev", "ts", "user", "items_by_row", "meta", "spec"} for the newest revision, or None."""
+    entry = _load(job)
+    if not entry["revs"]:
+        return None
+    last = entry["revs"][-1]
+    return {"rev": last["rev"], "ts": last["ts"], "user": last["user"],
+            "items_by_row": dict(entry["head"]), "meta": last.get("meta") or {"job_name": job},
+            "spec": last.get("spec_full") or {}}
+
+
+def state_at(job: str, rev: int) -> dict:
+    """The whole form as of a revision (nearest snapshot, then replay)."""
+    revs = _load(job)["revs"][:rev]
+    start, state = 0, {}
+    for i in range(len(revs) - 1, -1, -1):
+        if "snapshot" in revs[i]:
+            start, state = i + 1, dict(revs[i]["snapshot"])
+            break
+    for r in revs[start:]:
+        _apply(state, r["rows"])
+    return state
+
+
+def diff(job: str, rev_from: int, rev_to: int) -> dict:
+    """
+    {row: [value at rev_from, value at rev_to]} for rows that differ.
+    Composes the deltas in between: cost is the number of changed rows, not form size.
+    """
+    revs = _load(job)["revs"]
+    lo, hi = sorted((rev_from, rev_to))
+    out = {}
+    for r in revs[lo:hi]:       # revisions lo+1 .. hi
+        for row, (old, new) in r["rows"].items():
+            out[row] = [out[row][0] if row in out else old, new]
+    if rev_from > rev_to:
+        out = {row: [new, old] for row, (old, new) in out.items()}
+    return {row: pair for row, pair in out.items() if pair[0] != pair[1]}
+
+
+def spec_diff(job: str, rev_from: int, rev_to: int) -> dict:
+    revs = _load(job)["revs"]
+    lo, hi = sorted((rev_from, rev_to))
+    out = {}
+    for r in revs[lo:hi]:
+        for key, (old, new) in r.get("spec", {}).items():
+            out[key] = [out[key][0] if key in out else old, new]
+    if rev_from > rev_to:
+        out = {k: [new, old] for k, (old, new) in out.items()}
+    return {k: pair for k, pair in out.items() if pair[0] != pair[1]}
+
+
+def change_rows(changes: dict, order: list = None) -> list[dict]:
+    """Diff -> display rows (was / now / change), in order-form order where known."""
+    rank = {r: i for i, r in enumerate(order or [])}
+    out = []
+    for row in sorted(changes, key=lambda r: (rank.get(r, len(rank)), r)):
+        old, new = changes[row]
+        was, now = (old or {}).get("qty", 0), (new or {}).get("qty", 0)
+        unit = (new or old or {}).get("unit", "")
+        out.append({
+            "row": row,
+            "was": was,
+            "now": now,
+            "change": now - was,
+            "unit": unit,
+            "desc": (new or old or {}).get("desc", ""),
+            "desc_changed": bool(old and new and old.get("desc") != new.get("desc")),
+        })
+    return out
@@ -0,0 +1,216 @@
+import re
+from dataclasses import dataclass, field
+
+# Length expressions and pasted segment schedules -> feet.
+#
+# A length expression is terms joined by "+"; a term is an optional count
+# ("3@", "3x", "3*") and a length in any of the forms estimators type off plans:
+#   120    120.5    1,200    120'    120 ft    120'6"    120'-6"    120' 6 1/2"    6"    120'6
+# so "120'6\" + 85' + 3@40'" is 325.5 ft.
+#
+# A segment schedule is one segment per line, typed or pasted from a
+# spreadsheet: cells split on tabs (or ; | and non-thousands commas). A first
+# line that names a length column (Length / Ft / LF ...) is a header, and cells
+# are read by column (Qty, Gate, Label ...). Otherwise the length is the cell
+# with foot/inch marks (or the first bare number), a whole-number cell is a
+# count, "gate" marks a gate opening and other text is the label. A label may
+# carry the length in the same cell ("Seg 3 120'") when the length is marked.
+# Bad lines are reported with their line number and the rest still parse.
+
+_NUM = r"\d+(?:,\d{3})*(?:\.\d*)?|\.\d+"
+_FT_MARK = r"(?:'|’|ft\.?|feet|foot)"
+_IN_MARK = r"(?:\"|”|''|in\.?|inch(?:es)?)"
+_RE_TERM = re.compile(
+    rf"""^(?:(?P<count>\d+)\s*[@xX×*]\s*)?               # 3@
+    (?:(?P<ft>{_NUM})\s*(?P<ft_mark>{_FT_MARK})\s*-?\s*)?  # 120'
+    (?P<inch>{_NUM})?                                   # 6
+    (?:[\s-]*(?P<fn>\d+)\s*/\s*(?P<fd>\d+))?              # 1/2
+    \s*(?P<in_mark>{_IN_MARK})?$""",
+    re.VERBOSE | re.IGNORECASE,
+)
+_RE_CELLS = re.compile(r"\t|;|\|")
+_RE_COMMA = re.compile(r",(?!\d{3}(?:\D|$))")
+_RE_SPLIT = re.compile(r"\s+(?=[\d.])")   # where a label may end and a length start: North gate| 12'
+_GATE_WORDS = {"gate", "g", "gate opening"}
+
+
+@dataclass
+class SegmentTakeoff:
+    segments: list = field(default_factory=list)   # {"line", "label", "length", "count", "gate"}
+    errors: list = field(default_factory=list)     # (line number, message)
+    fence_length: float = 0.0
+    gate_openings: list = field(default_factory=list)   # ft, one per gate
+    spans: list = field(default_factory=list)           # ft, one per fence segment
+
+    def to_inputs(self) -> dict:
+        return {"length": round(self.fence_length, 2)}
+
+
+def _num(s: str) -> float:
+    return float(s.replace(",", ""))
+
+
+def _term(text: str) -> tuple[int, float]:
+    m = _RE_TERM.match(text.strip())
+    if not m:
+        raise ValueError(f"can't read {text.strip()!r} as a length")
+    g = m.groupdict()
+    count = int(g["count"]) if g["count"] else 1
+    if not (g["ft"] or g["inch"] or g["fn"]):
+        raise ValueError(f"can't read {text.strip()!r} as a length")
+    if not g["ft"] and not g["in_mark"]:
+        if g["fn"]:
+            raise ValueError(f"mark feet (') or inches (\") in {text.strip()!r}")
+        return count, _num(g["inch"])   # a bare number is feet
+    inches = _num(g["inch"]) if g["inch"] else 0.0
+    if g["fn"]:
+        if not int(g["fd"]):
+            raise ValueError(f"bad fraction in {text.strip()!r}")
+        inches += int(g["fn"]) / int(g["fd"])
+    ft = (_num(g["ft"]) if g["ft"] else 0.0) + inches / 12
+    if count < 1:
+        raise ValueError(f"count must be at least 1 in {text.strip()!r}")
+    return count, ft
+
+
+def parse_terms(expr: str) -> list[tuple[int, float]]:
+    """"120'6\" + 3@40'" -> [(1, 120.5), (3, 40.0)]. Raises ValueError on anything it can't read."""
+    terms = (expr or "").split("+")
+    if not expr or not expr.strip() or any(not t.strip() for t in terms):
+        raise ValueError(f"incomplete length {(expr or '').strip()!r}")
+    return [_term(t) for t in terms]
+
+
+def parse_length(expr: str) -> float:
+    """Total feet of a length expression."""
+    return sum(n * ft for n, ft in parse_terms(expr))
+
+
+def to_length(s):
+    """Like app.to_float, for length inputs: None when blank or unreadable."""
+    try:
+        return parse_length(str(s)) if s is not None and str(s).strip() else None
+    except ValueError:
+        return None
+
+
+def _marked(text: str) -> bool:
+    """True when text is a length expression with a foot or inch mark on some term."""
+    try:
+        parse_terms(text)
+    except ValueError:
+        return False
+    return any((m := _RE_TERM.match(t.strip())) and (m["ft_mark"] or m["in_mark"]) for t in text.split("+"))
+
+
+def _split_label(cell: str):
+    """"Seg 3 120'" -> ("Seg 3", "120'"); None unless the cell ends in a marked length."""
+    for m in _RE_SPLIT.finditer(cell):
+        if _marked(cell[m.end():]):
+            return cell[:m.start()], cell[m.end():]
+    return None
+
+
+def _cells(line: str) -> list[str]:
+    cells = _RE_CELLS.split(line)
+    if len(cells) == 1:
+        cells = _RE_COMMA.split(line)
+    return [c.strip() for c in cells if c.strip()]
+
+
+# ---------------- Segment schedules ----------------
+_HEADERS = {
+    "length": ("length", "len", "ft", "feet", "distance", "footage", "lf"),
+    "count": ("qty", "count", "quantity", "no", "times", "x"),
+    "gate": ("gate", "type", "kind"),
+    "label": ("label", "name", "segment", "run", "id", "side", "desc", "description", "#"),
+}
+
+
+def _header(cells: list[str]):
+    """Column roles from a header row, or None when the row doesn't name a length column."""
+    roles = {}
+    for i, c in enumerate(cells):
+        key = c.lower().strip(" .:()")
+        for role, names in _HEADERS.items():
+            if role not in roles and (key in names or key.split(" ")[0] in names):
+                roles[role] = i
+                break
+    return roles if "length" in roles else None
+
+
+def _is_gate(cell: str) -> bool:
+    low = cell.lower()
+    return low in _GATE_WORDS or "gate" in low.split() or low in ("y", "yes", "true", "1")
+
+
+def _row(cells: list[str], roles) -> tuple[str, list, int, bool]:
+    """-> (label, terms, count, gate) for one line; raises ValueError."""
+    if roles is not None:
+        get = lambda role: cells[roles[role]] if role in roles and roles[role] < len(cells) else ""
+        if not get("length"):
+            raise ValueError("no length")
+        count = get("count")
+        if count and not count.isdigit():
+            raise ValueError(f"count {count!r} isn't a whole number")
+        return get("label"), parse_terms(get("length")), int(count or 1), bool(get("gate")) and _is_gate(get("gate"))
+
+    label, lengths, numbers, gate = [], [], [], False
+    for c in cells:
+        if c.lower() in _GATE_WORDS:
+            gate = True
+        elif c[0].isdigit() or c[0] == ".":
+            (lengths if _marked(c) else numbers).append(c)
+        else:
+            split = _split_label(c)
+            if split:
+                c = split[0]
+                lengths.append(split[1])
+            label.append(c)
+            gate = gate or "gate" in c.lower().split()
+    if not lengths and numbers:
+        lengths.append(numbers.pop(0))   # unmarked: the first number is the length
+    if not lengths:
+        raise ValueError("no length")
+    if len(lengths) > 1:
+        raise ValueError(f"extra length {lengths[1]!r}")
+    if len(numbers) > 1 or (numbers and not numbers[0].isdigit()):
+        raise ValueError(f"extra length {numbers[-1]!r}")
+    return " ".join(label), parse_terms(lengths[0]), int(numbers[0]) if numbers else 1, gate
+
+
+def parse_segments(text: str) -> SegmentTakeoff:
+    out = SegmentTakeoff()
+    roles, first = None, True
+    for lineno, raw in enumerate((text or "").splitlines(), start=1):
+        line = raw.strip()
+        if not line or line.startswith("#") and not first:
+            continue
+        cells = _cells(line)
+        if not cells:
+            continue
+        if first:
+            first = False
+            if not any(c[0].isdigit() or c[0] == "." for c in cells):
+                roles = _header(cells)
+                if roles is not None:
+                    continue   # header row; otherwise the line is data (or an error)
+        try:
+            label, terms, count, gate = _row(cells, roles)
+            if count < 1:
+                raise ValueError("count must be at least 1")
+            if not any(ft > 0 for _, ft in terms):
+                raise ValueError("length is zero")
+        except ValueError as e:
+            out.errors.append((lineno, f"{e} (got {' '.join(raw.split())!r})"))
+            continue
+        for n, ft in terms:
+            out.segments.append({"line": lineno, "label": label, "length": ft, "count": n * count, "gate": gate})
+
+    for seg in out.segments:
+        if seg["gate"]:
+            out.gate_openings += [seg["length"]] * seg["count"]
+        else:
+            out.spans += [seg["length"]] * seg["count"]
+    out.fence_length = sum(out.spans)
+    return out
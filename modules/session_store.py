@@ -0,0 +1,212 @@
+import atexit
+import os
+import pickle
+import shutil
+import tempfile
+import threading
+import time
+
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+# Per-process memory budget for large per-session artifacts (PDF bytes, takeoff
+# and project results, cut plans). They live here, keyed by (session id, name),
+# instead of in st.session_state, so the process can account for them and let
+# go of them:
+#   - a value bigger than SPILL_BYTES goes straight to a spill file on disk;
+#   - when the in-memory total passes the budget (JBS_SESSION_BUDGET_MB), the
+#     least recently used values of any session are spilled until it fits;
+#   - a sweeper thread spills everything held by sessions idle for
+#     JBS_SESSION_IDLE_S, and deletes the artifacts of sessions gone for DROP_S.
+# get() reads a spilled value back transparently (small ones move back into
+# memory), so callers never see the difference. stats() reports what's held,
+# what's on disk and how much memory spilling and eviction have reclaimed
+# (replacing or popping a value isn't counted as reclaimed).
+
+BUDGET_BYTES = int(float(os.environ.get("JBS_SESSION_BUDGET_MB", "64")) * 1024 * 1024)
+IDLE_S = float(os.environ.get("JBS_SESSION_IDLE_S", "600"))
+DROP_S = float(os.environ.get("JBS_SESSION_DROP_S", str(3 * 3600)))
+SPILL_BYTES = 1024 * 1024   # bigger than this never stays in memory
+SWEEP_S = 60.0
+
+_lock = threading.RLock()
+_sessions = {}   # sid -> {"used": ts, "items": {name: {"value", "nbytes", "path", "used"}}}
+_counters = {"mem_bytes": 0, "spills": 0, "restores": 0, "idle_evictions": 0, "dropped_sessions": 0,
+             "reclaimed_bytes": 0}
+_spill_dir = None
+_sweeper = None
+
+
+def session_id() -> str:
+    ctx = get_script_run_ctx(suppress_warning=True)
+    return ctx.session_id if ctx is not None else "local"
+
+
+def _size(value) -> int:
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return len(value)
+    return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def _dir() -> str:
+    global _spill_dir
+    if _spill_dir is None:
+        _spill_dir = tempfile.mkdtemp(prefix=f"jbs-session-{os.getpid()}-")
+        atexit.register(shutil.rmtree, _spill_dir, True)
+    return _spill_dir
+
+
+# ---------------- Spilling ----------------
+def _spill(sid: str, name: str, item: dict) -> int:
+    """Moves one in-memory value to disk; returns the bytes freed."""
+    if item["path"] is None:
+        path = os.path.join(_dir(), f"{sid}-{name}.pkl")
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(item["value"], f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+        item["path"] = path
+    freed = item["nbytes"] if item["value"] is not None else 0
+    item["value"] = None
+    _counters["mem_bytes"] -= freed
+    _counters["reclaimed_bytes"] += freed
+    _counters["spills"] += 1 if freed else 0
+    return freed
+
+
+def _drop(item: dict) -> int:
+    """Forgets one value, in memory or on disk; returns the bytes freed."""
+    freed = item["nbytes"] if item["value"] is not None else 0
+    _counters["mem_bytes"] -= freed
+    if item["path"]:
+        try:
+            os.remove(item["path"])
+        except OSError:
+            pass
+    return freed
+
+
+def _enforce_budget(keep: tuple = None) -> None:
+    """Spill least recently used values, any session, until memory is under budget."""
+    if _counters["mem_bytes"] <= BUDGET_BYTES:
+        return
+    held = sorted(((item["used"], sid, name, item) for sid, s in _sessions.items()
+                   for name, item in s["items"].items() if item["value"] is not None and (sid, name) != keep),
+                  key=lambda t: t[0])
+    for _, sid, name, item in held:
+        if _counters["mem_bytes"] <= BUDGET_BYTES:
+            break
+        _spill(sid, name, item)
+
+
+# ---------------- Session API ----------------
+def put(name: str, value, sid: str = None) -> None:
+    sid = sid or session_id()
+    now = time.time()
+    nbytes = _size(value)
+    with _lock:
+        s = _sessions.setdefault(sid, {"used": now, "items": {}})
+        s["used"] = now
+        old = s["items"].pop(name, None)
+        if old is not None:
+            _drop(old)
+        item = s["items"][name] = {"value": value, "nbytes": nbytes, "path": None, "used": now}
+        _counters["mem_bytes"] += nbytes
+        if nbytes > SPILL_BYTES:
+            _spill(sid, name, item)
+        _enforce_budget(keep=(sid, name))
+    _ensure_sweeper()
+
+
+def get(name: str, default=None, sid: str = None):
+    sid = sid or session_id()
+    now = time.time()
+    with _lock:
+        s = _sessions.get(sid)
+        item = s["items"].get(name) if s else None
+        if item is None:
+            return default
+        s["used"] = item["used"] = now
+        if item["value"] is not None:
+            return item["value"]
+        with open(item["path"], "rb") as f:
+            value = pickle.load(f)
+        _counters["restores"] += 1
+        if item["nbytes"] <= SPILL_BYTES:
+            item["value"] = value
+            _counters["mem_bytes"] += item["nbytes"]
+            _enforce_budget(keep=(sid, name))
+        return value
+
+
+def pop(name: str, sid: str = None) -> None:
+    sid = sid or session_id()
+    with _lock:
+        s = _sessions.get(sid)
+        item = s["items"].pop(name, None) if s else None
+        if item is not None:
+            _drop(item)
+
+
+def touch(sid: str = None) -> None:
+    """Marks the session active (call once per rerun)."""
+    with _lock:
+        s = _sessions.get(sid or session_id())
+        if s is not None:
+            s["used"] = time.time()
+
+
+# ---------------- Eviction ----------------
+def sweep(now: float = None) -> int:
+    """Spills idle sessions' artifacts and drops abandoned sessions; returns the bytes freed."""
+    now = now or time.time()
+    freed = 0
+    with _lock:
+        for sid in list(_sessions):
+            s = _sessions[sid]
+            idle = now - s["used"]
+            if idle >= DROP_S:
+                dropped = sum(_drop(item) for item in s["items"].values())
+                _counters["reclaimed_bytes"] += dropped
+                freed += dropped
+                del _sessions[sid]
+                _counters["dropped_sessions"] += 1
+            elif idle >= IDLE_S:
+                spilled = sum(_spill(sid, name, item) for name, item in s["items"].items()
+                              if item["value"] is not None)
+                if spilled:
+                    _counters["idle_evictions"] += 1
+                    freed += spilled
+    return freed
+
+
+def _sweep_forever() -> None:
+    while True:
+        time.sleep(SWEEP_S)
+        try:
+            sweep()
+        except Exception:   # a failed sweep is retried next round, never fatal
+            pass
+
+
+def _ensure_sweeper() -> None:
+    global _sweeper
+    if _sweeper is None:
+        with _lock:
+            if _sweeper is None:
+                _sweeper = threading.Thread(target=_sweep_forever, name="jbs-session-sweeper", daemon=True)
+                _sweeper.start()
+
+
+# ---------------- Metrics ----------------
+def stats() -> dict:
+    with _lock:
+        items = [(s, item) for s in _sessions.values() for item in s["items"].values()]
+        now = time.time()
+        return {
+            "sessions": len(_sessions),
+            "idle_sessions": sum(1 for s in _sessions.values() if now - s["used"] >= IDLE_S),
+            "artifacts": len(items),
+            "budget_bytes": BUDGET_BYTES,
+            "spilled_bytes": sum(item["nbytes"] for _, item in items if item["value"] is None),
+            **_counters,
+        }
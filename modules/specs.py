@@ -0,0 +1,153 @@
+import json
+import os
+import re
+import threading
+
+from modules.desc_strings import normalize
+
+# Spec table: (style, height, duty) -> post / rail / fitting sizes.
+# data/spec_table.json is read once and indexed into a dict, so each line item is
+# a single O(1) lookup. Descriptions and product codes are generated from the row
+# instead of being picked by hand.
+SPEC_PATH = os.path.join("data", "spec_table.json")
+
+DUTIES = ["residential", "commercial", "industrial"]
+DEFAULT_DUTY = "commercial"
+
+FINISH_WORDS = {
+    "GALV": "galvanized",
+    "BLK": "black vinyl-coated",
+    "BLACK": "black vinyl-coated",
+    "GRN": "green vinyl-coated",
+    "GREEN": "green vinyl-coated",
+    "BRN": "brown vinyl-coated",
+}
+
+# Product code prefix per order-form row
+CODE_PREFIX = {
+    "FABRIC": "FAB",
+    "LINE POST": "LP",
+    "CORNER POST": "TP",
+    "GATE POST": "GP",
+    "TOP RAIL": "TR",
+    "LINE POST CAP": "LC",
+    "CORNER POST CAPS": "DC",
+    "GATE POST CAPS": "DC",
+    "TENSION BARS": "TBAR",
+    "BRACE BANDS": "BB",
+    "TENSION BANDS": "TBND",
+    "RAIL ENDS": "RE",
+    "LINE RAIL CLAMPS": "LRC",
+}
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def _load_index():
+    global _index
+    if _index is not None:
+        return _index
+    with _index_lock:
+        if _index is None:
+            idx = {}
+            if os.path.exists(SPEC_PATH):
+                with open(SPEC_PATH, "r", encoding="utf-8") as f:
+                    for row in json.load(f):
+                        idx[(row["style"], int(row["height"]), row["duty"])] = row
+            _index = idx
+    return _index
+
+
+def reload():
+    global _index
+    _index = None
+    return _load_index()
+
+
+def lookup(style: str, height_ft: int, duty: str = DEFAULT_DUTY):
+    """Spec row for this style / height / duty, or None if the table doesn't cover it."""
+    return _load_index().get((style, int(height_ft or 0), duty))
+
+
+def _od_code(od: str) -> str:
+    # '2 3/8"' -> '238', '4"' -> '400', '1-5/8"' -> '158'
+    digits = re.sub(r"\D", "", od)
+    return digits.ljust(3, "0") if len(digits) == 1 else digits
+
+
+def od_inches(od: str) -> float:
+    # '2 3/8"' -> 2.375, '4"' -> 4.0, '1-5/8"' -> 1.625, '6 5/8"' -> 6.625
+    m = re.match(r"\s*(\d+)(?:[ -](\d+)/(\d+))?", od or "")
+    if not m:
+        return 0.0
+    whole, num, den = m.groups()
+    return int(whole) + (int(num) / int(den) if num else 0.0)
+
+
+def _finish_word(finish: str) -> str:
+    return FINISH_WORDS.get((finish or "").upper(), (finish or "").lower())
+
+
+def generated_descs(spec: dict, finish: str = "") -> dict:
+    """Order-form row -> description built from a spec row."""
+    if not spec:
+        return {}
+    sch = spec["schedule"]
+    line_od, term_od, gate_od, rail_od = spec["line_post_od"], spec["terminal_post_od"], spec["gate_post_od"], spec["rail_od"]
+    fabric = f'2" mesh, {spec["fabric_gauge"]}, {_finish_word(finish) or "galvanized"} chain link fabric'
+    return {
+        "FABRIC": fabric,
+        "LINE POST": f"{line_od} OD {sch} x {spec['line_post_len']}'",
+        "CORNER POST": f"{term_od} OD {sch} x {spec['terminal_post_len']}'",
+        "GATE POST": f"{gate_od} OD {sch} x {spec['gate_post_len']}'",
+        "TOP RAIL": f"{rail_od} OD {sch} x 21' sw",
+        "LINE POST CAP": spec["line_cap"],
+        "CORNER POST CAPS": f"{term_od} DOME CAPS",
+        "GATE POST CAPS": f"{gate_od} DOME CAPS",
+        "TENSION BARS": f"{spec['tension_bar_len']}' Tension Bars ({spec['tension_bar_size']})",
+        "BRACE BANDS": f"{term_od} Bevel",
+        "TENSION BANDS": f"{term_od} Bevel",
+        "RAIL ENDS": f"{term_od} x {rail_od}",
+        "LINE RAIL CLAMPS": f"{line_od} x {rail_od}",
+    }
+
+
+def product_codes(spec: dict, finish: str = "") -> dict:
+    """Order-form row -> product code, e.g. LINE POST -> LP-238-S40-9-GALV."""
+    if not spec:
+        return {}
+    fin = (finish or "").upper()
+    sch = "S" + re.sub(r"\D", "", spec["schedule"])
+
+    def code(row, *parts):
+        return "-".join(str(p) for p in (CODE_PREFIX[row], *parts, fin) if p not in ("", None))
+
+    line_od, term_od, gate_od, rail_od = (_od_code(spec[k]) for k in
+                                          ("line_post_od", "terminal_post_od", "gate_post_od", "rail_od"))
+    return {
+        "FABRIC": code("FABRIC", "2", re.sub(r"ga$", "", spec["fabric_gauge"]), spec["height"]),
+        "LINE POST": code("LINE POST", line_od, sch, spec["line_post_len"]),
+        "CORNER POST": code("CORNER POST", term_od, sch, spec["terminal_post_len"]),
+        "GATE POST": code("GATE POST", gate_od, sch, spec["gate_post_len"]),
+        "TOP RAIL": code("TOP RAIL", rail_od, sch, 21),
+        "LINE POST CAP": code("LINE POST CAP", line_od),
+        "CORNER POST CAPS": code("CORNER POST CAPS", term_od),
+        "GATE POST CAPS": code("GATE POST CAPS", gate_od),
+        "TENSION BARS": code("TENSION BARS", spec["tension_bar_len"]),
+        "BRACE BANDS": code("BRACE BANDS", term_od),
+        "TENSION BANDS": code("TENSION BANDS", term_od),
+        "RAIL ENDS": code("RAIL ENDS", term_od, rail_od),
+        "LINE RAIL CLAMPS": code("LINE RAIL CLAMPS", line_od, rail_od),
+    }
+
+
+def codes_for(descs: dict, spec: dict, finish: str = "") -> dict:
+    """Product codes for the rows whose chosen description is still the generated one."""
+    gen = generated_descs(spec, finish)
+    codes = product_codes(spec, finish)
+    return {
+        row: codes[row]
+        for row, desc in (descs or {}).items()
+        if row in codes and desc and normalize(desc) == normalize(gen.get(row, ""))
+    }
@@ -0,0 +1,170 @@
+import importlib
+import pkgutil
+import threading
+
+import numpy as np
+
+from modules.footings import footing_quantities_many, footing_descs, posts_from_quantities
+from modules.quantities import Qty, finalize_many
+
+# Fence style plugins.
+# Each module in this package is one style and provides:
+#   NAME, LABEL       registry key / display name
+#   TITLE             order form title ("ESTIMATING & ORDER FORM <TITLE>")
+#   INPUTS            input schema: [{"key", "label", "type": int|float|bool|choice, "default", ...}]
+#   ROWS              order form rows, in print order
+#   TYPICALS          {row: [typical descriptions]}
+#   CATEGORIES        {row: description-library category}
+#   quantities(specs) list of specs -> list of {row: Qty or None}
+#   fixed_descs(spec) optional, descriptions that aren't picked by the estimator
+#   check(spec)       optional, errors across inputs (validate() runs it after the per-input checks)
+# Modules are only listed at startup; a style is imported the first time it's used.
+
+_plugins = {}
+_plugins_lock = threading.Lock()
+
+
+def available_styles() -> list[str]:
+    return sorted(m.name for m in pkgutil.iter_modules(__path__) if not m.name.startswith("_"))
+
+
+def get_style(name: str):
+    plugin = _plugins.get(name)
+    if plugin is not None:
+        return plugin
+    if name not in available_styles():
+        raise KeyError(f"unknown fence style: {name}")
+    with _plugins_lock:
+        if name not in _plugins:
+            _plugins[name] = importlib.import_module(f"{__name__}.{name}")
+    return _plugins[name]
+
+
+def style_label(name: str) -> str:
+    return get_style(name).LABEL
+
+
+def defaults(plugin) -> dict:
+    return {f["key"]: f.get("default") for f in plugin.INPUTS}
+
+
+def validate(plugin, spec: dict) -> list[str]:
+    errors = []
+    for f in plugin.INPUTS:
+        val = spec.get(f["key"])
+        if f["type"] in ("int", "float"):
+            if val is None:
+                errors.append(f"• {f['label']} is required.")
+            elif f.get("required") and val <= 0:
+                errors.append(f"• {f['label']} must be > 0.")
+            elif val < f.get("min", 0):
+                errors.append(f"• {f['label']} must be ≥ {f.get('min', 0)}.")
+    if hasattr(plugin, "check"):
+        errors += plugin.check(spec)
+    return errors
+
+
+# ---------------- Helpers for vectorized plugins ----------------
+def columns(inputs: list, specs: list[dict]) -> dict:
+    """Specs -> {input key: numpy array over runs}, schema defaults filled in."""
+    cols = {}
+    for f in inputs:
+        k = f["key"]
+        vals = [s.get(k, f.get("default")) for s in specs]
+        cols[k] = np.array(vals, dtype=object if f["type"] == "choice" else float)
+    return cols
+
+
+def per_run(qmap: dict, n: int) -> list[dict]:
+    """{row: Qty with array raw} -> one {row: Qty or None} per run. NaN raw means the row doesn't apply."""
+    runs = [{} for _ in range(n)]
+    for row, q in qmap.items():
+        raw = np.broadcast_to(np.asarray(q.raw, dtype=float), (n,)) if q is not None else None
+        for i in range(n):
+            if raw is None or np.isnan(raw[i]):
+                runs[i][row] = None
+            else:
+                runs[i][row] = Qty(raw=float(raw[i]), unit=q.unit, order_unit=q.order_unit, pack=q.pack,
+                                   multiple=q.multiple, policy=q.policy, of=q.of)
+    return runs
+
+
+# ---------------- Project ----------------
+def compute_project(runs: list[dict]):
+    """
+    runs: [{"style": name, "spec": {...}, "descs": {row: desc}, "footings": {...}?}, ...]
+    in any mix of styles. Every style computes its runs as one batch, footings for
+    every run are one vectorized call, then the whole project is finalized in a
+    single pass.
+    Returns (per-run items_by_row list, {style: rolled-up items_by_row}).
+    """
+    by_style = {}
+    for i, run in enumerate(runs):
+        by_style.setdefault(run["style"], []).append(i)
+
+    quantities = [None] * len(runs)
+    for style, idx in by_style.items():
+        plugin = get_style(style)
+        specs = [{**defaults(plugin), **runs[i].get("spec", {})} for i in idx]
+        for i, q in zip(idx, plugin.quantities(specs)):
+            quantities[i] = q
+
+    footed = [i for i, run in enumerate(runs) if run.get("footings")]
+    if footed:
+        posts = [posts_from_quantities(quantities[i]) for i in footed]
+        for i, f in zip(footed, footing_quantities_many(posts, [runs[i]["footings"] for i in footed])):
+            quantities[i] = {**quantities[i], **f}
+
+    finals = finalize_many(quantities)
+
+    items = []
+    for run, final in zip(runs, finals):
+        plugin = get_style(run["style"])
+        fixed = plugin.fixed_descs(run.get("spec", {})) if hasattr(plugin, "fixed_descs") else {}
+        if run.get("footings"):
+            fixed = {**fixed, **footing_descs(run["footings"])}
+        descs = {**fixed, **(run.get("descs") or {})}
+        items.append({
+            row: {"qty": f["qty"], "unit": f["unit"], "desc": descs.get(row, "") if f["qty"] != "" else ""}
+            for row, f in final.items()
+        })
+
+    return items, rollup(runs, items, quantities)
+
+
+def rollup(runs: list[dict], items: list[dict], quantities: list[dict]) -> dict:
+    """
+    Sum each style's runs into one items_by_row (rows with different descriptions kept apart).
+    Raw amounts are summed and finalized once, so a job doesn't order a part roll,
+    bag or stick per run. A derived row (`of=`) sums its runs' own raw plus the raw
+    of the rows it's derived from.
+    """
+    combined = {}   # style -> {key: Qty}
+    descs = {}      # style -> {key: desc}
+    for run, run_items, qtys in zip(runs, items, quantities):
+        style_qtys = combined.setdefault(run["style"], {})
+        style_descs = descs.setdefault(run["style"], {})
+        for row, q in qtys.items():
+            if q is None:
+                continue
+            desc, unit = run_items[row]["desc"], q.out_unit
+            key = row
+            n = 2
+            while key in style_qtys and (style_descs[key] != desc or style_qtys[key].out_unit != unit):
+                key = f"{row} ({n})"
+                n += 1
+            raw = q.raw + sum(qtys[r].raw for r in q.of if qtys.get(r) is not None)
+            prev = style_qtys.get(key)
+            if prev is None:
+                style_qtys[key] = Qty(raw=raw, unit=q.unit, order_unit=q.order_unit, pack=q.pack,
+                                      multiple=q.multiple, policy=q.policy)
+                style_descs[key] = desc
+            else:
+                prev.raw += raw
+
+    styles = list(combined)
+    finals = finalize_many([combined[style] for style in styles])
+    return {
+        style: {key: {"qty": f["qty"], "unit": f["unit"], "desc": descs[style][key]} for key, f in final.items()}
+        for style, final in zip(styles, finals)
+    }
@@ -0,0 +1,125 @@
+from modules.cut_optimizer import RAIL_STOCK_FT
+from modules.desc_lib import ROW_CATEGORIES
+from modules.pdf_export import DEFAULT_ROWS
+from modules.takeoff import chainlink_quantities, fixed_descs  # noqa: F401 (plugin hook)
+
+# Chainlink: the original calculator. The math lives in modules/takeoff.py (it also
+# does cut planning), so this plugin is a thin adapter over chainlink_quantities().
+
+NAME = "chainlink"
+LABEL = "Chainlink"
+TITLE = "CHAINLINK"
+
+INPUTS = [
+    {"key": "height", "label": "Height (ft)", "type": "int", "default": 6, "required": True},
+    {"key": "spacing", "label": "Post Spacing (ft)", "type": "float", "default": 10.0, "required": True},
+    {"key": "length", "label": "Length (ft)", "type": "float", "default": 0.0, "required": True},
+    {"key": "cor_post", "label": "Corner Posts (all terminals)", "type": "int", "default": 2},
+    {"key": "end_post", "label": "End Posts", "type": "int", "default": 2},
+    {"key": "gate_post", "label": "Gate Posts", "type": "int", "default": 0},
+    {"key": "has_top", "label": "Top Rail", "type": "bool", "default": True},
+    {"key": "mid_count", "label": "Mid Rails", "type": "int", "default": 0},
+    {"key": "has_bottom", "label": "Bottom Rail", "type": "bool", "default": False},
+    {"key": "has_tw", "label": "Bottom Tension Wire", "type": "bool", "default": False},
+    {"key": "has_truss", "label": "Truss Rods", "type": "bool", "default": False},
+    {"key": "has_bw", "label": "Barbed Wire", "type": "bool", "default": False},
+    {"key": "bw_strands", "label": "Barbed Wire Strands", "type": "int", "default": 3},
+    {"key": "rail_stock", "label": "Rail Stock Length (ft)", "type": "float", "default": RAIL_STOCK_FT, "required": True},
+]
+
+ROWS = DEFAULT_ROWS
+CATEGORIES = ROW_CATEGORIES
+
+TYPICALS = {
+    "FABRIC": [
+        '2" mesh, 9ga, galvanized chain link fabric',
+        '2" mesh, 11.5ga, galvanized chain link fabric',
+        '2" mesh, 9ga, black vinyl-coated chain link fabric',
+        '2" mesh, 11.5ga, black vinyl-coated chain link fabric',
+    ],
+    "LINE POST": [
+        '2 3/8" OD SCH. 40 x 9\'',
+        '2 3/8" OD SCH. 20 x 9\'',
+    ],
+    "LINE POST CAP": [
+        "LOOP CAPS",
+        '2 3/8" DOME CAPS',
+    ],
+    "TIES LINE POST": [
+        "9ga BLK LONG",
+        "9ga GALV LONG",
+    ],
+    "TOP RAIL": [
+        '1-5/8" OD SCH. 40 x 21\' sw',
+        '1-5/8" OD SCH. 20 x 21\' sw',
+    ],
+    "TIES TOP RAIL": [
+        "9ga BLK SHORT",
+        "9ga GALV SHORT",
+    ],
+    "CORNER POST": [
+        '2 7/8" OD SCH. 40 x 10\'',
+        '2 7/8" OD SCH. 20 x 10\'',
+    ],
+    "GATE POST": [
+        '4" OD SCH. 40 x 10\'',
+        '4" OD SCH. 20 x 10\'',
+    ],
+    "CORNER POST CAPS": [
+        '2 7/8" DOME CAPS',
+        '2 7/8" EXTERNAL DOME CAPS',
+    ],
+    "GATE POST CAPS": [
+        '4" Dome Caps',
+        '4" External Dome Caps',
+    ],
+    "TENSION BARS": [
+        '6\' Tension Bars (1/4" x 3/4")',
+        '8\' Tension Bars (1/4" x 3/4")',
+    ],
+    "BRACE BANDS": [
+        '2 7/8" Bevel',
+        '2 3/8" Bevel',
+    ],
+    "TENSION BANDS": [
+        '2 7/8" Bevel',
+        '2 3/8" Bevel',
+    ],
+    "RAIL ENDS": [
+        '2 7/8" x 1-5/8"',
+        '2 3/8" x 1-5/8"',
+    ],
+    "LINE RAIL CLAMPS": [
+        '2 3/8" x 1-5/8"',
+        '2 7/8" x 1-5/8"',
+    ],
+    "TENSION WIRE": [
+        "7ga GALV tension wire",
+        "9ga GALV tension wire",
+        "Vinyl-coated tension wire to match fabric",
+    ],
+    "TRUSS ROD - 3/8 X": [
+        'Truss Rod - 3/8" x (length per spec)',
+        'Truss Rod - 1/2" x (length per spec)',
+    ],
+    "WINDSCREEN": [
+        "6' Windscreen",
+    ],
+    "GATES": [
+        "6'H x 28'W Sliding",
+        "6'H x 15'W Double Drive",
+        "6'H x 10'W Double Drive",
+        "6'H x 8'W Double Drive",
+    ],
+}
+
+
+def check(spec: dict) -> list[str]:
+    cor_post, end_post = spec.get("cor_post"), spec.get("end_post")
+    if cor_post is not None and end_post is not None and end_post > cor_post:
+        return ["• End posts cannot exceed terminal posts."]
+    return []
+
+
+def quantities(specs: list[dict]) -> list[dict]:
+    return [chainlink_quantities(spec)[0] for spec in specs]
@@ -0,0 +1,117 @@
+import numpy as np
+
+from modules.quantities import Qty
+from modules.styles import columns, per_run
+
+# Ornamental (welded steel / aluminum panels).
+# Panels set the post count: one post per panel plus one per run, with terminals
+# and gate posts taken out of the line-post count. Formulas run on numpy arrays,
+# one element per run.
+
+NAME = "ornamental"
+LABEL = "Ornamental"
+TITLE = "ORNAMENTAL"
+
+INPUTS = [
+    {"key": "height", "label": "Height (ft)", "type": "int", "default": 5, "required": True},
+    {"key": "length", "label": "Length (ft)", "type": "float", "default": 0.0, "required": True},
+    {"key": "panel_width", "label": "Panel Width (ft)", "type": "float", "default": 8.0, "required": True},
+    {"key": "rails", "label": "Rails per Panel", "type": "int", "default": 3, "min": 2},
+    {"key": "corners", "label": "Corner Posts", "type": "int", "default": 0},
+    {"key": "ends", "label": "End Posts", "type": "int", "default": 2},
+    {"key": "gate_post", "label": "Gate Posts", "type": "int", "default": 0},
+    {"key": "surface_mount", "label": "Surface Mount (base plates)", "type": "bool", "default": False},
+]
+
+ROWS = [
+    "PANELS",
+    "LINE POST",
+    "CORNER POST",
+    "END POST",
+    "GATE POST",
+    "POST CAPS",
+    "PANEL BRACKETS",
+    "BRACKET SCREWS",
+    "BASE PLATES",
+    "ANCHOR BOLTS",
+    "SS GATES",
+    "DD GATES",
+    "CONCRETE",
+]
+
+CATEGORIES = {
+    "PANELS": "panels",
+    "LINE POST": "posts",
+    "CORNER POST": "posts",
+    "END POST": "posts",
+    "GATE POST": "posts",
+    "POST CAPS": "caps",
+    "PANEL BRACKETS": "fittings",
+}
+
+TYPICALS = {
+    "PANELS": [
+        "3-rail flat top steel panel, black",
+        "3-rail spear top steel panel, black",
+        "2-rail flat top aluminum panel, black",
+    ],
+    "LINE POST": [
+        '2" x 2" 14ga steel post',
+        '2 1/2" x 2 1/2" 12ga steel post',
+    ],
+    "CORNER POST": [
+        '2 1/2" x 2 1/2" 12ga steel post',
+    ],
+    "END POST": [
+        '2 1/2" x 2 1/2" 12ga steel post',
+    ],
+    "GATE POST": [
+        '4" x 4" 11ga steel post',
+        '3" x 3" 11ga steel post',
+    ],
+    "POST CAPS": [
+        "Flat post caps",
+        "Ball post caps",
+    ],
+    "PANEL BRACKETS": [
+        "Universal swivel brackets",
+        "Flat mount brackets",
+    ],
+}
+
+
+def quantities(specs: list[dict]) -> list[dict]:
+    c = columns(INPUTS, specs)
+    length, width = c["length"], c["panel_width"]
+    terminals = c["corners"] + c["ends"]
+
+    panels = np.ceil(length / width)
+    # One post per panel joint, plus one to close each open run (two ends per run);
+    # corners and gate posts stand in for line posts
+    posts = panels + np.ceil(c["ends"] / 2)
+    line = np.maximum(0, posts - terminals - c["gate_post"])
+    all_posts = line + terminals + c["gate_post"]
+    brackets = panels * c["rails"] * 2
+    surface = c["surface_mount"].astype(bool)
+    na = np.full(len(specs), np.nan)
+
+    return per_run({
+        "PANELS": Qty.each(panels),
+        "LINE POST": Qty.each(line),
+        "CORNER POST": Qty.each(c["corners"]),
+        "END POST": Qty.each(c["ends"]),
+        "GATE POST": Qty.each(c["gate_post"]),
+        "POST CAPS": Qty.each(all_posts),
+        "PANEL BRACKETS": Qty.each(brackets),
+        "BRACKET SCREWS": Qty.boxes(brackets * 2),
+        "BASE PLATES": Qty.each(np.where(surface, all_posts, na)),
+        "ANCHOR BOLTS": Qty.boxes(np.where(surface, all_posts * 4, na)),
+    }, len(specs))
+
+
+def fixed_descs(spec: dict) -> dict:
+    return {
+        "BRACKET SCREWS": "Self-tapping bracket screws (box of 100)",
+        "BASE PLATES": "Surface mount base plates",
+        "ANCHOR BOLTS": '3/8" wedge anchors (box of 100)',
+    }
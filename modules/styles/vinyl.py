@@ -0,0 +1,91 @@
+import numpy as np
+
+from modules.quantities import Qty
+from modules.styles import columns, per_run
+
+# Vinyl (PVC) privacy / picket panels: routed posts, one panel kit per section.
+# Gate posts take an aluminum stiffener. Formulas run on numpy arrays, one
+# element per run.
+
+NAME = "vinyl"
+LABEL = "Vinyl"
+TITLE = "VINYL"
+
+INPUTS = [
+    {"key": "height", "label": "Height (ft)", "type": "int", "default": 6, "required": True},
+    {"key": "length", "label": "Length (ft)", "type": "float", "default": 0.0, "required": True},
+    {"key": "panel_width", "label": "Panel Width (ft)", "type": "float", "default": 6.0, "required": True},
+    {"key": "corners", "label": "Corner Posts", "type": "int", "default": 0},
+    {"key": "ends", "label": "End Posts", "type": "int", "default": 2},
+    {"key": "gate_post", "label": "Gate Posts", "type": "int", "default": 0},
+]
+
+ROWS = [
+    "PANELS",
+    "LINE POST",
+    "CORNER POST",
+    "END POST",
+    "GATE POST",
+    "POST CAPS",
+    "GATE POST STIFFENERS",
+    "SS GATES",
+    "DD GATES",
+    "CONCRETE",
+]
+
+CATEGORIES = {
+    "PANELS": "panels",
+    "LINE POST": "posts",
+    "CORNER POST": "posts",
+    "END POST": "posts",
+    "GATE POST": "posts",
+    "POST CAPS": "caps",
+}
+
+TYPICALS = {
+    "PANELS": [
+        "6' x 6' white privacy panel kit",
+        "6' x 8' white privacy panel kit",
+        "4' x 8' white picket panel kit",
+    ],
+    "LINE POST": [
+        '5" x 5" line post',
+    ],
+    "CORNER POST": [
+        '5" x 5" corner post',
+    ],
+    "END POST": [
+        '5" x 5" end post',
+    ],
+    "GATE POST": [
+        '5" x 5" end post',
+    ],
+    "POST CAPS": [
+        '5" New England cap',
+        '5" flat cap',
+    ],
+}
+
+
+def quantities(specs: list[dict]) -> list[dict]:
+    c = columns(INPUTS, specs)
+    terminals = c["corners"] + c["ends"]
+
+    panels = np.ceil(c["length"] / c["panel_width"])
+    posts = panels + np.ceil(c["ends"] / 2)
+    line = np.maximum(0, posts - terminals - c["gate_post"])
+    all_posts = line + terminals + c["gate_post"]
+
+    return per_run({
+        "PANELS": Qty.each(panels),
+        "LINE POST": Qty.each(line),
+        "CORNER POST": Qty.each(c["corners"]),
+        "END POST": Qty.each(c["ends"]),
+        "GATE POST": Qty.each(c["gate_post"]),
+        "POST CAPS": Qty.each(all_posts),
+        "GATE POST STIFFENERS": Qty.each(np.where(c["gate_post"] > 0, c["gate_post"], np.nan)),
+    }, len(specs))
+
+
+def fixed_descs(spec: dict) -> dict:
+    return {"GATE POST STIFFENERS": "Aluminum gate post stiffener"}
@@ -0,0 +1,125 @@
+import numpy as np
+
+from modules.quantities import Qty
+from modules.styles import columns, per_run
+
+# Wood privacy / picket fence: posts on a fixed spacing, horizontal rails (2x4)
+# between posts, pickets across the whole length. Formulas run on numpy arrays,
+# one element per run.
+
+NAME = "wood"
+LABEL = "Wood"
+TITLE = "WOOD"
+
+INPUTS = [
+    {"key": "height", "label": "Height (ft)", "type": "int", "default": 6, "required": True},
+    {"key": "length", "label": "Length (ft)", "type": "float", "default": 0.0, "required": True},
+    {"key": "spacing", "label": "Post Spacing (ft)", "type": "float", "default": 8.0, "required": True},
+    {"key": "rails", "label": "Rails per Section", "type": "int", "default": 3, "min": 2},
+    {"key": "rail_stock", "label": "Rail Board Length (ft)", "type": "float", "default": 8.0, "required": True},
+    {"key": "picket_width", "label": "Picket Width (in)", "type": "float", "default": 5.5, "required": True},
+    {"key": "picket_gap", "label": "Picket Gap (in)", "type": "float", "default": 0.0},
+    {"key": "corners", "label": "Corner Posts", "type": "int", "default": 0},
+    {"key": "ends", "label": "End Posts", "type": "int", "default": 2},
+    {"key": "gate_post", "label": "Gate Posts", "type": "int", "default": 0},
+    {"key": "has_cap", "label": "Cap Board", "type": "bool", "default": False},
+]
+
+ROWS = [
+    "PICKETS",
+    "LINE POST",
+    "CORNER POST",
+    "END POST",
+    "GATE POST",
+    "RAILS",
+    "CAP BOARD",
+    "POST CAPS",
+    "PICKET NAILS",
+    "RAIL SCREWS",
+    "SS GATES",
+    "DD GATES",
+    "CONCRETE",
+]
+
+CATEGORIES = {
+    "PICKETS": "pickets",
+    "LINE POST": "posts",
+    "CORNER POST": "posts",
+    "END POST": "posts",
+    "GATE POST": "posts",
+    "RAILS": "rails",
+    "CAP BOARD": "rails",
+    "POST CAPS": "caps",
+}
+
+TYPICALS = {
+    "PICKETS": [
+        "1x6 dog-ear cedar picket",
+        "1x6 flat top pressure-treated picket",
+        "1x4 dog-ear cedar picket",
+    ],
+    "LINE POST": [
+        "4x4 pressure-treated post",
+        "2 3/8\" galvanized steel post",
+    ],
+    "CORNER POST": [
+        "4x4 pressure-treated post",
+        "6x6 pressure-treated post",
+    ],
+    "END POST": [
+        "4x4 pressure-treated post",
+        "6x6 pressure-treated post",
+    ],
+    "GATE POST": [
+        "6x6 pressure-treated post",
+        "4x4 pressure-treated post",
+    ],
+    "RAILS": [
+        "2x4 pressure-treated rail",
+    ],
+    "CAP BOARD": [
+        "2x6 cedar cap board",
+    ],
+    "POST CAPS": [
+        "4x4 flat wood post cap",
+        "4x4 pyramid post cap",
+    ],
+}
+
+
+def quantities(specs: list[dict]) -> list[dict]:
+    c = columns(INPUTS, specs)
+    length = c["length"]
+    terminals = c["corners"] + c["ends"]
+
+    sections = np.ceil(length / c["spacing"])
+    posts = sections + np.ceil(c["ends"] / 2)
+    line = np.maximum(0, posts - terminals - c["gate_post"])
+    all_posts = line + terminals + c["gate_post"]
+
+    # Rails butt at posts; a board spans as many sections as fit in its length
+    sections_per_board = np.maximum(1, np.floor(c["rail_stock"] / c["spacing"]))
+    rail_boards = np.ceil(sections / sections_per_board) * c["rails"]
+    pickets = np.ceil(length * 12 / (c["picket_width"] + c["picket_gap"]))
+    cap = np.where(c["has_cap"].astype(bool), np.ceil(length / c["rail_stock"]), np.nan)
+
+    return per_run({
+        "PICKETS": Qty.each(pickets),
+        "LINE POST": Qty.each(line),
+        "CORNER POST": Qty.each(c["corners"]),
+        "END POST": Qty.each(c["ends"]),
+        "GATE POST": Qty.each(c["gate_post"]),
+        "RAILS": Qty.each(rail_boards),
+        "CAP BOARD": Qty.each(cap),
+        "POST CAPS": Qty.each(all_posts),
+        # two nails per picket per rail, three screws per rail end
+        "PICKET NAILS": Qty.boxes(pickets * c["rails"] * 2, per_box=1000),
+        "RAIL SCREWS": Qty.boxes(sections * c["rails"] * 2 * 3),
+    }, len(specs))
+
+
+def fixed_descs(spec: dict) -> dict:
+    return {
+        "PICKET NAILS": "8d galvanized ring shank nails (box of 1000)",
+        "RAIL SCREWS": '#9 x 3" exterior deck screws (box of 100)',
+    }
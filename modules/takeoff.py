@@ -0,0 +1,165 @@
+import math
+
+from modules.cut_optimizer import plan_rails, plan_rolls, RAIL_STOCK_FT, BARB_ROLL_FT
+from modules.footings import footing_quantities, footing_descs
+from modules.quantities import Qty, finalize
+
+# Chainlink takeoff math, separate from the Streamlit UI.
+# spec: validated numeric inputs (see SPEC_DEFAULTS). descs: order-form row -> description.
+# Returns items_by_row in the same shape the Output section and PDF/XLSX exports use.
+
+SPEC_DEFAULTS = {
+    "height": 0,
+    "spacing": 0.0,
+    "length": 0.0,
+    "cor_post": 0,          # all terminal posts (true corners + ends)
+    "end_post": 0,
+    "gate_post": 0,
+    "has_top": True,
+    "mid_count": 0,
+    "has_bottom": False,
+    "has_tw": False,
+    "hog_spacing": None,    # ft between hog rings; None = no hog rings
+    "has_bw": False,
+    "bw_strands": 0,
+    "bw_roll_len": BARB_ROLL_FT,
+    "has_truss": False,
+    "has_ws": False,
+    "ws_feet": None,
+    "ws_roll_len": None,
+    "lp_override": None,    # line post count typed in by hand
+    "rail_stock": RAIL_STOCK_FT,
+    "spans": None,          # fence spans between terminals (from a layout), if known
+    "footings": None,       # footing config (see modules.footings); None = leave CONCRETE / QUICK ROCK empty
+}
+
+CB_DESC = 'C/B 5/16" x 1-1/4"'
+
+
+def runs_for(spans, total):
+    """Layout spans when they still add up to this footage, else one run."""
+    if spans and total and abs(sum(spans) - total) < 0.5:
+        return list(spans)
+    return [total] if total else []
+
+
+def chainlink_quantities(spec: dict):
+    """-> ({row: Qty or None}, {name: CutPlan}). Nothing is rounded to order units here."""
+    s = {**SPEC_DEFAULTS, **spec}
+    height, spacing, length = s["height"], s["spacing"], s["length"]
+    cor_post, end_post, gate_post = s["cor_post"], s["end_post"], s["gate_post"]
+    has_top, has_bottom, mid_count = s["has_top"], s["has_bottom"], s["mid_count"] or 0
+
+    total_rails = (1 if has_top else 0) + mid_count + (1 if has_bottom else 0)
+
+    # Post counts are whole things on the ground, so they're settled up front
+    if s["lp_override"] is not None:
+        line_posts = max(0, s["lp_override"])
+    else:
+        line_posts = max(0, math.ceil((length / spacing) - cor_post - gate_post))
+
+    true_corners = max(0, cor_post - end_post)
+    ten_bar = (true_corners * 2) + (end_post * 1) + (gate_post * 1)
+    rail_ends = ((true_corners * 2) + end_post + gate_post) * total_rails
+    line_rc = (mid_count + (1 if has_bottom else 0)) * line_posts
+    truss = cor_post if s["has_truss"] else 0
+
+    # Top, mid and bottom rails for every span packed into stock sticks together
+    plans = {"Rails": plan_rails(runs_for(s["spans"], length), total_rails, s["rail_stock"])}
+
+    q = {
+        "FABRIC": Qty.feet(length),
+
+        "LINE POST": Qty.each(line_posts),
+        "LINE POST CAP": Qty.each(line_posts),
+        "TIES LINE POST": Qty.each(height * line_posts, multiple=50),
+
+        "TOP RAIL": Qty.each(plans["Rails"].count),
+        "TIES TOP RAIL": Qty.each(length / 1.25, multiple=50) if has_top else None,
+
+        "CORNER POST": Qty.each(cor_post),
+        "CORNER POST CAPS": Qty.each(cor_post),
+
+        "GATE POST": Qty.each(gate_post),
+        "GATE POST CAPS": Qty.each(gate_post),
+
+        "TENSION BARS": Qty.each(ten_bar),
+        "BRACE BANDS": Qty.each(((true_corners * 4) + (end_post * 2) + (gate_post * 2)) * total_rails, multiple=50),
+        "TENSION BANDS": Qty.each((height - 1) * ten_bar, multiple=50),
+
+        # One carriage bolt per band, boxes of 100
+        'C/B - 5/16" X 1-1/4"': Qty.boxes(of=("BRACE BANDS", "TENSION BANDS")),
+        "RAIL ENDS": Qty.each(rail_ends),
+        "LINE RAIL CLAMPS": Qty.each(line_rc) if line_rc else None,
+
+        "TENSION WIRE": Qty.feet(length) if s["has_tw"] else None,
+        "HOG RINGS": None,
+
+        "TRUSS ROD - 3/8 X": Qty.each(truss) if s["has_truss"] else None,
+        "TRUSS TIGHTENERS": Qty.each(truss) if s["has_truss"] else None,
+
+        "BARBED WIRE": None,
+        "BARBED WIRE ROLLS": None,
+
+        "WINDSCREEN": None,
+        "WINDSCREEN ROLLS": None,
+
+        "CONCRETE": None,
+        "QUICK ROCK": None,
+    }
+
+    if s["has_tw"] and s["hog_spacing"]:
+        q["HOG RINGS"] = Qty.boxes(length / s["hog_spacing"])
+
+    if s["has_bw"] and s["bw_strands"]:
+        plans["Barbed wire rolls"] = plan_rolls(runs_for(s["spans"], length), s["bw_strands"], s["bw_roll_len"])
+        q["BARBED WIRE"] = Qty.feet(length * s["bw_strands"], policy="ceil")
+        q["BARBED WIRE ROLLS"] = Qty.rolls(plans["Barbed wire rolls"].ordered_ft, s["bw_roll_len"])
+
+    if s["has_ws"] and s["ws_feet"] is not None:
+        q["WINDSCREEN"] = Qty.feet(s["ws_feet"])
+        if s["ws_roll_len"]:
+            plans["Windscreen rolls"] = plan_rolls(runs_for(s["spans"], s["ws_feet"]), 1, s["ws_roll_len"])
+            q["WINDSCREEN ROLLS"] = Qty.rolls(plans["Windscreen rolls"].ordered_ft, s["ws_roll_len"])
+
+    if s["footings"]:
+        posts = {"line": line_posts, "corner": cor_post, "gate": gate_post}
+        q.update(footing_quantities(posts, s["footings"]))
+
+    return q, plans
+
+
+def compute_chainlink(spec: dict, descs: dict, codes: dict = None):
+    """-> (items_by_row, {name: CutPlan}). Rounding and pack conversion happen in one finalize() pass."""
+    quantities, plans = chainlink_quantities(spec)
+    final = finalize(quantities)
+
+    descs = {**fixed_descs(spec), **(descs or {})}
+    codes = codes or {}
+    items_by_row = {}
+    for row, f in final.items():
+        items_by_row[row] = {
+            "qty": f["qty"],
+            "unit": f["unit"],
+            "desc": descs.get(row, "") if f["qty"] != "" else "",
+        }
+        if f["qty"] != "" and codes.get(row):
+            items_by_row[row]["code"] = codes[row]
+    return items_by_row, plans
+
+
+def fixed_descs(spec: dict) -> dict:
+    s = {**SPEC_DEFAULTS, **spec}
+    descs = {
+        'C/B - 5/16" X 1-1/4"': CB_DESC,
+        "TRUSS TIGHTENERS": "Truss Tighteners",
+        "HOG RINGS": "Hog Rings (box of 100)",
+    }
+    if s["has_bw"]:
+        descs["BARBED WIRE"] = f"Barbed Wire — {s['bw_strands']} strand(s)"
+        descs["BARBED WIRE ROLLS"] = f"Barbed Wire {s['bw_roll_len']:g}' rolls"
+    if s["ws_roll_len"]:
+        descs["WINDSCREEN ROLLS"] = f"Windscreen {s['ws_roll_len']:g}' rolls"
+    if s["footings"]:
+        descs.update(footing_descs(s["footings"]))
+    return descs
@@ -0,0 +1,133 @@
+import pandas as pd
+import streamlit as st
+
+from modules import analytics, loads
+from modules.cache import cached
+from modules.pdf_export import export_order_form_pdf_bytes, section_rows
+from modules.pdf_preview import order_form_svg
+from modules.quantities import fmt
+from modules.xlsx_io import export_order_form_xlsx_bytes
+
+# Derived views, memoized with st.cache_data.
+# Arguments are hashed by content, so a rerun caused by typing in an unrelated
+# field gets the cached table / file bytes back instead of rebuilding them.
+
+OUTPUT_COLUMNS = ["Material", "Qty", "Description", "Code"]
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def output_table(items_by_row: dict) -> pd.DataFrame:
+    """items_by_row -> one row per material with a quantity, in order-form order."""
+    rows = [
+        (name, fmt(d["qty"], d.get("unit", "")), d.get("desc") or "N/A", d.get("code", ""))
+        for name, d in (items_by_row or {}).items()
+        if d.get("qty") not in ("", None)
+    ]
+    return pd.DataFrame(rows, columns=OUTPUT_COLUMNS)
+
+
+def show_output(items_by_row: dict) -> None:
+    st.dataframe(output_table(items_by_row), hide_index=True, width="stretch")
+
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def order_form_xlsx(project: dict, items_by_row: dict) -> bytes:
+    return export_order_form_xlsx_bytes(project, items_by_row)
+
+
+# Shared across workers (modules.cache). The PDF footer carries a timestamp,
+# so cached bytes are only reused for a minute.
+def project_pdf(project: dict, sections: list, profile: str = "standard") -> bytes:
+    return cached("pdf", [project, sections, profile],
+                  lambda: export_order_form_pdf_bytes(project, sections, profile), ttl=60)
+
+
+@st.cache_data(max_entries=16, ttl=60, show_spinner=False)
+def order_form_preview(project: dict, items_by_row: dict, rows: list = None, title: str = "CHAINLINK") -> str:
+    """SVG of the order form page, from the same drawing code as the PDF export."""
+    if rows is not None:
+        rows = section_rows(rows, items_by_row)
+    return order_form_svg(project, items_by_row, rows=rows, title=title)
+
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def history_rollup(n_jobs: int, by: tuple, rows: tuple, style: str, since: str, until: str) -> pd.DataFrame:
+    """n_jobs versions the cache: the job table only ever grows."""
+    return analytics.rollup(analytics.jobs(), by=list(by), rows=list(rows), style=style, since=since, until=until)
+
+
+CHANGE_COLUMNS = ["Material", "Was", "Now", "Change", "Unit", "Description"]
+
+
+def _change_color(v) -> str:
+    if isinstance(v, (int, float)) and v:
+        return "color: #1a7f37; font-weight: bold" if v > 0 else "color: #cf222e; font-weight: bold"
+    return ""
+
+
+def show_changes(changes: list[dict]) -> None:
+    """Revision diff (modules.revisions.change_rows): increases green, decreases red, new descriptions marked."""
+    df = pd.DataFrame(
+        [(c["row"], c["was"], c["now"], c["change"], c["unit"], ("* " if c["desc_changed"] else "") + c["desc"])
+         for c in changes],
+        columns=CHANGE_COLUMNS,
+    )
+    styled = df.style.map(_change_color, subset=["Change"]).format(
+        lambda v: f"{v:+g}" if v else "0", subset=["Change"]
+    ).format(lambda v: f"{v:g}", subset=["Was", "Now"])
+    st.dataframe(styled, hide_index=True, width="stretch")
+
+
+INVENTORY_COLUMNS = ["Material", "Need", "Unit", "On hand", "Other jobs", "Available", "Reserved", "Status"]
+
+
+def _status_color(v) -> str:
+    return {"short": "background-color: #ffebe9", "unit": "background-color: #fff8c5",
+            "not stocked": "color: #6e7781"}.get(v, "")
+
+
+def show_inventory(checked: list[dict]) -> None:
+    """modules.inventory.check() rows; shortages highlighted."""
+    df = pd.DataFrame(
+        [(r["row"], r["need"], r["unit"], r["on_hand"], r["reserved_other"], r["available"], r["reserved"],
+          r["status"] if r["status"] != "short" else f"short {r['short']:g}") for r in checked],
+        columns=INVENTORY_COLUMNS,
+    )
+    styled = df.style.map(lambda v: _status_color(str(v).split(" ")[0] if str(v).startswith("short") else v),
+                          subset=["Status"]).format(lambda v: "" if pd.isna(v) else f"{v:g}",
+                                                    subset=["Need", "On hand", "Other jobs", "Available", "Reserved"])
+    st.dataframe(styled, hide_index=True, width="stretch")
+
+
+LOAD_COLUMNS = ["Load", "Truck", "Jobs", "Weight (lb)", "Max (lb)", "Longest (ft)", "Slots"]
+MATERIAL_VIEW_COLUMNS = ["Job", "Material", "Qty", "Unit", "Bundles", "Bundle", "Each (lb)", "Length (ft)",
+                         "Weight (lb)"]
+
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def delivery_plan(jobs: list, trucks: list, mix_jobs: bool) -> tuple[pd.DataFrame, dict]:
+    """(materials table, modules.loads plan) for a delivery day; re-plans only when jobs, fleet or mode change."""
+    df, unknown = loads.materials(jobs)
+    plan = loads.pack(df, trucks, mix_jobs)
+    plan["unknown"] = unknown
+    return df, plan
+
+
+def show_materials(df: pd.DataFrame) -> None:
+    view = df[["job", "row", "qty", "unit", "bundles", "bundle", "each_lb", "len_ft", "weight_lb"]]
+    view.columns = MATERIAL_VIEW_COLUMNS
+    st.dataframe(view.style.format("{:,.1f}", subset=["Each (lb)", "Weight (lb)"])
+                 .format("{:g}", subset=["Qty", "Length (ft)"]), hide_index=True, width="stretch")
+
+
+def show_loads(plan: dict) -> None:
+    """One row per truck load; loads over 90% of the truck's weight limit highlighted."""
+    df = pd.DataFrame(
+        [(n, ld["truck"], ", ".join(map(str, ld["jobs"])), ld["lb"], ld["max_lb"], ld["longest_ft"],
+          f"{ld['slots']:g} / {ld['max_slots']:g}") for n, ld in enumerate(plan["loads"], 1)],
+        columns=LOAD_COLUMNS,
+    )
+    full = df["Weight (lb)"] > 0.9 * df["Max (lb)"]
+    styled = df.style.apply(lambda col: ["font-weight: bold" if f else "" for f in full], subset=["Weight (lb)"]) \
+        .format("{:,.0f}", subset=["Weight (lb)", "Max (lb)"]).format("{:g}", subset=["Longest (ft)"])
+    st.dataframe(styled, hide_index=True, width="stretch")
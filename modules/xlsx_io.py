@@ -0,0 +1,286 @@
+import json
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+
+from openpyxl import Workbook, load_workbook
+
+from modules.desc_lib import ROW_CATEGORIES, add_entries
+from modules.pdf_export import DEFAULT_ROWS, _norm_key
+
+# XLSX import of legacy takeoff workbooks and streaming export of results.
+# Reads use openpyxl's read-only mode and writes use write-only mode, so memory
+# stays flat no matter how many jobs go through. No Excel install needed.
+
+# Header labels on the legacy sheet -> project meta keys (same keys as the PDF form)
+HEADER_LABELS = {
+    "PROJECT": "project",
+    "JOB NAME": "job_name",
+    "HEIGHT-STYLE": "height_style",
+    "DUE DATE": "due_date",
+    "ORDER DATE": "order_date",
+    "PO #": "po",
+    "PO": "po",
+}
+
+TABLE_COLUMNS = {
+    "MATERIALS": "row",
+    "QUANTITY": "qty",
+    "UNIT": "unit",
+    "DESCRIPTION": "desc",
+    "PDT CD": "code",
+    "PRODUCT CODE": "code",
+}
+
+TAKEOFF_HEADER = ["Job Name", "Project", "Height-Style", "Row", "Qty", "Unit", "Description", "Product Code"]
+ROLLUP_HEADER = ["Row", "Description", "Unit", "Total Qty", "Jobs"]
+
+
+def _label(v) -> str:
+    return _norm_key(str(v)).rstrip(":").strip() if v is not None else ""
+
+
+def _cell_str(v) -> str:
+    if v is None:
+        return ""
+    if hasattr(v, "strftime"):
+        return v.strftime("%Y-%m-%d")
+    if isinstance(v, float) and v.is_integer():
+        return str(int(v))
+    return str(v).strip()
+
+
+def _qty(v):
+    if v in (None, ""):
+        return ""
+    if isinstance(v, (int, float)):
+        return int(v) if float(v).is_integer() else v
+    try:
+        f = float(str(v).replace(",", ""))
+    except ValueError:
+        return str(v).strip()
+    return int(f) if f.is_integer() else f
+
+
+def parse_height_style(height_style: str):
+    """'6  BLK' / "6' GALV" -> (6, 'BLK'). Height is 0 when it can't be read."""
+    m = re.match(r"\s*(\d+)\s*['’]?\s*(.*)$", height_style or "")
+    if not m:
+        return 0, (height_style or "").strip().upper()
+    return int(m.group(1)), m.group(2).strip().upper()
+
+
+# ---------------- Import ----------------
+def _parse_sheet(rows):
+    """One worksheet (iterable of value tuples) -> job spec, or None if it isn't a takeoff sheet."""
+    meta = {}
+    items_by_row = {}
+    cols = None
+
+    for values in rows:
+        if cols is None:
+            labels = [_label(v) for v in values]
+            if "MATERIALS" in labels:
+                cols = {TABLE_COLUMNS[l]: i for i, l in enumerate(labels) if l in TABLE_COLUMNS}
+                continue
+            # Header block: label cell followed by the first non-empty value to its right
+            for i, lab in enumerate(labels):
+                key = HEADER_LABELS.get(lab)
+                if key and key not in meta:
+                    val = next((v for v in values[i + 1:] if v not in (None, "")), None)
+                    if val is not None and _label(val) not in HEADER_LABELS:
+                        meta[key] = _cell_str(val)
+            continue
+
+        get = lambda k: values[cols[k]] if k in cols and cols[k] < len(values) else None
+        row_name = _norm_key(_cell_str(get("row")))
+        if not row_name:
+            continue
+        qty = _qty(get("qty"))
+        desc = _cell_str(get("desc"))
+        code = _cell_str(get("code"))
+        if qty == "" and not desc and not code:
+            continue
+        items_by_row[row_name] = {"qty": qty, "unit": _cell_str(get("unit")).upper(), "desc": desc, "code": code}
+
+    if cols is None:
+        return None
+
+    height, finish = parse_height_style(meta.get("height_style", ""))
+    return {"project": meta, "items_by_row": items_by_row, "height": height, "finish": finish}
+
+
+def import_workbook(path: str) -> list[dict]:
+    """Reads every takeoff sheet in a legacy workbook into job specs."""
+    wb = load_workbook(path, read_only=True, data_only=True)
+    jobs = []
+    try:
+        for ws in wb.worksheets:
+            job = _parse_sheet(ws.iter_rows(values_only=True))
+            if job is None:
+                continue
+            job["source"] = f"{os.path.basename(path)}:{ws.title}"
+            if not job["project"].get("job_name"):
+                job["project"]["job_name"] = os.path.splitext(os.path.basename(path))[0]
+            jobs.append(job)
+    finally:
+        wb.close()
+    return jobs
+
+
+def _iter_xlsx_paths(paths):
+    for p in paths:
+        if os.path.isdir(p):
+            for root, _, files in os.walk(p):
+                for name in sorted(files):
+                    if name.lower().endswith(".xlsx") and not name.startswith("~$"):
+                        yield os.path.join(root, name)
+        else:
+            yield p
+
+
+def iter_import(paths, workers: int = None):
+    """Imports many workbooks (files or folders) in parallel, yielding job specs as they finish."""
+    files = list(_iter_xlsx_paths(paths))
+    if len(files) <= 1 or workers == 1:
+        for f in files:
+            yield from import_workbook(f)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for jobs in pool.map(import_workbook, files, chunksize=16):
+            yield from jobs
+
+
+def backfill_desc_library(jobs, style: str = "chainlink", user: str = None, team: str = None, scope: str = None) -> int:
+    """Adds every described row from imported jobs to the description library in one write."""
+    entries = []
+    for job in jobs:
+        if not job.get("height") or not job.get("finish"):
+            continue
+        for row_name, data in job["items_by_row"].items():
+            category = ROW_CATEGORIES.get(row_name)
+            if category and data.get("desc"):
+                entries.append((style, job["height"], job["finish"], category, data["desc"]))
+    return add_entries(entries, user=user, team=team, scope=scope)
+
+
+# ---------------- Export ----------------
+def export_takeoffs_xlsx(out, jobs) -> dict:
+    """
+    Streams jobs into a write-only workbook.
+    out:  path or binary file object
+    jobs: iterable of {"project": meta, "items_by_row": {...}}
+    Sheet "Takeoffs" gets one line per item; sheet "Rollup" totals numeric qty by row + description.
+    Returns {"jobs": n, "rows": n}.
+    """
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Takeoffs")
+    ws.append(TAKEOFF_HEADER)
+
+    rollup = {}
+    n_jobs = n_rows = 0
+    for job in jobs:
+        meta = job.get("project") or {}
+        n_jobs += 1
+        seen = set()
+        for row_name, data in (job.get("items_by_row") or {}).items():
+            qty = data.get("qty", "")
+            if qty in ("", None):
+                continue
+            desc = data.get("desc", "") or ""
+            unit = data.get("unit", "") or ""
+            ws.append([
+                meta.get("job_name", ""),
+                meta.get("project", ""),
+                meta.get("height_style", ""),
+                row_name,
+                qty,
+                unit,
+                desc,
+                data.get("code", "") or "",
+            ])
+            n_rows += 1
+            if isinstance(qty, (int, float)):
+                key = (row_name, desc, unit)
+                tot = rollup.setdefault(key, [0, 0])
+                tot[0] += qty
+                if key not in seen:
+                    tot[1] += 1
+                    seen.add(key)
+
+    rs = wb.create_sheet("Rollup")
+    rs.append(ROLLUP_HEADER)
+    order = {_norm_key(r): i for i, r in enumerate(DEFAULT_ROWS)}
+    for (row_name, desc, unit), (total, n) in sorted(rollup.items(), key=lambda kv: (order.get(_norm_key(kv[0][0]), len(order)), kv[0])):
+        rs.append([row_name, desc, unit, total, n])
+
+    wb.save(out)
+    return {"jobs": n_jobs, "rows": n_rows}
+
+
+def export_order_form_xlsx_bytes(project: dict, items_by_row: dict, rows=None) -> bytes:
+    """Single job in the same layout as the PDF order form (and the legacy sheets)."""
+    rows = rows or DEFAULT_ROWS
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Order Form")
+    ws.append(["ESTIMATING & ORDER FORM CHAINLINK"])
+    ws.append(["PROJECT:", project.get("project", ""), "DUE DATE", project.get("due_date", ""),
+               "ORDER DATE", project.get("order_date", "")])
+    ws.append(["Job Name", project.get("job_name", ""), "PO #", project.get("po", "")])
+    ws.append(["HEIGHT-STYLE:", project.get("height_style", "")])
+    ws.append([])
+    ws.append(["MATERIALS", "QUANTITY", "UNIT", "DESCRIPTION", "PDT CD"])
+
+    normalized_items = {_norm_key(k): v for k, v in (items_by_row or {}).items()}
+    for row_name in rows:
+        row = normalized_items.get(_norm_key(row_name), {}) or {}
+        ws.append([row_name, row.get("qty", ""), row.get("unit", ""), row.get("desc", ""), row.get("code", "")])
+
+    buffer = BytesIO()
+    wb.save(buffer)
+    return buffer.getvalue()
+
+
+# ---------------- CLI ----------------
+# python -m modules.xlsx_io import <files/folders...> [--out jobs.jsonl] [--backfill]
+# python -m modules.xlsx_io export <jobs.jsonl> <out.xlsx>
+def _iter_jsonl(path):
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if args[:1] == ["import"] and len(args) > 1:
+        backfill = "--backfill" in args
+        out_path = args[args.index("--out") + 1] if "--out" in args else None
+        skip = {"--backfill", "--out", out_path}
+        inputs = [a for a in args[1:] if a not in skip]
+
+        n_jobs = 0
+        backfill_jobs = []
+        out = open(out_path, "w", encoding="utf-8") if out_path else None
+        try:
+            for job in iter_import(inputs):
+                n_jobs += 1
+                if out:
+                    out.write(json.dumps(job) + "\n")
+                if backfill:
+                    backfill_jobs.append({k: job[k] for k in ("items_by_row", "height", "finish")})
+        finally:
+            if out:
+                out.close()
+        print(f"Imported {n_jobs} jobs.")
+        if backfill:
+            print(f"Backfilled {backfill_desc_library(backfill_jobs)} descriptions.")
+    elif args[:1] == ["export"] and len(args) == 3:
+        stats = export_takeoffs_xlsx(args[2], _iter_jsonl(args[1]))
+        print(f"Wrote {stats['rows']} rows from {stats['jobs']} jobs to {args[2]}.")
+    else:
+        print("usage: python -m modules.xlsx_io import <files/folders...> [--out jobs.jsonl] [--backfill]\n"
+              "       python -m modules.xlsx_io export <jobs.jsonl> <out.xlsx>")
+        sys.exit(1)
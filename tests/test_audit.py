@@ -0,0 +1,36 @@
+import multiprocessing
+import os
+
+from modules import audit
+
+PROCS = 8
+EVENTS = 500
+
+
+def _log_many(root, n):
+    audit.AUDIT_DIR = root
+    for i in range(n):
+        audit.log_event("calculate", f"user{os.getpid()}", i=i, pad="x" * (i % 97))
+        if i % 50 == 0:
+            audit.flush()
+    audit.flush()
+
+
+def test_concurrent_writers_keep_index_consistent(tmp_path):
+    root = str(tmp_path / "audit")
+    ctx = multiprocessing.get_context("fork")
+    procs = [ctx.Process(target=_log_many, args=(root, EVENTS)) for _ in range(PROCS)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+        assert p.exitcode == 0
+
+    events = list(audit.iter_events(root=root))
+    assert len(events) == PROCS * EVENTS
+    assert all(ev["data"] is not None for ev in events)
+    per_user = {}
+    for ev in events:
+        per_user.setdefault(ev["user"], set()).add(ev["data"]["i"])
+    assert len(per_user) == PROCS
+    assert all(seen == set(range(EVENTS)) for seen in per_user.values())
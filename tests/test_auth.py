@@ -0,0 +1,36 @@
+import json
+
+import auth
+
+
+def _setup(tmp_path, monkeypatch):
+    users = tmp_path / "users.json"
+    users.write_text(json.dumps({"sam": {"password": "", "role": "estimator"}}))
+    monkeypatch.setattr(auth, "USERS_PATH", str(users))
+    monkeypatch.setattr(auth, "REVOKED_DIR", str(tmp_path / "revoked_tokens"))
+    monkeypatch.setattr(auth, "_users_cache", (None, {}))
+
+
+def test_logout_revokes_only_that_token(tmp_path, monkeypatch):
+    _setup(tmp_path, monkeypatch)
+    mine, other_tab = auth.make_token("sam", "estimator"), auth.make_token("sam", "estimator")
+    assert auth.check_token(mine)["user"] == "sam"
+
+    auth.revoke_token(mine)
+    assert auth.check_token(mine) is None
+    assert auth.check_token(other_tab)["user"] == "sam"
+
+
+def test_revoke_tokens_signs_out_everywhere(tmp_path, monkeypatch):
+    _setup(tmp_path, monkeypatch)
+    tokens = [auth.make_token("sam", "estimator") for _ in range(3)]
+    auth.revoke_tokens("sam")
+    assert all(auth.check_token(t) is None for t in tokens)
+    assert auth.check_token(auth.make_token("sam", "estimator"))["user"] == "sam"
+
+
+def test_tampered_or_expired_tokens_fail(tmp_path, monkeypatch):
+    _setup(tmp_path, monkeypatch)
+    token = auth.make_token("sam", "estimator")
+    assert auth.check_token(token[:-2] + "xx") is None
+    assert auth.check_token(auth.make_token("sam", "estimator", ttl=-1)) is None
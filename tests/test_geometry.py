@@ -0,0 +1,22 @@
+from modules.geometry import takeoff_from_text
+
+
+def test_run_meeting_mid_segment_is_a_junction():
+    t = takeoff_from_text("0,0\n100,0\n\n50,0\n50,50")
+    assert (t.corner_posts, t.end_posts) == (1, 3)
+    assert t.spans == [50.0, 50.0, 50.0]
+
+
+def test_crossing_runs_get_a_post():
+    t = takeoff_from_text("0,0\n100,0\n\n50,-50\n50,50")
+    assert (t.corner_posts, t.end_posts) == (1, 4)
+    assert t.fence_length == 200.0
+    assert t.spans == [50.0] * 4
+
+
+def test_closed_loop_and_near_miss():
+    loop = takeoff_from_text("0,0\n100,0\n100,100\n0,100\n0,0")
+    assert (loop.corner_posts, loop.end_posts) == (4, 0)
+    apart = takeoff_from_text("0,0\n100,0\n\n50,10\n50,50")
+    assert (apart.corner_posts, apart.end_posts) == (0, 4)
+    assert apart.spans == [100.0, 40.0]
@@ -0,0 +1,8 @@
+from modules import golden
+
+CASES = 500   # the first N recorded cases; `python -m modules.golden check` runs them all
+
+
+def test_takeoffs_match_golden_file():
+    results = golden.run_all(CASES, workers=1)
+    assert golden.compare(results, golden.load()) == []
@@ -0,0 +1,45 @@
+import base64
+import re
+import zlib
+
+from modules import pdf_export
+
+_STREAM = re.compile(rb"<<(.*?)>>\s*stream\r?\n", re.S)
+
+
+def _streams(pdf: bytes):
+    """(dict text, decoded bytes) for every stream object, undoing the filters it declares."""
+    for m in _STREAM.finditer(pdf):
+        head = m.group(1)
+        n = int(re.search(rb"/Length (\d+)", head).group(1))
+        data = pdf[m.end():m.end() + n]
+        filters = re.findall(rb"/(ASCII85Decode|FlateDecode)", head)
+        for f in filters:
+            if f == b"ASCII85Decode":
+                data = data.strip()
+                data = base64.a85decode(data if data.startswith(b"<~") else b"<~" + data, adobe=True)
+            else:
+                data = zlib.decompress(data)
+        yield head, filters, data
+
+
+def _text(pdf: bytes) -> set:
+    return {t for _, _, data in _streams(pdf) for t in re.findall(rb"\((.*?)\) Tj", data)}
+
+
+def test_compact_profile_parses_and_keeps_every_string():
+    forms = pdf_export._sample_forms(3)
+    standard, _ = pdf_export.render_order_forms(forms, "standard")
+    compact, rep = pdf_export.render_order_forms(forms, "compact")
+
+    assert compact.startswith(b"%PDF-") and compact.rstrip().endswith(b"%%EOF")
+    assert b"/ASCII85Decode" not in compact
+    streams = list(_streams(compact))
+    assert streams and all(filters == [b"FlateDecode"] for _, filters, _ in streams)
+    assert sum(b"/Subtype /Form" in head for head, _, _ in streams) == 1   # one shared layout
+    assert len(re.findall(rb"/Type /Page\b", compact)) == rep["pages"] == 3
+
+    assert b"/ASCII85Decode" in standard
+    assert _text(compact) == _text(standard)   # the layout is drawn once instead of per page
+    assert all(f"SAMPLE {i}".encode() in _text(compact) for i in (1, 2, 3))
+    assert len(compact) < len(standard)
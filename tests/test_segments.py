@@ -0,0 +1,45 @@
+from modules.segments import parse_length, parse_segments
+
+
+def test_length_expressions():
+    assert parse_length("120'6\" + 85' + 3@40'") == 325.5
+    assert parse_length("120' 6 1/2\"") == 120 + 6.5 / 12
+    assert parse_length("1,200") == 1200
+
+
+def test_labelled_first_line_is_data():
+    seg = parse_segments("North 120'\nSouth 85'")
+    assert seg.errors == []
+    assert seg.spans == [120.0, 85.0]
+    assert [s["label"] for s in seg.segments] == ["North", "South"]
+
+
+def test_first_line_without_length_is_an_error_not_a_header():
+    seg = parse_segments("North side\nSouth 85'")
+    assert [n for n, _ in seg.errors] == [1]
+    assert seg.spans == [85.0]
+
+
+def test_numbered_labels():
+    text = "\n".join(f"Seg {i}\t{10 + i}'\t2" for i in range(1, 1001))
+    seg = parse_segments(text)
+    assert seg.errors == []
+    assert len(seg.segments) == 1000
+    assert seg.segments[0] == {"line": 1, "label": "Seg 1", "length": 11.0, "count": 2, "gate": False}
+    one_cell = parse_segments("Seg 3 120'\nNorth gate 12'")
+    assert one_cell.spans == [120.0]
+    assert one_cell.gate_openings == [12.0]
+
+
+def test_header_schedule():
+    seg = parse_segments("Side\tLength\tQty\tGate\nNorth\t120'6\"\t1\t\nEast\t85'\t2\t\nDrive\t12'\t1\tgate")
+    assert seg.errors == []
+    assert seg.spans == [120.5, 85.0, 85.0]
+    assert seg.gate_openings == [12.0]
+    assert seg.fence_length == 290.5
+
+
+def test_bad_lines_are_reported():
+    seg = parse_segments("North\t120'\nEast\tabc'\nSouth\t0'")
+    assert seg.spans == [120.0]
+    assert [n for n, _ in seg.errors] == [2, 3]
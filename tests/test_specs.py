@@ -0,0 +1,11 @@
+from modules import specs
+from modules.pdf_export import code_fits
+
+
+def test_product_codes_fit_the_order_form():
+    index = specs.reload()
+    assert index
+    for row in index.values():
+        for finish in specs.FINISH_WORDS:
+            for form_row, code in specs.product_codes(row, finish).items():
+                assert code_fits(code), f"{form_row} code {code!r} is cut off on the order form"
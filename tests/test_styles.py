@@ -0,0 +1,8 @@
+from modules.styles import defaults, get_style, validate
+
+
+def test_chainlink_project_runs_check_end_posts():
+    plugin = get_style("chainlink")
+    spec = {**defaults(plugin), "length": 120.0}
+    assert validate(plugin, spec) == []
+    assert validate(plugin, {**spec, "cor_post": 2, "end_post": 5}) == ["• End posts cannot exceed terminal posts."]